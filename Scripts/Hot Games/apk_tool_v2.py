@@ -1,38 +1,213 @@
 import os
-import shutil
+import mmap
 import random
-import argparse
+import logging
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor
+
+from fs_utils import MAX_WORKERS, same_fs_move
+
+log = logging.getLogger(__name__)
+
+# Linux FICLONE ioctl 编号（btrfs/xfs 等支持 reflink 的文件系统）
+FICLONE = 0x40049409
+
+# 需要处理的文件扩展名
+APK_EXTS = ('.apk', '.xapk', '.zip')
+
+# 关键词库（保留原有的并增加热词）
+BASE_KEYWORDS = (
+    "官方版", "手机版", "最新版", "中文版",
+    "汉化版", "官方正版", "安卓版", "手机版下载",
+)
+
+# 增加的热词（结合游戏分发场景）
+TRENDING_KEYWORDS = (
+    "破解版", "无限资源", "免登录", "高帧率版", "联机版",
+    "内测版", "国际服", "模拟器版", "极速版", "全解锁版",
+    "2026最新版", "高清重制版", "怀旧版", "直装版", "变态版", "MOD版"
+)
+
+# 去重并保持顺序
+ALL_KEYWORDS = tuple(dict.fromkeys(BASE_KEYWORDS + TRENDING_KEYWORDS))
+
+# 热路径上直接使用 bytes 路径，避免每次系统调用都重新编码文件名
+APK_EXTS_BYTES = tuple(os.fsencode(ext) for ext in APK_EXTS)
+ALL_KEYWORDS_BYTES = tuple(os.fsencode(kw) for kw in ALL_KEYWORDS)
+
+
+def _link_or_reflink(src, dst):
+    """尝试用硬链接或 reflink 生成与 src 内容相同的 dst，文件系统不支持时返回 False
+
+    硬链接和 reflink 只修改元数据，不搬运数据；批量提交(io_uring)对这类
+    操作没有收益，因此这里不引入 io_uring 依赖。
+    """
+    try:
+        os.link(src, dst)
+        return True
+    except FileExistsError:
+        os.remove(dst)
+        try:
+            os.link(src, dst)
+            return True
+        except OSError:
+            pass
+    except OSError:
+        # 跨文件系统(EXDEV)或文件系统不支持硬链接
+        pass
+
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        import shutil
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_to_all(src, dsts):
+    """把 src 复制为多个 dst，源文件只打开并映射一次，返回每个 dst 的异常（成功为 None）
+
+    K 个副本内容完全相同，第一次复制之后源数据已在页缓存中，后续副本不再读盘。
+    """
+    results = []
+    with open(src, 'rb') as s:
+        st = os.fstat(s.fileno())
+        mm = mmap.mmap(s.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else None
+        try:
+            for dst in dsts:
+                try:
+                    _kernel_copy(s.fileno(), mm, st.st_size, dst)
+                    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+                    results.append(None)
+                except OSError as e:
+                    results.append(e)
+        finally:
+            if mm is not None:
+                mm.close()
+    return results
+
+
+def _kernel_copy(src_fd, mm, size, dst):
+    """从已打开的源文件复制到 dst（copy_file_range -> sendfile -> 写出内存映射）
+
+    copy_file_range / sendfile 都显式传入源偏移，不移动共享 src_fd 的读位置。
+    """
+    with open(dst, 'wb') as d:
+        dst_fd = d.fileno()
+        try:
+            offset = 0
+            while offset < size:
+                copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+            return
+        except (OSError, AttributeError):
+            # 旧内核跨文件系统会返回 EXDEV，非 Linux 平台没有 copy_file_range
+            d.seek(0)
+            d.truncate()
+        try:
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except (OSError, AttributeError):
+            d.seek(0)
+            d.truncate()
+        if mm is not None:
+            d.write(mm)
+
+
+def _process_one_file(entry, selected_keywords, target_folder):
+    """为单个源文件生成全部副本并移动原文件，返回 (副本数, 是否已移动, 明细行, 错误行)
+
+    entry、selected_keywords、target_folder 均为 bytes，输出信息才解码为 str。
+    """
+    filename = os.fsdecode(entry.name)
+    full_path = entry.path
+    name_part, ext_part = os.path.splitext(entry.name)
+    lines = [f"正在处理: {filename}"]
+    errors = []
+    copies = 0
+
+    # 优先硬链接 / reflink；一旦文件系统不支持，剩余副本统一走复制
+    pending = []
+    linkable = True
+    for kw in selected_keywords:
+        new_name_bytes = name_part + kw + ext_part
+        new_name = os.fsdecode(new_name_bytes)
+        target_path = os.path.join(target_folder, new_name_bytes)
+
+        if linkable:
+            try:
+                if _link_or_reflink(full_path, target_path):
+                    copies += 1
+                    lines.append(f"  -> 已生成副本: {new_name}")
+                    continue
+                linkable = False
+            except OSError as e:
+                errors.append(f"  ! 生成失败 {new_name}: {e}")
+                continue
+        pending.append((new_name, target_path))
+
+    if pending:
+        try:
+            results = _copy_to_all(full_path, [target_path for _, target_path in pending])
+        except OSError as e:
+            results = [e] * len(pending)
+        for (new_name, _), error in zip(pending, results):
+            if error is None:
+                copies += 1
+                lines.append(f"  -> 已生成副本: {new_name}")
+            else:
+                errors.append(f"  ! 生成失败 {new_name}: {error}")
+
+    # 副本全部生成后再移动原始文件到目标文件夹
+    try:
+        same_fs_move(full_path, os.path.join(target_folder, entry.name))
+        moved = 1
+        lines.append(f"  [OK] 原始文件已移至目标文件夹\n")
+    except Exception as e:
+        moved = 0
+        errors.append(f"  [!] 移动原始文件失败 {filename}: {e}")
+
+    return copies, moved, lines, errors
+
 
 def generate_apk_copies(source_dir, target_folder_name="2026发发发", copy_count_per_file=4):
-    # 1. 路径处理
+    # 1. 路径处理（只规范化一次，后续系统调用使用 bytes 路径）
     source_dir = os.path.abspath(source_dir)
     target_folder = os.path.join(source_dir, target_folder_name)
+    source_dir_bytes = os.fsencode(source_dir)
+    target_folder_bytes = os.fsencode(target_folder)
     
-    # 2. 关键词库（保留原有的并增加热词）
-    base_keywords = [
-        "官方版", "手机版", "最新版", "中文版", 
-        "汉化版", "官方正版", "安卓版", "手机版下载",
-    ]
-    
-    # 增加的热词（结合游戏分发场景）
-    trending_keywords = [
-        "破解版", "无限资源", "免登录", "高帧率版", "联机版",
-        "内测版", "国际服", "模拟器版", "极速版", "全解锁版",
-        "2026最新版", "高清重制版", "怀旧版", "直装版", "变态版", "MOD版"
-    ]
-    
-    all_keywords = list(set(base_keywords + trending_keywords))
-    
-    # 3. 创建目标文件夹
-    if not os.path.exists(target_folder):
+    # 2. 创建目标文件夹
+    try:
         os.makedirs(target_folder)
         print(f"创建目标文件夹: {target_folder}")
-    else:
+    except FileExistsError:
         print(f"目标文件夹已存在: {target_folder}")
 
-    # 4. 获取指定目录下的所有 APK/XAPK/ZIP 文件
+    # 3. 获取指定目录下的所有 APK/XAPK/ZIP 文件
     try:
-        files = [f for f in os.listdir(source_dir) if f.lower().endswith(('.apk', '.xapk', '.zip'))]
+        with os.scandir(source_dir_bytes) as it:
+            # 先做不需要系统调用的文件名判断，再调用 is_file()
+            files = [
+                entry for entry in it
+                if not entry.name.startswith(b'.')
+                and entry.name.lower().endswith(APK_EXTS_BYTES)
+                and entry.is_file(follow_symlinks=False)
+            ]
     except Exception as e:
         print(f"无法读取目录 {source_dir}: {e}")
         return
@@ -47,33 +222,23 @@ def generate_apk_copies(source_dir, target_folder_name="2026发发发", copy_cou
     total_copies = 0
     processed_count = 0
     
-    for filename in files:
-        full_path = os.path.join(source_dir, filename)
-        name_part, ext_part = os.path.splitext(filename)
-        print(f"正在处理: {filename}")
-        
-        # 随机抽取关键词
-        selected_keywords = random.sample(all_keywords, min(copy_count_per_file, len(all_keywords)))
-        
-        for kw in selected_keywords:
-            new_name = f"{name_part}{kw}{ext_part}"
-            target_path = os.path.join(target_folder, new_name)
-            
-            # 复制文件
-            try:
-                shutil.copy2(full_path, target_path)
-                total_copies += 1
-                print(f"  -> 已生成副本: {new_name}")
-            except Exception as e:
-                print(f"  ! 生成失败 {new_name}: {e}")
-        
-        # 移动原始文件到目标文件夹
-        try:
-            shutil.move(full_path, os.path.join(target_folder, filename))
-            processed_count += 1
-            print(f"  [OK] 原始文件已移至目标文件夹\n")
-        except Exception as e:
-            print(f"  [!] 移动原始文件失败: {e}\n")
+    # 每个源文件的副本生成 + 移动作为一个任务，多个文件并行处理
+    keyword_count = min(copy_count_per_file, len(ALL_KEYWORDS))
+    # 同一个列表原地洗牌后截取前 keyword_count 个，免去 sample 的额外簿记
+    keywords = list(ALL_KEYWORDS_BYTES)
+    keyword_sets = []
+    for _ in files:
+        random.shuffle(keywords)
+        keyword_sets.append(keywords[:keyword_count])
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(_process_one_file, files, keyword_sets, repeat(target_folder_bytes))
+        for copies, moved, lines, errors in results:
+            total_copies += copies
+            processed_count += moved
+            # 逐文件明细默认不输出（--verbose 开启），失败信息始终输出
+            log.debug("\n".join(lines))
+            for error in errors:
+                log.warning(error)
 
     print("=" * 40)
     print(f"处理完成！")
@@ -83,11 +248,15 @@ def generate_apk_copies(source_dir, target_folder_name="2026发发发", copy_cou
     print("=" * 40)
 
 if __name__ == "__main__":
+    import argparse
+
     # 使用 argparse 来支持命令行指定目录
     parser = argparse.ArgumentParser(description="APK/ZIP 随机关键词副本生成工具")
     parser.add_argument("directory", nargs="?", default=".", help="指定要处理的 APK/ZIP 文件目录 (默认为当前目录)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出每个文件的处理明细")
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
     
     # 如果用户没有通过命令行传参，也可以手动输入
     target_dir = args.directory
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+整理脚本共用的文件操作工具
+"""
+
+import os
+import errno
+
+# 文件操作主要在等待内核 IO，线程数可以高于 CPU 核数
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def same_fs_move(src, dst):
+    """同一文件系统内直接 os.rename，仅在跨文件系统时回退到 shutil.move"""
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        import shutil
+        shutil.move(src, dst)
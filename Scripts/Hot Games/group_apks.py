@@ -1,9 +1,25 @@
 import os
-import shutil
-import argparse
-from pathlib import Path
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor
+
+from fs_utils import MAX_WORKERS, same_fs_move
+
+def _move_into_group(file_path, group_folder, check_existing=True):
+    """将单个文件移入组文件夹，返回 (是否移动, 提示信息)"""
+    file_name = os.path.basename(file_path)
+    try:
+        # 再次检查目标文件是否已存在（防止重复）；新建的组文件夹无需检查
+        target_file = group_folder / file_name
+        if check_existing and target_file.exists():
+            return False, f"  警告：文件 {file_name} 在 {group_folder.name} 中已存在，跳过"
+        same_fs_move(file_path, os.fspath(target_file))
+        return True, None
+    except Exception as e:
+        return False, f"移动文件 {file_name} 失败: {e}"
 
 def group_files_by_100(target_dir, group_size=100):
+    from pathlib import Path
+
     target_path = Path(target_dir).absolute()
     if not target_path.exists():
         print(f"错误：目录 {target_path} 不存在")
@@ -15,18 +31,25 @@ def group_files_by_100(target_dir, group_size=100):
     existing_group_files = set()
     
     # 先收集所有组文件夹中已有的文件名，避免重复移动
-    for item in target_path.iterdir():
-        if item.is_dir() and item.name.startswith("第") and item.name.endswith("组"):
-            for group_file in item.iterdir():
-                if group_file.is_file() and group_file.suffix.lower() in ['.apk', '.xapk', '.zip']:
-                    existing_group_files.add(group_file.name)
+    # 单次 os.walk：顶层只保留组文件夹，组文件夹内不再向下递归
+    root_dir = str(target_path)
+    for root, dirs, dir_files in os.walk(root_dir):
+        if root == root_dir:
+            dirs[:] = [d for d in dirs if d.startswith("第") and d.endswith("组")]
+            continue
+        existing_group_files.update(f for f in dir_files if f.lower().endswith(('.apk', '.xapk', '.zip')))
+        dirs[:] = []
     
     # 获取需要处理的文件（只处理直接子文件，且不在组文件夹中）
-    for item in target_path.iterdir():
-        if item.is_file() and item.suffix.lower() in ['.apk', '.xapk', '.zip']:
+    with os.scandir(target_path) as it:
+        for entry in it:
+            name = entry.name
+            # 先做不需要系统调用的文件名判断，再调用 is_file()
+            if name.startswith('.') or not name.lower().endswith(('.apk', '.xapk', '.zip')):
+                continue
             # 检查文件是否已经在组文件夹中
-            if item.name not in existing_group_files:
-                files.append(item)
+            if name not in existing_group_files and entry.is_file(follow_symlinks=False):
+                files.append(entry.path)
     
     if not files:
         print(f"在 {target_path} 中没有找到需要处理的 APK、XAPK 或 ZIP 文件")
@@ -44,31 +67,30 @@ def group_files_by_100(target_dir, group_size=100):
         group_num = (i // group_size) + 1
         group_folder = target_path / f"第{group_num}组"
         
-        if not group_folder.exists():
+        try:
             group_folder.mkdir()
+            folder_created = True
             print(f"创建文件夹: {group_folder.name}")
+        except FileExistsError:
+            folder_created = False
         
-        # 获取当前组的文件
+        # 获取当前组的文件，并行移动
         current_group = files[i:i + group_size]
         moved_count = 0
         
-        for file_path in current_group:
-            try:
-                # 再次检查目标文件是否已存在（防止重复）
-                target_file = group_folder / file_path.name
-                if target_file.exists():
-                    print(f"  警告：文件 {file_path.name} 在 {group_folder.name} 中已存在，跳过")
-                    continue
-                shutil.move(str(file_path), str(target_file))
-                moved_count += 1
-            except Exception as e:
-                print(f"移动文件 {file_path.name} 失败: {e}")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for moved, message in executor.map(_move_into_group, current_group, repeat(group_folder), repeat(not folder_created)):
+                moved_count += moved
+                if message:
+                    print(message)
         
         print(f"  -> 已将 {moved_count} 个文件移至 {group_folder.name}")
 
     print("\n整理完成！")
 
 if __name__ == "__main__":
+    import argparse
+
     parser = argparse.ArgumentParser(description="APK/ZIP 分组工具")
     parser.add_argument("directory", nargs="?", default=None, help="指定要处理的文件夹路径")
     
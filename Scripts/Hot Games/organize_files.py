@@ -9,10 +9,13 @@
 """
 
 import os
-import shutil
-import zipfile
-import argparse
-from pathlib import Path
+import logging
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from fs_utils import MAX_WORKERS, same_fs_move
+
+log = logging.getLogger(__name__)
 
 # 要创建的txt文件
 txt_files = [
@@ -20,25 +23,123 @@ txt_files = [
     "先保存再下载，否则资源会损坏.txt"
 ]
 
+# 按文件名建文件夹时需要去掉的扩展名
+FOLDER_EXTS = frozenset({'apk', 'xapk', 'ipa', 'zip', 'rar', '7z'})
+
+# 这些格式本身已经是压缩包，再 DEFLATE 几乎没有收益，直接存储即可
+COMPRESSED_EXTS = ('.apk', '.xapk', '.ipa', '.rar', '.7z')
+
+@lru_cache(maxsize=4096)
 def get_folder_name(file_name):
     """根据文件名获取文件夹名（去掉扩展名）"""
-    extensions = ['.apk', '.xapk', '.ipa', '.zip', '.rar', '.7z']
-    for ext in extensions:
-        if file_name.lower().endswith(ext):
-            return file_name[:-len(ext)]
+    stem, dot, ext = file_name.rpartition('.')
+    if dot and ext.lower() in FOLDER_EXTS:
+        return stem
     # 没有识别到扩展名，返回原文件名
     return file_name
 
+def _organize_one(uploads_dir, file_path):
+    """整理单个文件（建文件夹、移动、压缩、创建提示文件），返回 (输出行, 失败信息)"""
+    lines = []
+    errors = []
+    file_name = file_path.name
+    folder_name = get_folder_name(file_name)
+
+    # 创建新文件夹路径
+    new_folder = uploads_dir / folder_name
+
+    # 如果文件名和文件夹名相同（无扩展名文件），需要特殊处理
+    if folder_name == file_name:
+        # 先创建临时文件夹
+        temp_folder = uploads_dir / f"{folder_name}_temp"
+        temp_folder.mkdir(parents=True, exist_ok=True)
+
+        # 移动文件到临时文件夹
+        new_file_path = temp_folder / file_name
+        same_fs_move(os.fspath(file_path), os.fspath(new_file_path))
+
+        # 重命名临时文件夹为正式文件夹
+        temp_folder.rename(new_folder)
+        new_file_path = new_folder / file_name
+        lines.append(f"✓ 创建文件夹并移动: {folder_name}")
+    else:
+        # 正常情况：创建文件夹并移动文件
+        try:
+            new_folder.mkdir(parents=True)
+            folder_created = True
+            lines.append(f"✓ 创建文件夹: {folder_name}")
+        except FileExistsError:
+            folder_created = False
+
+        # 新建的文件夹里不可能已有同名文件，只有已存在的文件夹才需要检查
+        new_file_path = new_folder / file_name
+        if folder_created or not new_file_path.exists():
+            same_fs_move(os.fspath(file_path), os.fspath(new_file_path))
+            lines.append(f"  → 移动文件: {file_name}")
+
+    # 创建与文件名同名的真正 zip 压缩包（如果原文件不是 zip 文件）
+    if file_name.lower().endswith('.zip'):
+        lines.append(f"  ⏭️  原文件已是 ZIP 格式，跳过压缩步骤")
+    else:
+        import zipfile
+
+        zip_name = f"{folder_name}.zip"
+        zip_path = new_folder / zip_name
+        if file_name.lower().endswith(COMPRESSED_EXTS):
+            compression = zipfile.ZIP_STORED
+        else:
+            compression = zipfile.ZIP_DEFLATED
+        try:
+            # 'x' 模式：压缩包已存在时直接抛出 FileExistsError
+            # compresslevel=1 为最快的 deflate 级别（对 ZIP_STORED 无影响）
+            with zipfile.ZipFile(zip_path, 'x', compression, compresslevel=1) as zf:
+                lines.append(f"  ⚡ 正在将文件压缩为 ZIP...")
+                zf.write(new_file_path, arcname=file_name)
+            lines.append(f"  + 压缩完成: {zip_name}")
+        except FileExistsError:
+            pass
+        except OSError as e:
+            # 压缩失败时删除写了一半的压缩包，下次运行可以重新生成
+            zip_path.unlink(missing_ok=True)
+            errors.append(f"  ✗ 压缩失败 {zip_name}: {e}")
+
+    # 创建txt文件
+    for txt_name in txt_files:
+        txt_path = new_folder / txt_name
+        try:
+            txt_path.touch(exist_ok=False)
+        except FileExistsError:
+            pass
+
+    lines.append(f"  + 创建提示文件\n")
+    return lines, errors
+
+def _organize_folder(uploads_dir, file_paths):
+    """顺序整理归属同一文件夹的文件，避免并发写同一个 ZIP"""
+    lines = []
+    errors = []
+    for file_path in file_paths:
+        file_lines, file_errors = _organize_one(uploads_dir, file_path)
+        lines.extend(file_lines)
+        errors.extend(file_errors)
+    return lines, errors
+
 def organize_files(target_dir):
     # 设置工作文件夹路径
+    from pathlib import Path
+
     uploads_dir = Path(target_dir).absolute()
     
     if not uploads_dir.exists():
         print(f"错误：目录 {uploads_dir} 不存在")
         return
 
-    # 获取所有文件（不包括子目录）
-    files = [f for f in uploads_dir.iterdir() if f.is_file()]
+    # 获取所有文件（不包括子目录和隐藏文件，如 .DS_Store）
+    with os.scandir(uploads_dir) as it:
+        files = [
+            Path(entry.path) for entry in it
+            if not entry.name.startswith('.') and entry.is_file(follow_symlinks=False)
+        ]
     
     if not files:
         print(f"📂 {uploads_dir} 文件夹中没有待整理的文件")
@@ -47,67 +148,37 @@ def organize_files(target_dir):
     print(f"📦 目标目录: {uploads_dir}")
     print(f"📦 找到 {len(files)} 个文件需要整理\n")
     
-    processed = 0
+    # 按目标文件夹分组，每个文件夹作为一个任务并行处理
+    folders = {}
     for file_path in files:
-        file_name = file_path.name
-        folder_name = get_folder_name(file_name)
-        
-        # 创建新文件夹路径
-        new_folder = uploads_dir / folder_name
-        
-        # 如果文件名和文件夹名相同（无扩展名文件），需要特殊处理
-        if folder_name == file_name:
-            # 先创建临时文件夹
-            temp_folder = uploads_dir / f"{folder_name}_temp"
-            temp_folder.mkdir(parents=True, exist_ok=True)
-            
-            # 移动文件到临时文件夹
-            new_file_path = temp_folder / file_name
-            shutil.move(str(file_path), str(new_file_path))
-            
-            # 重命名临时文件夹为正式文件夹
-            temp_folder.rename(new_folder)
-            print(f"✓ 创建文件夹并移动: {folder_name}")
-        else:
-            # 正常情况：创建文件夹并移动文件
-            if not new_folder.exists():
-                new_folder.mkdir(parents=True)
-                print(f"✓ 创建文件夹: {folder_name}")
-            
-            new_file_path = new_folder / file_name
-            if not new_file_path.exists():
-                shutil.move(str(file_path), str(new_file_path))
-                print(f"  → 移动文件: {file_name}")
-        
-        # 创建与文件名同名的真正 zip 压缩包（如果原文件不是 zip 文件）
-        if file_name.lower().endswith('.zip'):
-            print(f"  ⏭️  原文件已是 ZIP 格式，跳过压缩步骤")
-        else:
-            zip_name = f"{folder_name}.zip"
-            zip_path = new_folder / zip_name
-            if not zip_path.exists():
-                print(f"  ⚡ 正在将文件压缩为 ZIP...")
-                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                    zf.write(new_file_path, arcname=file_name)
-                print(f"  + 压缩完成: {zip_name}")
-
-        # 创建txt文件
-        for txt_name in txt_files:
-            txt_path = new_folder / txt_name
-            if not txt_path.exists():
-                txt_path.touch()
-        
-        print(f"  + 创建提示文件\n")
-        processed += 1
+        folders.setdefault(get_folder_name(file_path.name), []).append(file_path)
+    
+    groups = list(folders.values())
+    processed = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for file_paths, (lines, errors) in zip(groups, executor.map(_organize_folder, [uploads_dir] * len(groups), groups)):
+            # 逐文件明细默认不输出（--verbose 开启），失败信息始终输出
+            log.debug("\n".join(lines))
+            for error in errors:
+                log.warning(error)
+            processed += len(file_paths)
+            failed += len(errors)
     
     print("=" * 50)
     print(f"✅ 整理完成！共处理 {processed} 个文件")
+    if failed:
+        print(f"⚠️  {failed} 个压缩包生成失败，详见上方输出")
 
 if __name__ == "__main__":
+    import argparse
+
     parser = argparse.ArgumentParser(description="文件整理工具")
     parser.add_argument("directory", nargs="?", default=None, help="指定要整理的文件夹路径")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出每个文件的处理明细")
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
     
     target_directory = args.directory
     
@@ -2,14 +2,46 @@
 # -*- coding: utf-8 -*-
 """
 删除重名文件工具
-在指定目录中查找重名文件，保留第一个找到的文件，删除其他重复文件
+在指定目录中查找重名文件（同名、同大小且文件头内容一致），保留第一个找到的文件，删除其他重复文件
 """
 
 import os
-import argparse
-from pathlib import Path
+import hashlib
+from itertools import groupby
+from operator import itemgetter
 from collections import defaultdict
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# 只比较文件头部的字节数
+HEAD_BYTES = 64 * 1024
+
+
+def _scan_files(path):
+    """递归遍历目录，产出 APK/XAPK/ZIP 文件的 DirEntry（stat 结果由 DirEntry 缓存）"""
+    with os.scandir(path) as it:
+        for entry in it:
+            name = entry.name
+            # 跳过隐藏文件/目录；先做文件名判断，再调用 is_file()/is_dir()
+            if name.startswith('.'):
+                continue
+            if name.lower().endswith(('.apk', '.xapk', '.zip')) and entry.is_file(follow_symlinks=False):
+                yield entry
+            elif entry.is_dir(follow_symlinks=False):
+                yield from _scan_files(entry.path)
+
+
+def _head_digest(path):
+    """计算文件前 HEAD_BYTES 字节的哈希，用于确认同名同大小的文件内容一致"""
+    with open(path, 'rb') as f:
+        head = f.read(HEAD_BYTES)
+    if xxhash is not None:
+        return xxhash.xxh3_64_digest(head)
+    return hashlib.blake2b(head, digest_size=16).digest()
+
 def remove_duplicate_files(target_dir, dry_run=False):
     """
     删除指定目录中的重名文件
@@ -18,22 +50,42 @@ def remove_duplicate_files(target_dir, dry_run=False):
         target_dir: 目标目录路径
         dry_run: 如果为True，只显示将要删除的文件，不实际删除
     """
+    from pathlib import Path
+
     target_path = Path(target_dir).absolute()
     if not target_path.exists():
         print(f"错误：目录 {target_path} 不存在")
         return
     
-    # 收集所有文件（递归查找）
-    file_dict = defaultdict(list)
+    # 收集所有文件（递归查找），先按大小分桶：大小唯一的文件不可能重复
+    by_size = defaultdict(list)
     
-    for root, dirs, files in os.walk(target_path):
-        for file in files:
-            if file.lower().endswith(('.apk', '.xapk', '.zip')):
-                full_path = os.path.join(root, file)
-                file_dict[file].append(full_path)
+    for entry in _scan_files(target_path):
+        by_size[entry.stat(follow_symlinks=False).st_size].append(entry)
     
-    # 找出重名文件
-    duplicates = {k: v for k, v in file_dict.items() if len(v) > 1}
+    # 同大小桶内的候选文件统一排序一次，再按 (文件名, 大小) 分组
+    candidates = [
+        (entry.name, file_size, entry.path)
+        for file_size, entries in by_size.items() if len(entries) > 1
+        for entry in entries
+    ]
+    candidates.sort()
+    
+    # 找出重名文件：同名同大小，且文件头部哈希一致（组内路径已有序）
+    duplicates = []
+    for (filename, file_size), group in groupby(candidates, key=itemgetter(0, 1)):
+        paths = [path for _, _, path in group]
+        if len(paths) < 2:
+            continue
+        by_digest = defaultdict(list)
+        for path in paths:
+            try:
+                by_digest[_head_digest(path)].append(path)
+            except OSError as e:
+                print(f"  [读取失败] {path}: {e}")
+        for same_paths in by_digest.values():
+            if len(same_paths) > 1:
+                duplicates.append((filename, file_size, same_paths))
     
     if not duplicates:
         print(f"在 {target_path} 中没有找到重名文件")
@@ -44,18 +96,16 @@ def remove_duplicate_files(target_dir, dry_run=False):
     total_to_delete = 0
     total_size = 0
     
-    for filename, paths in duplicates.items():
+    for filename, file_size, paths in duplicates:
         print(f"文件名: {filename}")
         print(f"  共找到 {len(paths)} 个同名文件：")
         
-        # 按路径排序，保留第一个，删除其他的
-        paths_sorted = sorted(paths)
-        keep_file = paths_sorted[0]
+        # 路径已排序，保留第一个，删除其他的
+        keep_file = paths[0]
         
         print(f"  [保留] {keep_file}")
         
-        for dup_path in paths_sorted[1:]:
-            file_size = os.path.getsize(dup_path)
+        for dup_path in paths[1:]:
             total_size += file_size
             total_to_delete += 1
             
@@ -78,6 +128,8 @@ def remove_duplicate_files(target_dir, dry_run=False):
     print("=" * 60)
 
 if __name__ == "__main__":
+    import argparse
+
     parser = argparse.ArgumentParser(description="删除重名文件工具")
     parser.add_argument("directory", nargs="?", default=None, help="指定要处理的文件夹路径")
     parser.add_argument("--dry-run", action="store_true", help="预览模式，只显示将要删除的文件，不实际删除")
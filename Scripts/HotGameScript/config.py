@@ -38,13 +38,17 @@ APPIUM_CONFIG = {
             "platformName": "Android",
             "automationName": "UiAutomator2",
             "deviceName": "Android Device",  # 改为你的设备ID，如 "emulator-5554" 或 "XXXXXXXX"
+            # "udid": "XXXXXXXX",  # 设置为adb devices中的设备ID后，截图直接通过adb读取（比Appium截图快）
             "appPackage": "com.smile.gifmaker",  # 快手包名
             "appActivity": "com.yxcorp.gifshow.HomeActivity",  # 快手主Activity
             "noReset": True,
             "unicodeKeyboard": True,
             "resetKeyboard": True,
             "newCommandTimeout": 600,
-        }
+        },
+        # 多台设备并行（登录同一账号，关注列表按序号分片）：填写每台设备的udid和不同的systemPort
+        # 如 [{"udid": "emulator-5554", "systemPort": 8201}, {"udid": "emulator-5556", "systemPort": 8202}]
+        "devices": [],
     },
     "ios": {
         "server_url": "http://localhost:4723",
@@ -57,6 +61,10 @@ APPIUM_CONFIG = {
             "noReset": True,
             # 关键配置：使用已运行的WDA（通过iproxy端口转发）
             "appium:webDriverAgentUrl": "http://127.0.0.1:8100",
+            # 快手页面一直有动画，WDA默认每次操作前最多等10秒直到APP空闲，设为0不等待
+            "appium:waitForIdleTimeout": 0,
+            # 元素查询只返回必要的属性
+            "appium:shouldUseCompactResponses": True,
         }
     }
 }
@@ -154,10 +162,28 @@ KUAISHOU_ELEMENTS = {
 
 # ==================== OCR配置 ====================
 OCR_CONFIG = {
-    "use_gpu": False,
+    "use_gpu": False,  # 使用GPU推理
+    "cpu_threads": 2,  # CPU推理时每个OCR引擎的线程数（离线OCR按CPU核数一半开进程，每个进程2线程刚好用满）
+    "enable_hpi": False,  # PaddleOCR 3.x高性能推理，需要先执行 paddleocr install_hpi_deps cpu（或gpu）
     "lang": "ch",  # 中文
     "det_db_thresh": 0.3,
     "det_db_box_thresh": 0.5,
+    "workers": min(4, os.cpu_count() or 1),  # 后台OCR线程数（只对Tesseract有效；PaddleOCR推理由锁串行，多核并行用 --mode ocr 多进程）
+    "batch_size": 8,  # 批量OCR每批截图数
+    "rec_batch_size": 8,  # 文字识别阶段每批推理的文本行数
+    "fast": True,  # 快速模式：PP-OCRv4轻量模型，不做文字方向分类
+    "det_limit_side_len": 640,  # 快速模式下文字检测输入的最长边（检测耗时约与边长平方成正比）
+    # 视频标题/描述区域（左、上、右、下占屏幕的比例），只对这一块做OCR
+    "title_region": (0.02, 0.70, 0.85, 0.92),
+}
+
+# ==================== 截图配置 ====================
+SCREENSHOT_CONFIG = {
+    "scale": 0.5,         # 保存到磁盘的截图缩放比例（OCR使用内存中的原图裁剪）
+    "jpeg_quality": 85,   # 保存为JPEG的质量
+    "png_compress_level": 1,  # 保存为PNG的压缩级别（0-9，PNG编码耗时主要在压缩，1级比默认6级快约一倍）
+    "dedup_history": 32,  # 与最近多少张截图比较是否重复
+    "dedup_distance": 6,  # 标题区域哈希的汉明距离小于该值视为重复截图
 }
 
 # ==================== 游戏识别关键词 ====================
@@ -210,6 +236,13 @@ SEARCH_ENGINES = {
     "bing": "https://www.bing.com/search?q={}",
 }
 
+# 搜索结果磁盘缓存（按游戏名缓存，过期后重新搜索）
+SEARCH_CACHE_PATH = DATA_DIR / "search_cache.json"
+SEARCH_CACHE_TTL = 24 * 3600  # 缓存有效期（秒）
+
+# 游戏名网络验证结果磁盘缓存（按清理后的文本缓存，有效期同搜索缓存）
+VERIFY_CACHE_PATH = DATA_DIR / "verify_cache.json"
+
 # APK下载站点（白名单）
 APK_DOWNLOAD_SITES = [
     "apkpure.com",
@@ -247,6 +280,7 @@ TIMEOUTS = {
 # ==================== 限制配置 ====================
 LIMITS = {
     "max_follow_users": 50,      # 最大处理关注用户数
+    "max_processed_users": 10000, # 内存中最多记录的已处理用户数（超过后淘汰最久未出现的）
     "max_videos_per_user": 9999, # 每个用户最大处理视频数（设大点，让它滚动到底部）
     "max_retries": 3,            # 最大重试次数
     "scroll_pause_time": 1.5,    # 滚动暂停时间（秒）
@@ -19,37 +19,110 @@
     python main.py --mode download     # 仅下载模式
 """
 import argparse
+import os
 import sys
-import subprocess
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Callable, Dict, List
 
 from loguru import logger
 
 # 配置日志
 from config import LOG_CONFIG, BASE_DIR, GAMES_CSV_PATH
 
-# 配置loguru
-logger.remove()
-logger.add(
-    sys.stdout,
-    format=LOG_CONFIG["format"],
-    level=LOG_CONFIG["level"]
-)
-logger.add(
-    BASE_DIR / "logs" / "app.log",
-    format=LOG_CONFIG["format"],
-    level=LOG_CONFIG["level"],
-    rotation=LOG_CONFIG["rotation"],
-    retention=LOG_CONFIG["retention"]
-)
+# Appium服务器API地址
+APPIUM_API = "http://127.0.0.1:4723"
+
+
+def setup_logging(debug: bool = False):
+    """配置loguru（在main中调用，导入本模块或查看帮助时不创建日志文件）"""
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        format=LOG_CONFIG["format"],
+        level="DEBUG" if debug else LOG_CONFIG["level"]
+    )
+    logger.add(
+        BASE_DIR / "logs" / "app.log",
+        format=LOG_CONFIG["format"],
+        level=LOG_CONFIG["level"],
+        rotation=LOG_CONFIG["rotation"],
+        retention=LOG_CONFIG["retention"]
+    )
+
+
+def dump_json(data, path: Path):
+    """写入JSON文件（缩进2格，中文不转义），优先使用orjson"""
+    try:
+        import orjson
+    except ImportError:
+        import json
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return
+    
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
+def load_json(path: Path):
+    """读取JSON文件，优先使用orjson"""
+    try:
+        import orjson
+    except ImportError:
+        import json
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    return orjson.loads(path.read_bytes())
+
+
+def is_appium_running() -> bool:
+    """快速探测Appium服务器是否可用"""
+    try:
+        import requests
+    except ImportError:
+        # 无法探测时按可用处理
+        return True
+    
+    try:
+        return requests.get(f"{APPIUM_API}/status", timeout=0.5).ok
+    except requests.exceptions.RequestException:
+        return False
+
+
+def wait_sessions_closed(http, timeout: float = 5.0) -> bool:
+    """
+    轮询Appium的 /sessions 直到没有活跃会话
+    
+    Args:
+        http: requests.Session
+        timeout: 最长等待时间（秒）
+        
+    Returns:
+        是否已全部关闭
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if not http.get(f"{APPIUM_API}/sessions", timeout=1).json().get("value"):
+                return True
+        except Exception as e:
+            logger.debug(f"   查询会话状态失败: {e}")
+        time.sleep(0.1)
+    
+    logger.warning(f"   等待会话关闭超时（{timeout}秒）")
+    return False
 
 
 def cleanup_processes(platform: str = "android"):
     """清理之前的进程和会话，并关闭APP"""
     logger.info("🧹 清理之前的进程和会话...")
     
+    # Appium没有运行时既没有会话也连不上设备，不必加载自动化模块
+    if not is_appium_running():
+        logger.info("   Appium服务器未运行，跳过清理")
+        return
+    
     # 1. 先尝试连接设备并关闭APP
     try:
         if platform == "android":
@@ -79,40 +152,54 @@ def cleanup_processes(platform: str = "android"):
     # 2. 杀掉所有 Appium 会话（通过 Appium 的 API）
     try:
         import requests
+        from concurrent.futures import ThreadPoolExecutor
+        from requests.adapters import HTTPAdapter
+        
+        # 复用同一个连接池（keep-alive），避免每个请求都重新建立TCP连接
+        http = requests.Session()
+        http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        
+        def close_session(session_id: str):
+            try:
+                http.delete(f"{APPIUM_API}/session/{session_id}", timeout=3)
+                logger.info(f"   ✅ 已关闭会话: {session_id}")
+            except Exception as e:
+                logger.debug(f"   关闭会话 {session_id} 失败: {e}")
+        
         try:
             # 获取所有会话
-            response = requests.get("http://127.0.0.1:4723/sessions", timeout=3)
+            response = http.get(f"{APPIUM_API}/sessions", timeout=3)
             if response.status_code == 200:
                 sessions = response.json().get("value", [])
                 if sessions:
                     logger.info(f"   发现 {len(sessions)} 个活跃会话，正在关闭...")
-                    for session in sessions:
-                        session_id = session.get("id")
-                        if session_id:
-                            try:
-                                requests.delete(f"http://127.0.0.1:4723/session/{session_id}", timeout=3)
-                                logger.info(f"   ✅ 已关闭会话: {session_id}")
-                            except Exception as e:
-                                logger.debug(f"   关闭会话 {session_id} 失败: {e}")
+                    session_ids = [session.get("id") for session in sessions if session.get("id")]
+                    # 各会话的关闭互不依赖，并行执行
+                    with ThreadPoolExecutor(max_workers=4) as executor:
+                        list(executor.map(close_session, session_ids))
+                    
+                    # 3. 轮询等待会话关闭（通常200ms内完成，最多等待5秒）
+                    wait_sessions_closed(http)
                 else:
                     logger.debug("   没有活跃的会话")
         except requests.exceptions.RequestException as e:
             logger.debug(f"   无法连接到 Appium API: {e}")
+        finally:
+            http.close()
     except ImportError:
         logger.debug("   requests 未安装，跳过API清理")
     
-    # 3. 等待会话关闭
-    time.sleep(2)
-    
     logger.success("✅ 清理完成，准备开始新的自动化流程")
 
 
-def run_mobile_automation(platform: str = "android") -> bool:
+def run_mobile_automation(platform: str = "android",
+                          on_results: Optional[Callable[[List[Dict]], None]] = None) -> bool:
     """
     运行移动端自动化流程
     
     Args:
         platform: 平台 ('android' 或 'ios')
+        on_results: 每批OCR结果的回调（在OCR线程中调用，用于流水线模式）
         
     Returns:
         是否成功
@@ -129,41 +216,94 @@ def run_mobile_automation(platform: str = "android") -> bool:
         from mobile_automation import KuaishouiOS as KuaishouApp
     
     # 导入OCR模块
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
     from ocr_processor import GameRecognizer
+    from config import OCR_CONFIG, APPIUM_CONFIG
     
     # 初始化
     app = KuaishouApp()
     recognizer = GameRecognizer()
     
-    # 收集所有截图的处理结果
+    # OCR放到后台线程执行，不阻塞Appium截图流程
+    # 识别器共用一个PaddleOCR引擎，推理由GameRecognizer._ocr_lock串行，多线程只让Tesseract并行
+    executor = ThreadPoolExecutor(max_workers=OCR_CONFIG["workers"])
+    
+    # 收集所有截图的处理结果，同时逐行追加到CSV（防止数据丢失）
     all_results = []
+    results_lock = threading.Lock()
+    csv_appender = recognizer.open_csv_appender()
+    
+    def collect(future):
+        """OCR完成后收集结果"""
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.error(f"OCR处理失败: {e}")
+            return
+        
+        with results_lock:
+            all_results.extend(results)
+            for result in results:
+                csv_appender.write(result)
+            if on_results:
+                on_results(results)
+    
+    # 截图先攒成一批，再整批交给OCR
+    batch_size = OCR_CONFIG["batch_size"]
+    pending = []
+    
+    def ocr_batch(items):
+        """后台线程：裁剪标题区域后批量OCR"""
+        screenshot_paths = [path for path, _ in items]
+        # Android端直接裁剪内存中的原图；iOS端截图时已经只截取了描述区域，按路径读取
+        images = [app.crop_title_region(image) if image is not None else None for _, image in items]
+        return recognizer.process_batch(screenshot_paths, images)
+    
+    def flush_pending():
+        """把缓冲的截图提交给后台批量OCR"""
+        if pending:
+            executor.submit(ocr_batch, pending[:]).add_done_callback(collect)
+            pending.clear()
     
     # OCR回调函数
-    def on_screenshot(screenshot_path: Path):
+    def on_screenshot(screenshot_path: Path, image=None):
         """截图后的回调函数"""
-        result = recognizer.process_screenshot(screenshot_path)
-        all_results.append(result)
-        # 实时保存（每次处理后都保存，防止数据丢失）
-        recognizer.save_to_csv(all_results)
+        pending.append((screenshot_path, image))
+        if len(pending) >= batch_size:
+            flush_pending()
+    
+    # 在导航期间预热OCR引擎
+    executor.submit(recognizer.warmup)
     
     try:
-        # 执行自动化流程
-        screenshots = app.process_all_follows(on_screenshot_callback=on_screenshot)
+        # 执行自动化流程（Android配置了多台设备时并行处理）
+        devices = APPIUM_CONFIG[platform].get("devices", [])
+        if platform == "android" and len(devices) > 1:
+            screenshots = KuaishouApp.process_all_follows_sharded(devices, on_screenshot_callback=on_screenshot)
+        else:
+            screenshots = app.process_all_follows(on_screenshot_callback=on_screenshot)
         
         logger.success(f"移动端自动化完成，共处理 {len(screenshots)} 张截图")
         
-        # 保存最终结果（包含所有OCR原始文本）
-        if all_results:
-            recognizer.save_to_csv(all_results)
-            logger.info(f"CSV已保存 {len(all_results)} 条记录，每条包含原始OCR文本分列")
-        
         return True
-        
+    
     except Exception as e:
         logger.error(f"移动端自动化失败: {e}")
         return False
-        
+    
     finally:
+        # 提交最后一批并等待剩余的OCR任务完成
+        flush_pending()
+        executor.shutdown(wait=True)
+        csv_appender.close()
+        
+        # 最后整体重写一次CSV（去重并补齐标签分列）
+        if all_results:
+            recognizer.save_to_csv(all_results)
+            logger.info(f"CSV已保存 {len(all_results)} 条记录，每条包含原始OCR文本分列")
+        
+        recognizer.close()
         app.close()
 
 
@@ -191,40 +331,48 @@ def run_search_mode() -> bool:
     logger.info(f"从CSV读取到 {len(game_names)} 个游戏")
     
     # 初始化搜索器
+    import asyncio
     searcher = GameSearcher(use_debug_mode=True)
     
     try:
-        # 连接Chrome
-        if not searcher.connect():
-            logger.error("请先启动Chrome调试模式")
-            logger.info("启动命令示例:")
-            logger.info("  Windows: chrome.exe --remote-debugging-port=9222")
-            logger.info("  Mac: /Applications/Google\\ Chrome.app/Contents/MacOS/Google\\ Chrome --remote-debugging-port=9222")
-            return False
-        
-        # 搜索每个游戏
+        # 先用aiohttp并发抓取静态搜索结果页
         all_results = {}
+        try:
+            async_results = asyncio.run(searcher.search_multiple_games_async(game_names))
+            all_results = {name: links for name, links in async_results.items() if links}
+        except Exception as e:
+            logger.warning(f"并发搜索失败，改用Chrome逐个搜索: {e}")
         
-        for game_name in game_names:
-            logger.info(f"搜索游戏: {game_name}")
-            results = searcher.get_best_download_links(game_name)
-            
-            if results:
-                all_results[game_name] = results
-                
-                # 显示搜索结果
-                for idx, result in enumerate(results[:3], 1):
-                    logger.info(f"  [{idx}] {result['title'][:50]}...")
-                    logger.info(f"      URL: {result['url'][:80]}...")
-                    logger.info(f"      评分: {result.get('download_score', 0)}")
+        # 没有搜到结果的游戏回退到Chrome（处理需要JS渲染的页面）
+        remaining = [name for name in game_names if name not in all_results]
+        if remaining:
+            if searcher.connect():
+                for game_name in remaining:
+                    logger.info(f"搜索游戏: {game_name}")
+                    results = searcher.get_best_download_links(game_name)
+                    if results:
+                        all_results[game_name] = results
+            elif not all_results:
+                logger.error("请先启动Chrome调试模式")
+                logger.info("启动命令示例:")
+                logger.info("  Windows: chrome.exe --remote-debugging-port=9222")
+                logger.info("  Mac: /Applications/Google\\ Chrome.app/Contents/MacOS/Google\\ Chrome --remote-debugging-port=9222")
+                return False
+            else:
+                logger.warning(f"无法连接Chrome，{len(remaining)} 个游戏未搜索到结果")
+        
+        # 显示搜索结果
+        for game_name, results in all_results.items():
+            logger.info(f"游戏: {game_name}")
+            for idx, result in enumerate(results[:3], 1):
+                logger.info(f"  [{idx}] {result['title'][:50]}...")
+                logger.info(f"      URL: {result['url'][:80]}...")
+                logger.info(f"      评分: {result.get('download_score', 0)}")
         
         # 保存搜索结果
-        import json
         results_path = BASE_DIR / "data" / "search_results.json"
         results_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(results_path, 'w', encoding='utf-8') as f:
-            json.dump(all_results, f, ensure_ascii=False, indent=2)
+        dump_json(all_results, results_path)
         
         logger.success(f"搜索结果已保存到: {results_path}")
         return True
@@ -237,6 +385,23 @@ def run_search_mode() -> bool:
         searcher.disconnect()
 
 
+def save_download_report(downloader, results: List[Dict]):
+    """显示下载汇总并保存下载报告"""
+    summary = downloader.get_summary(results)
+    
+    logger.info("===== 下载汇总 =====")
+    logger.info(f"总游戏数: {summary['total_games']}")
+    logger.info(f"成功: {summary['success_count']}")
+    logger.info(f"失败: {summary['failed_count']}")
+    logger.info(f"生成副本总数: {summary['total_copies']}")
+    logger.info(f"目标文件夹: {summary['target_folder']}")
+    
+    report_path = BASE_DIR / "data" / "download_report.json"
+    dump_json(summary, report_path)
+    
+    logger.success(f"下载报告已保存到: {report_path}")
+
+
 def run_download_mode() -> bool:
     """
     运行下载模式
@@ -247,7 +412,6 @@ def run_download_mode() -> bool:
     """
     logger.info("===== 开始APK下载流程 =====")
     
-    import json
     from web_automation import APKDownloader
     
     # 读取搜索结果
@@ -258,8 +422,7 @@ def run_download_mode() -> bool:
         return False
     
     try:
-        with open(results_path, 'r', encoding='utf-8') as f:
-            search_results = json.load(f)
+        search_results = load_json(results_path)
     except Exception as e:
         logger.error(f"读取搜索结果失败: {e}")
         return False
@@ -277,22 +440,7 @@ def run_download_mode() -> bool:
         # 处理下载
         results = downloader.process_multiple_games(search_results)
         
-        # 显示汇总
-        summary = downloader.get_summary(results)
-        
-        logger.info("===== 下载汇总 =====")
-        logger.info(f"总游戏数: {summary['total_games']}")
-        logger.info(f"成功: {summary['success_count']}")
-        logger.info(f"失败: {summary['failed_count']}")
-        logger.info(f"生成副本总数: {summary['total_copies']}")
-        logger.info(f"目标文件夹: {summary['target_folder']}")
-        
-        # 保存下载报告
-        report_path = BASE_DIR / "data" / "download_report.json"
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
-        
-        logger.success(f"下载报告已保存到: {report_path}")
+        save_download_report(downloader, results)
         return True
         
     except Exception as e:
@@ -300,9 +448,101 @@ def run_download_mode() -> bool:
         return False
 
 
+async def _run_pipeline(platform: str, searcher, downloader,
+                        search_workers: int = 4, download_workers: int = 2) -> Dict:
+    """
+    以生产者-消费者方式运行三个阶段：移动端识别 → 异步搜索 → 异步下载
+    
+    OCR每识别出一个新游戏就立即搜索，搜索到APK直链就立即下载，
+    使移动端操作、网络请求和磁盘写入相互重叠
+    
+    Returns:
+        包含 search_results、download_results、missing（异步搜索无结果）
+        和 page_links（需浏览器处理的下载页）的字典
+    """
+    import asyncio
+    
+    loop = asyncio.get_running_loop()
+    ocr_q = asyncio.Queue()     # OCR识别出的游戏名
+    search_q = asyncio.Queue()  # (游戏名, 下载链接列表)
+    
+    seen = set()
+    search_results = {}
+    download_results = []
+    missing = []
+    page_links = {}
+    
+    def on_results(results: List[Dict]):
+        """OCR线程回调：把新识别的游戏名投递到事件循环的队列"""
+        for result in results:
+            game_name = result.get("game_name")
+            if game_name and game_name not in seen:
+                seen.add(game_name)
+                loop.call_soon_threadsafe(ocr_q.put_nowait, game_name)
+    
+    async def search_worker(session):
+        """搜索阶段：消费游戏名，产出下载链接"""
+        while True:
+            game_name = await ocr_q.get()
+            if game_name is None:
+                return
+            
+            links = await searcher.get_best_download_links_async(game_name, session)
+            if links:
+                search_results[game_name] = links
+                await search_q.put((game_name, links))
+            else:
+                missing.append(game_name)
+    
+    async def download_worker(session):
+        """下载阶段：APK直链立即下载，下载页留给浏览器逐个处理"""
+        while True:
+            item = await search_q.get()
+            if item is None:
+                return
+            
+            game_name, links = item
+            url = downloader.select_best_url(links)
+            if not url:
+                continue
+            if not url.lower().endswith('.apk'):
+                page_links[game_name] = links
+                continue
+            
+            try:
+                download_results.append(await downloader.download_game_async(game_name, url, session))
+            except Exception as e:
+                logger.error(f"下载 {game_name} 失败: {e}")
+    
+    async with searcher.create_async_session() as search_session, \
+            downloader.create_async_session() as download_session:
+        search_tasks = [asyncio.create_task(search_worker(search_session)) for _ in range(search_workers)]
+        download_tasks = [asyncio.create_task(download_worker(download_session)) for _ in range(download_workers)]
+        
+        # Appium操作是阻塞调用，放到线程中执行
+        if not await loop.run_in_executor(None, run_mobile_automation, platform, on_results):
+            logger.warning("移动端自动化未完全成功，继续处理已识别的游戏...")
+        
+        # 识别结束后依次通知各阶段退出（OCR回调此时已全部投递到队列）
+        for _ in search_tasks:
+            await ocr_q.put(None)
+        await asyncio.gather(*search_tasks)
+        
+        for _ in download_tasks:
+            await search_q.put(None)
+        await asyncio.gather(*download_tasks)
+    
+    return {
+        "search_results": search_results,
+        "download_results": download_results,
+        "missing": missing,
+        "page_links": page_links,
+    }
+
+
 def run_full_pipeline(platform: str = "android") -> bool:
     """
-    运行完整流程
+    运行完整流程（移动端识别、搜索、下载以流水线方式并行）
     
     Args:
         platform: 移动端平台
@@ -312,25 +552,82 @@ def run_full_pipeline(platform: str = "android") -> bool:
     """
     logger.info("===== 开始完整自动化流程 =====")
     
-    # 步骤1: 移动端自动化
-    logger.info(">>> 步骤1: 移动端自动化（快手APP）")
-    if not run_mobile_automation(platform):
-        logger.warning("移动端自动化未完全成功，继续后续流程...")
+    import asyncio
+    from web_automation import GameSearcher, APKDownloader
+    
+    searcher = GameSearcher(use_debug_mode=True)
+    downloader = APKDownloader()
     
-    # 步骤2: 游戏搜索
-    logger.info(">>> 步骤2: 游戏搜索")
-    if not run_search_mode():
-        logger.warning("游戏搜索未完全成功，继续后续流程...")
+    try:
+        logger.info(">>> 移动端自动化（快手APP）+ 游戏搜索 + APK下载")
+        pipeline = asyncio.run(_run_pipeline(platform, searcher, downloader))
+        
+        search_results = pipeline["search_results"]
+        page_links = pipeline["page_links"]
+        
+        # 异步搜索没有结果的游戏回退到Chrome（处理需要JS渲染的页面）
+        missing = pipeline["missing"]
+        if missing:
+            if searcher.connect():
+                for game_name in missing:
+                    logger.info(f"搜索游戏: {game_name}")
+                    links = searcher.get_best_download_links(game_name)
+                    if links:
+                        search_results[game_name] = links
+                        page_links[game_name] = links
+            else:
+                logger.warning(f"无法连接Chrome，{len(missing)} 个游戏未搜索到结果")
+        
+        results_path = BASE_DIR / "data" / "search_results.json"
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        dump_json(search_results, results_path)
+        logger.success(f"搜索结果已保存到: {results_path}")
+        
+        # 需要浏览器处理的下载页逐个下载
+        download_results = pipeline["download_results"]
+        if page_links:
+            logger.info(f">>> 浏览器下载 {len(page_links)} 个下载页")
+            download_results.extend(downloader.process_multiple_games(page_links))
+        
+        save_download_report(downloader, download_results)
+        
+    except Exception as e:
+        logger.error(f"完整流程失败: {e}")
+        return False
     
-    # 步骤3: APK下载
-    logger.info(">>> 步骤3: APK下载与重命名")
-    if not run_download_mode():
-        logger.warning("APK下载未完全成功")
+    finally:
+        searcher.disconnect()
     
     logger.success("===== 完整流程执行完毕 =====")
     return True
 
 
+# OCR模式识别的图片扩展名（小写）
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+
+# OCR子进程内的识别器（每个进程只初始化一次）
+_worker_recognizer = None
+
+
+def _ocr_worker_init():
+    """OCR子进程初始化：回退到Tesseract时限制其OpenMP线程数"""
+    from ocr_processor.game_recognizer import HAS_PADDLE_OCR
+    # Tesseract内部的OpenMP多线程效率很低，限制为单线程，由多进程提供并发
+    # PaddleOCR按OCR_CONFIG["cpu_threads"]使用多线程，不能受此限制
+    if not HAS_PADDLE_OCR:
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def _ocr_worker(image_paths):
+    """OCR子进程：识别一批截图"""
+    global _worker_recognizer
+    if _worker_recognizer is None:
+        from ocr_processor import GameRecognizer
+        _worker_recognizer = GameRecognizer()
+    return _worker_recognizer.process_batch(image_paths)
+
+
 def run_ocr_only(image_dir: str = None) -> bool:
     """
     仅运行OCR识别模式
@@ -356,8 +653,12 @@ def run_ocr_only(image_dir: str = None) -> bool:
         logger.error(f"图片目录不存在: {screenshots_path}")
         return False
     
-    # 获取所有图片
-    image_files = list(screenshots_path.glob("*.png")) + list(screenshots_path.glob("*.jpg"))
+    # 获取所有图片（scandir只遍历一次目录，DirEntry自带文件类型，无需额外stat）
+    with os.scandir(screenshots_path) as entries:
+        image_files = [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_SUFFIXES)
+        ]
     
     if not image_files:
         logger.warning(f"目录中没有图片文件: {screenshots_path}")
@@ -365,21 +666,29 @@ def run_ocr_only(image_dir: str = None) -> bool:
     
     logger.info(f"发现 {len(image_files)} 张图片")
     
-    # 初始化识别器
-    recognizer = GameRecognizer()
+    # 按批次切分，多进程并行识别
+    import multiprocessing
+    from config import OCR_CONFIG
+    
+    batch_size = OCR_CONFIG["batch_size"]
+    batches = [image_files[i:i + batch_size] for i in range(0, len(image_files), batch_size)]
+    processes = min(len(batches), max(1, (os.cpu_count() or 1) // 2))
     
-    # 处理所有图片
-    all_games = recognizer.process_multiple_screenshots(image_files)
+    all_games = []
+    with multiprocessing.Pool(processes=processes, initializer=_ocr_worker_init) as pool:
+        for results in pool.imap_unordered(_ocr_worker, batches):
+            all_games.extend(results)
     
-    # 保存结果
+    # 保存结果（主进程只负责写CSV，不需要加载OCR模型）
+    recognizer = GameRecognizer(use_paddle=False)
     recognizer.save_to_csv(all_games)
     
     logger.success(f"OCR识别完成，共识别出 {len(all_games)} 个游戏")
     return True
 
 
-def main():
-    """主函数"""
+def _build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
     parser = argparse.ArgumentParser(
         description="快手游戏APK自动化采集工具",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -431,12 +740,24 @@ def main():
         help="启用调试模式"
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+# 模块级解析器：只构建一次，可在测试中直接导入
+PARSER = _build_parser()
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    args = PARSER.parse_args(argv)
+    
+    # 未指定模式时只显示帮助
+    if not args.full and not args.mode:
+        PARSER.print_help()
+        return
     
-    # 设置日志级别
-    if args.debug:
-        logger.remove()
-        logger.add(sys.stdout, format=LOG_CONFIG["format"], level="DEBUG")
+    # 配置日志（--debug时控制台输出DEBUG级别）
+    setup_logging(args.debug)
     
     # 执行对应模式
     try:
@@ -448,12 +769,8 @@ def main():
             success = run_search_mode()
         elif args.mode == "download":
             success = run_download_mode()
-        elif args.mode == "ocr":
-            success = run_ocr_only(args.image_dir)
         else:
-            # 默认显示帮助
-            parser.print_help()
-            return
+            success = run_ocr_only(args.image_dir)
         
         if success:
             logger.success("任务完成！")
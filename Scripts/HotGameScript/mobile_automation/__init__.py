@@ -4,6 +4,6 @@
 """
 from .kuaishou_android import KuaishouAndroid
 from .kuaishou_ios import KuaishouiOS
-from .base_automation import BaseAutomation
+from .base_automation import BaseAutomation, validate_locators
 
-__all__ = ['KuaishouAndroid', 'KuaishouiOS', 'BaseAutomation']
+__all__ = ['KuaishouAndroid', 'KuaishouiOS', 'BaseAutomation', 'validate_locators']
@@ -3,9 +3,11 @@
 移动端自动化基类
 提供通用的自动化操作方法
 """
+import hashlib
+import re
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 
 from appium import webdriver
@@ -22,7 +24,161 @@ from loguru import logger
 
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
-from config import TIMEOUTS, LIMITS, SCREENSHOTS_DIR
+from config import TIMEOUTS, LIMITS, SCREENSHOTS_DIR, OCR_CONFIG, SCREENSHOT_CONFIG
+
+# WebDriverWait的轮询间隔（秒，默认0.5秒太粗，页面一就绪就应继续）
+WAIT_POLL_INTERVAL = 0.2
+
+# 页面快照/元素查询结果的缓存时间（秒），点击、滑动、返回后立即失效
+UI_CACHE_TTL = 0.1
+
+# 定位器备选链中非最后一个定位器的查找超时（秒），找不到时尽快换下一个
+FALLBACK_PROBE_TIMEOUT = 1
+
+# Appium客户端连接池大小（同一会话的所有命令复用长连接）
+APPIUM_POOL_SIZE = 10
+
+# 定位器类型映射
+_LOCATOR_MAP = {
+    "id": AppiumBy.ID,
+    "xpath": AppiumBy.XPATH,
+    "accessibility_id": AppiumBy.ACCESSIBILITY_ID,
+    "class_name": AppiumBy.CLASS_NAME,
+    "name": AppiumBy.NAME,
+    "android_uiautomator": AppiumBy.ANDROID_UIAUTOMATOR,
+    "ios_predicate": AppiumBy.IOS_PREDICATE,
+    "ios_class_chain": AppiumBy.IOS_CLASS_CHAIN,
+}
+
+# 可以改写为更快定位方式的简单xpath
+_XPATH_RESOURCE_ID = re.compile(r"^//\*\[@resource-id='([^']+)'\]$")
+_XPATH_CONTENT_DESC = re.compile(r"^//\*\[@(?:content-desc|name)='([^']+)'\]$")
+_XPATH_CLASS_TEXT = re.compile(r"^//(android\.[\w.]+)\[@text='([^'\"]+)'\]$")
+
+# Android控件的bounds属性，如 "[0,210][1080,390]"
+_BOUNDS = re.compile(r"^\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]$")
+
+
+def ui_selector_escape(text: str) -> str:
+    """转义UiSelector字符串参数中的反斜杠和双引号"""
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def validate_locators(locators: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """
+    检查定位器配置，把能改写的xpath换成id/accessibility_id/UiSelector
+    （UiAutomator2上xpath需要遍历整棵控件树，是最慢的定位方式）
+    
+    Args:
+        locators: 名称到定位器的字典
+        
+    Returns:
+        改写后的新字典（原字典不变）
+    """
+    result = {}
+    for name, locator in locators.items():
+        if locator.get("type") != "xpath":
+            result[name] = locator
+            continue
+        
+        value = locator["value"]
+        match = _XPATH_RESOURCE_ID.match(value)
+        if match:
+            result[name] = {"type": "id", "value": match.group(1)}
+            continue
+        
+        match = _XPATH_CONTENT_DESC.match(value)
+        if match:
+            result[name] = {"type": "accessibility_id", "value": match.group(1)}
+            continue
+        
+        match = _XPATH_CLASS_TEXT.match(value)
+        if match:
+            result[name] = {
+                "type": "android_uiautomator",
+                "value": f'new UiSelector().className("{match.group(1)}").text("{ui_selector_escape(match.group(2))}")'
+            }
+            continue
+        
+        logger.debug(f"定位器 {name} 使用xpath，如有resource-id建议改用id定位: {value}")
+        result[name] = locator
+    
+    return result
+
+
+def bounds_center(bounds: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    解析Android控件的bounds属性，返回中心点坐标
+    
+    Args:
+        bounds: bounds属性值，如 "[0,210][1080,390]"
+        
+    Returns:
+        (x, y)，无法解析或区域为空时返回None
+    """
+    match = _BOUNDS.match(bounds or "")
+    if not match:
+        return None
+    left, top, right, bottom = map(int, match.groups())
+    if right <= left or bottom <= top:
+        return None
+    return (left + right) // 2, (top + bottom) // 2
+
+
+def node_fingerprint(node) -> Optional[bytes]:
+    """
+    计算页面快照节点的内容指纹（与滚动位置无关，同一控件滚动前后指纹相同）
+    注意：文字相同的不同控件（如点赞数相同的视频）指纹也相同
+    
+    Args:
+        node: lxml节点
+        
+    Returns:
+        16字节MD5摘要；节点及子节点都没有文字信息时返回None（位置不能区分滚动前后的控件）
+    """
+    parts = [node.get("resource-id", "")]
+    for child in node.iter():
+        parts.append(child.get("text", ""))
+        parts.append(child.get("content-desc", ""))
+    if not any(parts[1:]):
+        return None
+    return hashlib.md5("|".join(parts).encode("utf-8")).digest()
+
+
+def scroll_overlap(previous: List[Any], current: List[Any]) -> int:
+    """
+    计算滚动前后两屏列表的重合长度（上一屏末尾与本屏开头相同的最长部分）
+    列表滚动不改变控件顺序，本屏中重合部分之后的才是新出现的控件
+    
+    Args:
+        previous: 上一屏控件指纹（按屏幕顺序）
+        current: 本屏控件指纹（按屏幕顺序）
+        
+    Returns:
+        本屏开头与上一屏重合的控件数
+    """
+    for size in range(min(len(previous), len(current)), 0, -1):
+        if previous[-size:] == current[:size]:
+            return size
+    return 0
+
+
+def frame_hash(image) -> int:
+    """
+    计算图片的差值哈希（dHash，64位），画面越相似汉明距离越小
+    
+    Args:
+        image: 图片（BGR格式的numpy数组）
+        
+    Returns:
+        64位整数哈希
+    """
+    import cv2
+    
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
 
 
 class BaseAutomation(ABC):
@@ -42,6 +198,9 @@ class BaseAutomation(ABC):
         self.capabilities = capabilities
         self.driver: Optional[webdriver.Remote] = None
         self.wait: Optional[WebDriverWait] = None
+        self._waits: Dict[int, WebDriverWait] = {}  # 按超时时间缓存的WebDriverWait
+        self._ui_cache: Dict[Any, Tuple[Any, float]] = {}  # 短时间内重复的查询结果 (结果, 查询时间)
+        self._locator_winner: Dict[str, Dict[str, str]] = {}  # 各步骤上次成功的定位器
         
     def connect(self) -> bool:
         """连接到设备"""
@@ -55,13 +214,30 @@ class BaseAutomation(ABC):
                 command_executor=self.server_url,
                 options=options
             )
-            self.wait = WebDriverWait(self.driver, TIMEOUTS["element_wait"])
+            self._tune_connection_pool()
+            self.wait = WebDriverWait(self.driver, TIMEOUTS["element_wait"], poll_frequency=WAIT_POLL_INTERVAL)
+            self._waits = {TIMEOUTS["element_wait"]: self.wait}
             logger.success(f"成功连接到{self.platform}设备")
             return True
         except Exception as e:
             logger.error(f"连接设备失败: {e}")
             return False
     
+    def _tune_connection_pool(self):
+        """
+        调整Appium客户端底层urllib3连接池：保持长连接，池大小足够且不阻塞
+        （默认每个主机只缓存1个连接，并发请求时多出的连接用完即关闭，需要重新握手）
+        """
+        pool_manager = getattr(self.driver.command_executor, "_conn", None)
+        pool_kw = getattr(pool_manager, "connection_pool_kw", None)
+        if pool_kw is None:
+            logger.debug("Appium客户端不是urllib3连接池，跳过连接池调整")
+            return
+        
+        pool_kw.update(maxsize=APPIUM_POOL_SIZE, block=False)
+        # 已创建的连接池按旧参数创建，清掉后下一个请求按新参数重建
+        pool_manager.clear()
+    
     def disconnect(self):
         """断开设备连接"""
         if self.driver:
@@ -73,6 +249,8 @@ class BaseAutomation(ABC):
             finally:
                 self.driver = None
                 self.wait = None
+                self._waits = {}
+                self._ui_cache = {}
     
     def find_element(self, locator: Dict[str, str], timeout: int = None) -> Optional[Any]:
         """
@@ -93,8 +271,7 @@ class BaseAutomation(ABC):
         locator_type = self._get_locator_type(locator["type"])
         
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            element = wait.until(
+            element = self._get_wait(timeout).until(
                 EC.presence_of_element_located((locator_type, locator["value"]))
             )
             return element
@@ -123,37 +300,187 @@ class BaseAutomation(ABC):
         timeout = timeout or TIMEOUTS["element_wait"]
         locator_type = self._get_locator_type(locator["type"])
         
+        # 直接轮询find_elements，找到即返回（每轮只有一次Appium请求）
+        deadline = time.monotonic() + timeout
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until(EC.presence_of_element_located((locator_type, locator["value"])))
-            elements = self.driver.find_elements(locator_type, locator["value"])
-            return elements
-        except TimeoutException:
-            logger.warning(f"元素未找到: {locator}")
-            return []
+            while True:
+                elements = self.driver.find_elements(locator_type, locator["value"])
+                if elements:
+                    return elements
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.2)
         except Exception as e:
             logger.error(f"查找元素时出错: {e}")
             return []
+        
+        logger.warning(f"元素未找到: {locator}")
+        return []
+    
+    def snapshot_tree(self):
+        """
+        获取当前页面控件树的本地快照（只发一次page_source请求）
+        
+        Returns:
+            lxml根节点，失败时返回None
+        """
+        if not self.driver:
+            logger.error("未连接到设备")
+            return None
+        
+        tree = self._get_cached("page_source")
+        if tree is not None:
+            return tree
+        
+        try:
+            from lxml import etree
+            tree = etree.fromstring(self.driver.page_source.encode("utf-8"))
+        except Exception as e:
+            logger.debug(f"解析页面源码失败: {e}")
+            return None
+        
+        self._ui_cache["page_source"] = (tree, time.monotonic())
+        return tree
+    
+    def find_elements_cached(self, locator: Dict[str, str], timeout: int = None) -> List[Any]:
+        """
+        查找多个元素，UI_CACHE_TTL 内相同定位器的重复查询直接返回上次结果
+        （页面操作后缓存立即失效，不会拿到过期元素）
+        
+        Args:
+            locator: 元素定位器
+            timeout: 超时时间
+            
+        Returns:
+            找到的元素列表
+        """
+        key = (locator["type"], locator["value"])
+        elements = self._get_cached(key)
+        if elements is None:
+            elements = self.find_elements(locator, timeout)
+            if elements:
+                self._ui_cache[key] = (elements, time.monotonic())
+        return elements
+    
+    def invalidate_ui_cache(self):
+        """页面可能已变化，清空缓存的页面快照和元素查询结果"""
+        self._ui_cache.clear()
+    
+    def _get_cached(self, key):
+        """取出未过期的缓存结果，没有或已过期时返回None"""
+        cached = self._ui_cache.get(key)
+        if cached and time.monotonic() - cached[1] < UI_CACHE_TTL:
+            return cached[0]
+        return None
+    
+    def snapshot_nodes(self, tree, xpath: str, child_xpath: str = None) -> List[Dict[str, Any]]:
+        """
+        在本地快照中查找节点，取出文本和可点击的中心坐标
+        
+        Args:
+            tree: snapshot_tree() 返回的根节点
+            xpath: 节点xpath
+            child_xpath: 取文本用的子节点xpath（相对于节点），为None时取节点自身文本
+            
+        Returns:
+            [{'text': 文本或None, 'center': (x, y), 'fingerprint': 内容指纹}]，没有有效bounds的节点被跳过
+        """
+        results = []
+        for node in tree.xpath(xpath):
+            center = bounds_center(node.get("bounds"))
+            if center is None:
+                continue
+            if child_xpath:
+                children = node.xpath(child_xpath)
+                text = children[0].get("text") if children else None
+            else:
+                text = node.get("text")
+            results.append({"text": text, "center": center, "fingerprint": node_fingerprint(node)})
+        return results
+    
+    def tap(self, point: Tuple[int, int]) -> bool:
+        """
+        按坐标点击（用于本地快照中解析出的控件，无需再向Appium查找元素）
+        
+        Args:
+            point: (x, y) 坐标
+            
+        Returns:
+            是否成功点击
+        """
+        if not self.driver:
+            return False
+        self.invalidate_ui_cache()
+        try:
+            self.driver.tap([point])
+            return True
+        except Exception as e:
+            logger.error(f"点击坐标 {point} 失败: {e}")
+            return False
     
-    def click_element(self, locator: Dict[str, str], timeout: int = None) -> bool:
+    def click_element(self, locator: Dict[str, str], timeout: int = None,
+                      expect: Optional[Dict[str, str]] = None, stale: bool = False) -> bool:
         """
         点击元素
         
         Args:
             locator: 元素定位器
             timeout: 超时时间
+            expect: 点击后预期出现的元素定位器，出现即返回
+            stale: 是否等待被点击的元素失效（页面已跳转）
             
         Returns:
             是否成功点击
         """
         element = self.find_element(locator, timeout)
         if element:
+            self.invalidate_ui_cache()
             try:
                 element.click()
-                time.sleep(0.5)  # 点击后短暂等待
-                return True
             except Exception as e:
                 logger.error(f"点击元素失败: {e}")
+                return False
+            
+            # 等待点击后的页面变化，无法预知时只做极短等待
+            try:
+                wait = self._get_wait(timeout or TIMEOUTS["element_wait"])
+                if expect:
+                    expect_type = self._get_locator_type(expect["type"])
+                    wait.until(EC.presence_of_element_located((expect_type, expect["value"])))
+                elif stale:
+                    wait.until(EC.staleness_of(element))
+                else:
+                    time.sleep(0.1)
+            except TimeoutException:
+                logger.debug(f"点击后未等到预期的页面变化: {locator}")
+            return True
+        return False
+    
+    def _click_first(self, step: str, locators, timeout: int, **kwargs) -> bool:
+        """
+        依次尝试定位器并点击第一个找到的元素
+        上次成功的定位器先用短超时单独试一次，命中时不必再逐个等待前面的定位器超时
+        后面还有备选的定位器也只用短超时，只有最后一个等待完整的超时时间
+        
+        Args:
+            step: 步骤名（用于记住成功的定位器）
+            locators: 依次尝试的定位器
+            timeout: 最后一个定位器的查找超时时间
+            **kwargs: 传给click_element的其他参数（expect/stale）
+            
+        Returns:
+            是否成功点击
+        """
+        winner = self._locator_winner.get(step)
+        if winner is not None and self.click_element(winner, timeout=FALLBACK_PROBE_TIMEOUT, **kwargs):
+            return True
+        
+        last = len(locators) - 1
+        for i, locator in enumerate(locators):
+            wait = FALLBACK_PROBE_TIMEOUT if i < last else timeout
+            if self.click_element(locator, timeout=wait, **kwargs):
+                self._locator_winner[step] = locator
+                return True
         return False
     
     def input_text(self, locator: Dict[str, str], text: str, clear: bool = True) -> bool:
@@ -170,6 +497,7 @@ class BaseAutomation(ABC):
         """
         element = self.find_element(locator)
         if element:
+            self.invalidate_ui_cache()
             try:
                 if clear:
                     element.clear()
@@ -216,6 +544,83 @@ class BaseAutomation(ABC):
             logger.error(f"截图失败: {e}")
             return None
     
+    def take_screenshot_bytes(self) -> Optional[bytes]:
+        """
+        截取屏幕截图，直接返回PNG数据（不经过磁盘）
+        
+        Returns:
+            PNG数据，失败时返回None
+        """
+        if not self.driver:
+            logger.error("未连接到设备")
+            return None
+        
+        try:
+            return self.driver.get_screenshot_as_png()
+        except Exception as e:
+            logger.error(f"截图失败: {e}")
+            return None
+    
+    def decode_screenshot(self, png_data: bytes):
+        """
+        解码截图PNG数据
+        
+        Args:
+            png_data: 截图的PNG数据
+            
+        Returns:
+            图片（BGR格式的numpy数组），失败时返回None
+        """
+        import cv2
+        import numpy as np
+        
+        try:
+            return cv2.imdecode(np.frombuffer(png_data, np.uint8), cv2.IMREAD_COLOR)
+        except Exception as e:
+            logger.warning(f"解码截图失败: {e}")
+            return None
+    
+    def save_screenshot_image(self, image, filepath: Path) -> bool:
+        """
+        按SCREENSHOT_CONFIG缩小截图并保存为JPEG（比原尺寸PNG小一个数量级）
+        
+        Args:
+            image: 图片（BGR格式的numpy数组）
+            filepath: 保存路径（.jpg）
+            
+        Returns:
+            是否保存成功
+        """
+        import cv2
+        
+        try:
+            scale = SCREENSHOT_CONFIG["scale"]
+            if scale != 1:
+                image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            # 先编码再写文件，避免cv2.imwrite不支持非ASCII路径
+            ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, SCREENSHOT_CONFIG["jpeg_quality"]])
+            if not ok:
+                return False
+            filepath.write_bytes(buffer.tobytes())
+            return True
+        except Exception as e:
+            logger.error(f"保存截图失败: {e}")
+            return False
+    
+    def crop_title_region(self, image):
+        """
+        裁剪视频标题区域，OCR只处理这一块（耗时与像素数成正比）
+        
+        Args:
+            image: 全屏截图（numpy数组）
+            
+        Returns:
+            标题区域图片（与原图共享内存的切片）
+        """
+        height, width = image.shape[:2]
+        left, top, right, bottom = OCR_CONFIG["title_region"]
+        return image[int(height * top):int(height * bottom), int(width * left):int(width * right)]
+    
     def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 500):
         """
         滑动操作
@@ -229,6 +634,7 @@ class BaseAutomation(ABC):
         """
         if not self.driver:
             return
+        self.invalidate_ui_cache()
         try:
             self.driver.swipe(start_x, start_y, end_x, end_y, duration)
             time.sleep(LIMITS["scroll_pause_time"])
@@ -267,6 +673,7 @@ class BaseAutomation(ABC):
         """返回上一页"""
         if not self.driver:
             return False
+        self.invalidate_ui_cache()
         try:
             self.driver.back()
             time.sleep(1)
@@ -284,23 +691,47 @@ class BaseAutomation(ABC):
         except Exception:
             return False
     
+    def wait_for_element(self, locator: Dict[str, str], timeout: int = None, present: bool = True) -> bool:
+        """
+        等待元素出现或消失（页面跳转后代替固定sleep）
+        
+        Args:
+            locator: 元素定位器
+            timeout: 超时时间
+            present: True等待出现，False等待消失
+            
+        Returns:
+            是否在超时前等到
+        """
+        if not self.driver:
+            return False
+        
+        condition = EC.presence_of_element_located if present else EC.invisibility_of_element_located
+        locator_type = self._get_locator_type(locator["type"])
+        try:
+            self._get_wait(timeout or TIMEOUTS["element_wait"]).until(condition((locator_type, locator["value"])))
+            return True
+        except TimeoutException:
+            logger.debug(f"等待元素{'出现' if present else '消失'}超时: {locator}")
+            return False
+        except Exception as e:
+            logger.debug(f"等待元素时出错: {e}")
+            return False
+    
     def is_element_present(self, locator: Dict[str, str], timeout: int = 3) -> bool:
         """检查元素是否存在"""
         return self.find_element(locator, timeout) is not None
     
+    def _get_wait(self, timeout: int) -> WebDriverWait:
+        """获取指定超时时间的WebDriverWait（同一超时复用同一个对象）"""
+        wait = self._waits.get(timeout)
+        if wait is None:
+            wait = self._waits[timeout] = WebDriverWait(self.driver, timeout, poll_frequency=WAIT_POLL_INTERVAL)
+        return wait
+    
     def _get_locator_type(self, type_str: str):
         """转换定位器类型"""
-        type_mapping = {
-            "id": AppiumBy.ID,
-            "xpath": AppiumBy.XPATH,
-            "accessibility_id": AppiumBy.ACCESSIBILITY_ID,
-            "class_name": AppiumBy.CLASS_NAME,
-            "name": AppiumBy.NAME,
-            "android_uiautomator": AppiumBy.ANDROID_UIAUTOMATOR,
-            "ios_predicate": AppiumBy.IOS_PREDICATE,
-            "ios_class_chain": AppiumBy.IOS_CLASS_CHAIN,
-        }
-        return type_mapping.get(type_str, AppiumBy.XPATH)
+        return _LOCATOR_MAP.get(type_str, AppiumBy.XPATH)
     
     @abstractmethod
     def open_app(self) -> bool:
@@ -3,8 +3,14 @@
 快手Android自动化模块
 实现Android平台上的快手APP自动化操作
 """
+import itertools
+import shutil
+import subprocess
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
 
 from loguru import logger
@@ -15,14 +21,66 @@ from config import (
     APPIUM_CONFIG, 
     KUAISHOU_ELEMENTS, 
     LIMITS,
-    SCREENSHOTS_DIR
+    SCREENSHOTS_DIR,
+    SCREENSHOT_CONFIG,
+    TIMEOUTS
 )
-from .base_automation import BaseAutomation
+from .base_automation import BaseAutomation, validate_locators, ui_selector_escape, frame_hash, scroll_overlap
+
+# 未完成的截图回调超过该数量时，等待最早的一个完成（背压，避免OCR积压占满内存）
+MAX_PENDING_CALLBACKS = 8
+
+# 快手首页的Activity名
+HOME_ACTIVITIES = ("HomeActivity", "MainActivity")
+
+# 关注列表行内的用户名元素
+USER_NAME_XPATH = ".//*[contains(@resource-id,'user_name') or contains(@resource-id,'name')]"
+
+# 关注列表中的所有用户名元素（页面快照不可用时一次查询取出）
+USER_NAME_LOCATOR = {
+    "type": "xpath",
+    "value": "//androidx.recyclerview.widget.RecyclerView//*[contains(@resource-id,'user_name')]"
+}
+
+# 关注列表行的备用定位（主定位找不到时使用）
+FOLLOW_ROW_FALLBACK = {
+    "type": "xpath",
+    "value": "//androidx.recyclerview.widget.RecyclerView//*[@clickable='true']"
+}
+
+# 关注列表每次滚动的幅度（swipe_up的ratio）
+FOLLOW_SCROLL_RATIO = 0.6
+
+# 视频项的备用定位
+VIDEO_ITEM_FALLBACK = {
+    "type": "xpath",
+    "value": "//androidx.recyclerview.widget.RecyclerView//android.widget.ImageView[@clickable='true']"
+}
 
 
 class KuaishouAndroid(BaseAutomation):
     """快手Android自动化类"""
     
+    # 元素定位器（类加载时检查并改写一次）
+    _ELEMENTS = validate_locators(KUAISHOU_ELEMENTS["android"])
+    
+    # 各步骤依次尝试的定位器（UiSelector由设备端原生查询，找到第一个即返回，比xpath快）
+    _ME_LOCATORS = (
+        _ELEMENTS["tab_me"],
+        {"type": "android_uiautomator", "value": 'new UiSelector().text("我")'},
+        {"type": "android_uiautomator", "value": 'new UiSelector().text("我的")'},
+        {"type": "android_uiautomator", "value": 'new UiSelector().textContains("我")'},
+    )
+    _FOLLOW_LOCATORS = (
+        _ELEMENTS["follow_button"],
+        {"type": "android_uiautomator", "value": 'new UiSelector().resourceIdMatches(".*follow.*").textContains("关注")'},
+        {"type": "android_uiautomator", "value": 'new UiSelector().textContains("关注")'},
+    )
+    _WORKS_LOCATORS = (
+        _ELEMENTS["works_tab"],
+        {"type": "android_uiautomator", "value": 'new UiSelector().textContains("作品")'},
+    )
+    
     def __init__(self, custom_capabilities: Dict[str, Any] = None):
         """
         初始化快手Android自动化
@@ -42,9 +100,24 @@ class KuaishouAndroid(BaseAutomation):
             capabilities=capabilities
         )
         
-        self.elements = KUAISHOU_ELEMENTS["android"]
-        self.processed_users = set()  # 已处理的用户
-        self.processed_videos = set()  # 已处理的视频
+        self.elements = self._ELEMENTS
+        # 已处理的用户（按最近出现顺序，超过上限时淘汰最久未出现的）
+        self.processed_users: "OrderedDict[str, bool]" = OrderedDict()
+        self.processed_videos = set()  # 当前用户已截图视频的(内容指纹, 同指纹序号)，每个用户开始时清空
+        self._follow_page = 0  # 关注列表当前滚动了几屏
+        self._app_package = capabilities.get("appPackage", "com.smile.gifmaker")
+        self._activity_cache = (None, 0.0)  # (最近一次查询到的Activity, 查询时间)
+        # adb截图需要设备序列号和adb命令，任一缺失或失败后改用Appium截图
+        self._adb_serial = capabilities.get("udid") or capabilities.get("appium:udid")
+        self._adb_path = shutil.which("adb") if self._adb_serial else None
+        # 截图回调在单独线程中按顺序执行，不阻塞Appium操作
+        self._callback_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-callback")
+        self._callback_futures = deque()
+        # 最近保存的截图 (标题区域哈希, 文件路径)，用于跳过几乎相同的画面
+        self._recent_frames = deque(maxlen=SCREENSHOT_CONFIG["dedup_history"])
+        # 截图文件名 = 前缀_本次运行的启动时间_序号（不同运行之间不重名，同一运行内不会撞号）
+        self._run_stamp = time.strftime("%Y%m%d%H%M%S")
+        self._id_counter = itertools.count()
         
     def open_app(self) -> bool:
         """打开快手APP"""
@@ -55,40 +128,56 @@ class KuaishouAndroid(BaseAutomation):
         logger.info("正在打开快手APP...")
         
         try:
-            # 检查APP是否已启动
-            current_activity = self.driver.current_activity
-            if "HomeActivity" in current_activity or "MainActivity" in current_activity:
+            # 检查APP是否已启动（短时间内重复调用直接使用缓存的Activity）
+            current_activity = self._cached_current_activity()
+            if any(name in current_activity for name in HOME_ACTIVITIES):
                 logger.info("快手APP已在前台运行")
                 return True
             
-            # 启动APP
-            self.driver.activate_app(self.capabilities.get("appPackage", "com.smile.gifmaker"))
-            time.sleep(3)  # 等待APP启动
+            # 启动APP，轮询当前Activity直到首页出现（代替固定等待3秒）
+            self.invalidate_ui_cache()
+            self.driver.activate_app(self._app_package)
+            deadline = time.monotonic() + TIMEOUTS["page_load"]
+            while time.monotonic() < deadline:
+                current_activity = self._cached_current_activity(ttl=0)
+                if any(name in current_activity for name in HOME_ACTIVITIES):
+                    logger.success("快手APP启动成功")
+                    return True
+                time.sleep(0.1)
             
-            logger.success("快手APP启动成功")
+            logger.warning(f"等待快手首页超时，当前Activity: {current_activity}")
             return True
             
         except Exception as e:
             logger.error(f"打开快手APP失败: {e}")
             return False
     
+    def _cached_current_activity(self, ttl: float = 1.0) -> str:
+        """
+        获取前台Activity（每次查询都是一次Appium请求，ttl秒内直接返回缓存结果）
+        
+        Args:
+            ttl: 缓存有效期（秒），为0时总是重新查询
+            
+        Returns:
+            Activity名称，查询不到时为空字符串
+        """
+        activity, checked_at = self._activity_cache
+        now = time.monotonic()
+        if activity is None or now - checked_at >= ttl:
+            activity = self.driver.current_activity or ""
+            self._activity_cache = (activity, now)
+        return activity
+    
     def navigate_to_me(self) -> bool:
         """导航到'我的'页面"""
         logger.info("正在导航到'我的'页面...")
         
-        # 尝试多种方式定位'我'标签
-        me_locators = [
-            self.elements["tab_me"],
-            {"type": "xpath", "value": "//*[contains(@text,'我')]"},
-            {"type": "xpath", "value": "//android.widget.TextView[@text='我的']"},
-            {"type": "android_uiautomator", "value": 'new UiSelector().text("我")'},
-        ]
-        
-        for locator in me_locators:
-            if self.click_element(locator, timeout=5):
-                time.sleep(2)
-                logger.success("成功导航到'我的'页面")
-                return True
+        # 尝试多种方式定位'我'标签，等到'我的'页面上的关注按钮出现
+        if self._click_first("navigate_to_me", self._ME_LOCATORS, timeout=5,
+                             expect=self.elements["follow_button"]):
+            logger.success("成功导航到'我的'页面")
+            return True
         
         logger.error("无法找到'我的'标签")
         return False
@@ -97,19 +186,10 @@ class KuaishouAndroid(BaseAutomation):
         """点击关注按钮进入关注列表"""
         logger.info("正在点击关注按钮...")
         
-        # 尝试多种方式定位关注按钮
-        follow_locators = [
-            self.elements["follow_button"],
-            {"type": "xpath", "value": "//*[contains(@text,'关注')]"},
-            {"type": "xpath", "value": "//android.widget.TextView[contains(@text,'关注') and contains(@resource-id,'follow')]"},
-            {"type": "android_uiautomator", "value": 'new UiSelector().textContains("关注")'},
-        ]
-        
-        for locator in follow_locators:
-            if self.click_element(locator, timeout=5):
-                time.sleep(2)
-                logger.success("成功进入关注列表")
-                return True
+        # 尝试多种方式定位关注按钮，进入关注列表后按钮所在页面被替换，等待按钮失效
+        if self._click_first("click_follow", self._FOLLOW_LOCATORS, timeout=5, stale=True):
+            logger.success("成功进入关注列表")
+            return True
         
         logger.error("无法找到关注按钮")
         return False
@@ -121,57 +201,133 @@ class KuaishouAndroid(BaseAutomation):
         Returns:
             关注用户信息列表
         """
+        follow_users = list(self.iter_follow_list())
+        logger.info(f"共获取 {len(follow_users)} 个关注用户")
+        return follow_users
+    
+    def iter_follow_list(self) -> Iterator[Dict[str, Any]]:
+        """
+        边滚动边逐个产出关注用户，调用方可以在滚动过程中就开始处理
+        调用方在两次取值之间离开关注列表时，需要先回到列表并用 relocate_follow_user 翻回该用户所在位置
+        （生成器按 _follow_page 记录的位置继续向下滚动）
+        
+        Yields:
+            关注用户信息
+        """
         logger.info("正在获取关注列表...")
-        follow_users = []
+        count = 0
         scroll_count = 0
         max_scrolls = 10  # 最大滚动次数
+        self._follow_page = 0
         
-        while len(follow_users) < LIMITS["max_follow_users"] and scroll_count < max_scrolls:
-            # 查找列表项
-            items = self.find_elements(self.elements["follow_list_item"], timeout=5)
+        while count < LIMITS["max_follow_users"] and scroll_count < max_scrolls:
+            # 每次滚动只取一次页面快照，在本地解析出用户名和行坐标
+            rows = self._snapshot_follow_rows()
+            page = self._follow_page
+            prev_count = count
             
-            if not items:
-                # 尝试备用定位方式
-                items = self.find_elements({
-                    "type": "xpath",
-                    "value": "//androidx.recyclerview.widget.RecyclerView//*[@clickable='true']"
-                }, timeout=5)
+            for user_name, center in rows:
+                if user_name and not self._seen_user(user_name):
+                    user_info = {
+                        "name": user_name,
+                        "index": count,
+                        "page": page  # 发现该用户时列表滚动了几屏，用于之后重新定位
+                    }
+                    if center:
+                        user_info["center"] = center
+                    count += 1
+                    self._mark_user_processed(user_name)
+                    logger.info(f"发现关注用户: {user_name}")
+                    yield user_info
             
-            for item in items:
-                try:
-                    # 尝试获取用户名
-                    user_name_element = item.find_element(
-                        "xpath", 
-                        ".//*[contains(@resource-id,'user_name') or contains(@resource-id,'name')]"
-                    )
-                    user_name = user_name_element.text if user_name_element else ""
-                    
-                    if user_name and user_name not in self.processed_users:
-                        user_info = {
-                            "name": user_name,
-                            "element": item,
-                            "index": len(follow_users)
-                        }
-                        follow_users.append(user_info)
-                        self.processed_users.add(user_name)
-                        logger.info(f"发现关注用户: {user_name}")
-                        
-                except Exception as e:
-                    logger.debug(f"处理列表项时出错: {e}")
-                    continue
-            
-            # 如果没有找到新用户，滚动页面
-            prev_count = len(follow_users)
-            self.swipe_up(ratio=0.6)
+            # 当前画面处理完，滚动页面
+            self._scroll_follow_list(forward=True)
             scroll_count += 1
             
-            if len(follow_users) == prev_count:
-                # 如果滚动后没有新用户，可能已到列表末尾
+            if count == prev_count:
+                # 如果滚动前这一屏没有新用户，可能已到列表末尾
                 logger.info("已到达关注列表末尾")
                 break
+    
+    def _seen_user(self, user_name: str) -> bool:
+        """用户是否已处理过（命中时刷新为最近出现）"""
+        if user_name in self.processed_users:
+            self.processed_users.move_to_end(user_name)
+            return True
+        return False
+    
+    def _mark_user_processed(self, user_name: str):
+        """记录已处理的用户，超过上限时淘汰最久未出现的用户"""
+        self.processed_users[sys.intern(user_name)] = True
+        if len(self.processed_users) > LIMITS["max_processed_users"]:
+            self.processed_users.popitem(last=False)
+    
+    def _scroll_follow_list(self, forward: bool = True):
+        """关注列表滚动一屏（forward=False时按相同幅度反向滚回）"""
+        if forward:
+            self.swipe_up(ratio=FOLLOW_SCROLL_RATIO)
+            self._follow_page += 1
+            return
+        
+        self._follow_page -= 1
+        if not self.driver:
+            return
+        size = self.driver.get_window_size()
+        x = size['width'] // 2
+        # 与swipe_up的起止点相反
+        top = int(size['height'] * (0.8 - FOLLOW_SCROLL_RATIO * 0.6))
+        bottom = int(size['height'] * 0.8)
+        self.swipe(x, top, x, bottom)
+    
+    def relocate_follow_user(self, user_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        在关注列表中重新定位用户（返回列表后原先的坐标/元素可能已失效）
+        先在当前画面的页面快照中查找，找不到再按记录的滚动位置逐屏翻回去
         
-        logger.info(f"共获取 {len(follow_users)} 个关注用户")
-        return follow_users
+        Args:
+            user_info: get_follow_list 返回的用户信息
+            
+        Returns:
+            带有最新坐标的用户信息（快照不可用时不含坐标，点击时按用户名查找），找不到时返回None
+        """
+        user_name = user_info.get("name")
+        target_page = user_info.get("page", 0)
+        
+        while True:
+            for row_name, center in self._snapshot_follow_rows():
+                if row_name == user_name:
+                    located = {k: v for k, v in user_info.items() if k != "center"}
+                    if center:
+                        located["center"] = center
+                    return located
+            
+            if self._follow_page == target_page:
+                return None
+            self._scroll_follow_list(forward=self._follow_page < target_page)
+    
+    def _snapshot_follow_rows(self) -> List[Tuple[Optional[str], Optional[Tuple[int, int]]]]:
+        """
+        从一次页面快照中取出关注列表的 (用户名, 行中心坐标)
+        快照中没有结果时回退到一次查询所有用户名元素，只保留用户名（坐标为None，不持有元素引用）
+        """
+        tree = self.snapshot_tree()
+        if tree is not None:
+            for locator in (self.elements["follow_list_item"], FOLLOW_ROW_FALLBACK):
+                if locator["type"] != "xpath":
+                    continue
+                nodes = self.snapshot_nodes(tree, locator["value"], USER_NAME_XPATH)
+                rows = [(node["text"], node["center"]) for node in nodes if node["text"]]
+                if rows:
+                    return rows
+        
+        # 一次查询取出列表中所有用户名元素（不再逐行查找子元素）
+        rows = []
+        for element in self.find_elements_cached(USER_NAME_LOCATOR, timeout=5):
+            try:
+                rows.append((element.text, None))
+            except Exception as e:
+                logger.debug(f"读取用户名失败: {e}")
+        return rows
     
     def enter_user_profile(self, user_info: Dict[str, Any]) -> bool:
         """
@@ -186,26 +342,23 @@ class KuaishouAndroid(BaseAutomation):
         user_name = user_info.get("name", "未知用户")
         logger.info(f"正在进入用户 [{user_name}] 的主页...")
         
-        try:
-            element = user_info.get("element")
-            if element:
-                element.click()
-                time.sleep(2)
-                logger.success(f"成功进入用户 [{user_name}] 的主页")
-                return True
-        except Exception as e:
-            logger.error(f"进入用户主页失败: {e}")
+        center = user_info.get("center")
+        if center and self.tap(center):
+            self.wait_for_element(self.elements["works_tab"], timeout=5)
+            logger.success(f"成功进入用户 [{user_name}] 的主页")
+            return True
         
-        # 如果直接点击失败，尝试通过用户名查找
+        # 没有坐标或点击失败时，按用户名查找（点击时才解析元素）
         user_locator = {
-            "type": "xpath",
-            "value": f"//*[contains(@text,'{user_name}')]"
+            "type": "android_uiautomator",
+            "value": f'new UiSelector().textContains("{ui_selector_escape(user_name)}")'
         }
         
-        if self.click_element(user_locator, timeout=5):
-            time.sleep(2)
+        if self.click_element(user_locator, timeout=5, expect=self.elements["works_tab"]):
+            logger.success(f"成功进入用户 [{user_name}] 的主页")
             return True
         
+        logger.error(f"进入用户 [{user_name}] 的主页失败")
         return False
     
     def get_user_videos(self) -> List[Dict[str, Any]]:
@@ -221,58 +374,79 @@ class KuaishouAndroid(BaseAutomation):
         max_scrolls = 5
         
         # 先点击'作品'标签确保在作品列表
-        works_locators = [
-            self.elements["works_tab"],
-            {"type": "xpath", "value": "//*[contains(@text,'作品')]"},
-            {"type": "android_uiautomator", "value": 'new UiSelector().textContains("作品")'},
-        ]
-        
-        for locator in works_locators:
-            if self.click_element(locator, timeout=3):
-                time.sleep(1)
-                break
+        self._click_first("works_tab", self._WORKS_LOCATORS, timeout=3)
+        
+        previous_screen = []  # 上一屏视频项的内容指纹（按屏幕顺序）
+        occurrences = {}  # 每个指纹已收集的视频数，点赞数等文字相同的不同视频按出现次序区分
         
         while len(videos) < LIMITS["max_videos_per_user"] and scroll_count < max_scrolls:
-            # 查找视频项
-            video_items = self.find_elements(self.elements["video_item"], timeout=5)
-            
+            # 查找视频项（一次页面快照取出所有坐标）
+            video_items = self._snapshot_video_items()
             if not video_items:
-                video_items = self.find_elements({
-                    "type": "xpath",
-                    "value": "//androidx.recyclerview.widget.RecyclerView//android.widget.ImageView[@clickable='true']"
-                }, timeout=5)
+                break
             
-            for idx, item in enumerate(video_items):
-                try:
-                    # 生成唯一标识
-                    video_id = f"video_{len(videos)}_{int(time.time())}"
-                    
-                    if video_id not in self.processed_videos:
-                        video_info = {
-                            "id": video_id,
-                            "element": item,
-                            "index": len(videos)
-                        }
-                        videos.append(video_info)
-                        self.processed_videos.add(video_id)
-                        
-                except Exception as e:
-                    logger.debug(f"处理视频项时出错: {e}")
-                    continue
+            # 快照视频项都有内容指纹时，才能按滚动前后的重合部分找出新视频
+            screen = [item.get("fingerprint") for item in video_items]
+            alignable = "center" in video_items[0] and None not in screen
+            overlap = scroll_overlap(previous_screen, screen) if alignable else 0
+            previous_screen = screen
+            new_count = 0
+            
+            for item in video_items[overlap:]:
+                if "center" in item:
+                    fingerprint = item["fingerprint"]
+                    if fingerprint is not None:
+                        sequence = occurrences.get(fingerprint, 0)
+                        occurrences[fingerprint] = sequence + 1
+                        fingerprint = (fingerprint, sequence)
+                    video_info = {
+                        "id": f"video_{len(videos)}",
+                        "fingerprint": fingerprint,
+                        "center": item["center"],
+                        "index": len(videos)
+                    }
+                else:
+                    video_info = {
+                        "id": f"video_{len(videos)}",
+                        "locator": item,
+                        "index": len(videos)
+                    }
+                videos.append(video_info)
+                new_count += 1
             
             if len(videos) >= LIMITS["max_videos_per_user"]:
                 break
-                
-            prev_count = len(videos)
-            self.swipe_up(ratio=0.4)
-            scroll_count += 1
             
-            if len(videos) == prev_count:
+            # 滚动后没有新视频说明已到底部；没有内容指纹或逐个查找时无法区分滚动前后的视频，只取第一屏
+            if not new_count or not alignable:
                 break
+            
+            self.swipe_up(ratio=0.4)
+            scroll_count += 1
         
         logger.info(f"共获取 {len(videos)} 个视频")
         return videos
     
+    def _snapshot_video_items(self) -> List[Any]:
+        """
+        从一次页面快照中取出视频项（{'center': 中心坐标, 'fingerprint': 内容指纹或None}）
+        快照中没有结果时回退到逐个查找元素，返回定位描述（定位器加序号，点击时再解析元素）
+        """
+        tree = self.snapshot_tree()
+        if tree is not None:
+            for locator in (self.elements["video_item"], VIDEO_ITEM_FALLBACK):
+                if locator["type"] != "xpath":
+                    continue
+                nodes = self.snapshot_nodes(tree, locator["value"])
+                if nodes:
+                    return nodes
+        
+        for locator in (self.elements["video_item"], VIDEO_ITEM_FALLBACK):
+            count = len(self.find_elements_cached(locator, timeout=5))
+            if count:
+                return [{**locator, "position": position} for position in range(count)]
+        return []
+    
     def enter_video_detail(self, video_info: Dict[str, Any]) -> bool:
         """
         进入视频详情页
@@ -286,19 +460,61 @@ class KuaishouAndroid(BaseAutomation):
         video_id = video_info.get("id", "未知视频")
         logger.info(f"正在进入视频 [{video_id}] 详情页...")
         
-        try:
-            element = video_info.get("element")
-            if element:
-                element.click()
-                time.sleep(2)
-                logger.success(f"成功进入视频详情页")
-                return True
-        except Exception as e:
-            logger.error(f"进入视频详情页失败: {e}")
+        center = video_info.get("center")
+        if center and self.tap(center):
+            # 详情页是全屏播放，等待主页的'作品'标签消失
+            self.wait_for_element(self.elements["works_tab"], timeout=5, present=False)
+            logger.success(f"成功进入视频详情页")
+            return True
+        
+        locator = video_info.get("locator")
+        if locator:
+            try:
+                elements = self.find_elements_cached(locator, timeout=5)
+                position = locator.get("position", 0)
+                if position < len(elements):
+                    self.invalidate_ui_cache()
+                    elements[position].click()
+                    self.wait_for_element(self.elements["works_tab"], timeout=5, present=False)
+                    logger.success(f"成功进入视频详情页")
+                    return True
+            except Exception as e:
+                logger.error(f"进入视频详情页失败: {e}")
         
         return False
     
-    def screenshot_and_analyze(self, prefix: str = "") -> Optional[Path]:
+    def _adb_screencap(self) -> Optional[bytes]:
+        """
+        通过 adb exec-out screencap 直接读取设备PNG（不经过Appium的HTTP+base64传输）
+        
+        Returns:
+            PNG数据，adb不可用或失败时返回None
+        """
+        if not self._adb_path:
+            return None
+        
+        try:
+            result = subprocess.run(
+                [self._adb_path, "-s", self._adb_serial, "exec-out", "screencap", "-p"],
+                capture_output=True,
+                timeout=TIMEOUTS["screenshot"]
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.debug(f"adb截图失败: {e}")
+            return None
+        
+        if result.returncode != 0 or not result.stdout.startswith(b"\x89PNG"):
+            logger.warning(f"adb截图失败，改用Appium截图: {result.stderr.decode(errors='ignore').strip()}")
+            self._adb_path = None
+            return None
+        
+        return result.stdout
+    
+    def take_screenshot_bytes(self) -> Optional[bytes]:
+        """截取屏幕截图，优先使用adb，不可用时回退到Appium"""
+        return self._adb_screencap() or super().take_screenshot_bytes()
+    
+    def screenshot_and_analyze(self, prefix: str = "") -> Tuple[Optional[Path], Any]:
         """
         截图并保存用于后续分析
         
@@ -306,22 +522,114 @@ class KuaishouAndroid(BaseAutomation):
             prefix: 文件名前缀
             
         Returns:
-            截图文件路径
+            (截图文件路径, 解码后的原尺寸图片)，OCR直接使用内存中的图片，不再从磁盘读回；
+            标题区域与最近保存的截图几乎相同时返回 (None, None)
         """
-        timestamp = int(time.time() * 1000)
-        filename = f"{prefix}_{timestamp}.png" if prefix else f"screenshot_{timestamp}.png"
-        return self.take_screenshot(filename)
+        png_data = self.take_screenshot_bytes()
+        if not png_data:
+            return None, None
+        
+        image = self.decode_screenshot(png_data)
+        
+        # 标题区域（OCR识别的部分）与最近的截图几乎相同时不再保存和识别
+        if image is not None:
+            image_hash = frame_hash(self.crop_title_region(image))
+            for recent_hash, recent_path in self._recent_frames:
+                if bin(image_hash ^ recent_hash).count("1") < SCREENSHOT_CONFIG["dedup_distance"]:
+                    logger.info(f"截图与已保存的 {recent_path.name} 几乎相同，跳过")
+                    return None, None
+        
+        name = f"{prefix or 'screenshot'}_{self._run_stamp}_{next(self._id_counter)}"
+        
+        # 磁盘上保存缩小后的JPEG；解码失败时原样保存PNG
+        filepath = SCREENSHOTS_DIR / f"{name}.jpg"
+        if image is None or not self.save_screenshot_image(image, filepath):
+            filepath = SCREENSHOTS_DIR / f"{name}.png"
+            try:
+                filepath.write_bytes(png_data)
+            except Exception as e:
+                logger.error(f"保存截图失败: {e}")
+        
+        if image is not None:
+            self._recent_frames.append((image_hash, filepath))
+        
+        logger.info(f"截图已保存: {filepath}")
+        return filepath, image
+    
+    def _submit_callback(self, callback, *args):
+        """在回调线程中执行截图回调，未完成的回调过多时等待最早的一个"""
+        def run():
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"OCR回调处理失败: {e}")
+        
+        while len(self._callback_futures) >= MAX_PENDING_CALLBACKS:
+            self._callback_futures.popleft().result()
+        self._callback_futures.append(self._callback_pool.submit(run))
     
-    def process_all_follows(self, on_screenshot_callback=None):
+    def _drain_callbacks(self):
+        """等待所有已提交的截图回调执行完毕"""
+        while self._callback_futures:
+            self._callback_futures.popleft().result()
+    
+    def process_all_follows(self, on_screenshot_callback=None, shard: Tuple[int, int] = None):
         """
         处理所有关注用户
         
         Args:
-            on_screenshot_callback: 截图后的回调函数，用于OCR处理
+            on_screenshot_callback: 截图后的回调函数，用于OCR处理（在回调线程中按截图顺序执行，返回前全部执行完毕）
+            shard: (分片序号, 分片总数)，只处理关注列表中序号对分片总数取余等于分片序号的用户
             
         Returns:
             所有截图路径列表
         """
+        try:
+            return self._process_all_follows(on_screenshot_callback, shard)
+        finally:
+            self._drain_callbacks()
+    
+    @classmethod
+    def process_all_follows_sharded(cls, devices: List[Dict[str, Any]],
+                                    on_screenshot_callback=None) -> List[Path]:
+        """
+        多台设备并行处理关注用户（各设备登录同一账号，关注列表按序号分片）
+        每台设备一个线程、一个Appium会话；耗时都在等待设备响应，不需要多进程
+        
+        Args:
+            devices: 每台设备的自定义能力配置，如 {"udid": "emulator-5554", "systemPort": 8201}
+            on_screenshot_callback: 截图后的回调函数（多台设备的回调串行执行）
+            
+        Returns:
+            所有设备的截图路径列表
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        callback = None
+        if on_screenshot_callback:
+            callback_lock = threading.Lock()
+            
+            def callback(*args):
+                with callback_lock:
+                    on_screenshot_callback(*args)
+        
+        def run(shard_index: int, capabilities: Dict[str, Any]) -> List[Path]:
+            app = cls(custom_capabilities=capabilities)
+            try:
+                return app.process_all_follows(callback, shard=(shard_index, len(devices)))
+            except Exception as e:
+                logger.error(f"设备 {capabilities.get('udid', shard_index)} 处理失败: {e}")
+                return []
+            finally:
+                app.close()
+        
+        logger.info(f"使用 {len(devices)} 台设备并行处理关注列表")
+        with ThreadPoolExecutor(max_workers=len(devices)) as executor:
+            results = executor.map(run, range(len(devices)), devices)
+            return [path for paths in results for path in paths]
+    
+    def _process_all_follows(self, on_screenshot_callback=None, shard: Tuple[int, int] = None) -> List[Path]:
+        """process_all_follows 的主体流程"""
         screenshots = []
         
         # 1. 打开APP
@@ -339,92 +647,97 @@ class KuaishouAndroid(BaseAutomation):
             logger.error("无法进入关注列表")
             return screenshots
         
-        # 4. 获取关注列表
-        follow_list = self.get_follow_list()
+        # 4. 边滚动关注列表边遍历每个关注用户
+        user_idx = -1
+        for user_idx, user_info in enumerate(self.iter_follow_list()):
+            # 多设备并行时只处理本设备的分片
+            if shard and user_idx % shard[1] != shard[0]:
+                continue
+            
+            user_name = user_info.get("name", f"用户{user_idx}")
+            logger.info(f"正在处理用户 {user_idx + 1}: {user_name}")
+            
+            try:
+                screenshots.extend(self._process_follow_user(user_idx, user_info, on_screenshot_callback))
+            finally:
+                # 返回到关注列表，生成器继续取快照和滚动前必须回到列表
+                self.go_back()
         
-        if not follow_list:
+        if user_idx < 0:
             logger.warning("关注列表为空")
             return screenshots
         
-        # 5. 遍历每个关注用户
-        for user_idx, user_info in enumerate(follow_list):
-            user_name = user_info.get("name", f"用户{user_idx}")
-            logger.info(f"正在处理用户 {user_idx + 1}/{len(follow_list)}: {user_name}")
+        logger.success(f"处理完成，共截取 {len(screenshots)} 张截图")
+        return screenshots
+    
+    def _process_follow_user(self, user_idx: int, user_info: Dict[str, Any],
+                             on_screenshot_callback=None) -> List[Path]:
+        """处理单个关注用户：重新定位、进入主页并逐个截取视频详情"""
+        screenshots = []
+        user_name = user_info.get("name", f"用户{user_idx}")
+        # 视频指纹只在同一用户的作品列表内有意义，不同用户的视频不能互相跳过
+        self.processed_videos.clear()
+        
+        # 列表可能已滚动，用页面快照重新定位用户（不再重新抓取整个关注列表）
+        located = self.relocate_follow_user(user_info)
+        if not located:
+            logger.warning(f"无法重新定位用户: {user_name}")
+            return screenshots
+        user_info = located
+        
+        # 进入用户主页
+        if not self.enter_user_profile(user_info):
+            return screenshots
+        
+        # 获取用户视频
+        videos = self.get_user_videos()
+        
+        # 遍历每个视频
+        for video_idx, video_info in enumerate(videos):
+            logger.info(f"  处理视频 {video_idx + 1}/{len(videos)}")
             
-            # 重新获取关注列表中的元素（因为页面可能已刷新）
-            if user_idx > 0:
-                # 返回到关注列表
+            # 重新获取视频列表（如果不是第一个视频）
+            if video_idx > 0:
                 self.go_back()
-                time.sleep(1)
-                
-                # 重新定位用户
-                current_follows = self.get_follow_list()
-                matching_user = None
-                for u in current_follows:
-                    if u.get("name") == user_name:
-                        matching_user = u
-                        break
-                
-                if not matching_user:
-                    logger.warning(f"无法重新定位用户: {user_name}")
+                current_videos = self.get_user_videos()
+                if video_idx < len(current_videos):
+                    video_info = current_videos[video_idx]
+                else:
                     continue
-                    
-                user_info = matching_user
             
-            # 进入用户主页
-            if not self.enter_user_profile(user_info):
+            # 跳过已经截过图的视频（按内容指纹判断）
+            fingerprint = video_info.get("fingerprint")
+            if fingerprint in self.processed_videos:
+                logger.info(f"  视频 [{video_info['id']}] 已处理，跳过")
                 continue
             
-            # 获取用户视频
-            videos = self.get_user_videos()
+            # 进入视频详情
+            if not self.enter_video_detail(video_info):
+                continue
             
-            # 遍历每个视频
-            for video_idx, video_info in enumerate(videos):
-                logger.info(f"  处理视频 {video_idx + 1}/{len(videos)}")
-                
-                # 重新获取视频列表（如果不是第一个视频）
-                if video_idx > 0:
-                    self.go_back()
-                    time.sleep(1)
-                    current_videos = self.get_user_videos()
-                    if video_idx < len(current_videos):
-                        video_info = current_videos[video_idx]
-                    else:
-                        continue
-                
-                # 进入视频详情
-                if not self.enter_video_detail(video_info):
-                    continue
-                
-                # 等待视频加载
-                time.sleep(2)
-                
-                # 截图
-                screenshot_path = self.screenshot_and_analyze(
-                    prefix=f"user{user_idx}_video{video_idx}"
-                )
-                
-                if screenshot_path:
-                    screenshots.append(screenshot_path)
-                    
-                    # 调用OCR回调
-                    if on_screenshot_callback:
-                        try:
-                            on_screenshot_callback(screenshot_path)
-                        except Exception as e:
-                            logger.error(f"OCR回调处理失败: {e}")
+            # 截图
+            screenshot_path, image = self.screenshot_and_analyze(
+                prefix=f"user{user_idx}_video{video_idx}"
+            )
+            
+            if screenshot_path:
+                screenshots.append(screenshot_path)
+                if fingerprint:
+                    self.processed_videos.add(fingerprint)
                 
-                # 返回视频列表
-                self.go_back()
-                time.sleep(1)
+                # 调用OCR回调
+                if on_screenshot_callback:
+                    self._submit_callback(on_screenshot_callback, screenshot_path, image)
             
-            # 返回关注列表
+            # 返回视频列表
             self.go_back()
-            time.sleep(1)
         
-        logger.success(f"处理完成，共截取 {len(screenshots)} 张截图")
+        # 返回关注列表
+        self.go_back()
         return screenshots
     
     def close(self):
         """关闭自动化连接"""
+        self._drain_callbacks()
+        self._callback_pool.shutdown(wait=True)
         self.disconnect()
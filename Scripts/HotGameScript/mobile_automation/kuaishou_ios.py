@@ -3,11 +3,19 @@
 快手iOS自动化模块
 实现iOS平台上的快手APP自动化操作
 """
+import csv
+import json
+import re
 import time
 import subprocess
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from datetime import datetime
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
 from loguru import logger
 
 import sys
@@ -16,62 +24,207 @@ from config import (
     APPIUM_CONFIG, 
     KUAISHOU_ELEMENTS, 
     LIMITS,
-    SCREENSHOTS_DIR
+    SCREENSHOTS_DIR,
+    SCREENSHOT_CONFIG,
+    DATA_DIR
 )
-from .base_automation import BaseAutomation
+from .base_automation import BaseAutomation, validate_locators, frame_hash
 
+# iOS基础设备能力配置（只读视图，创建实例时合并自定义配置，不再每次复制）
+_BASE_CAPS = MappingProxyType(APPIUM_CONFIG["ios"]["capabilities"])
 
-def get_connected_ios_devices() -> List[Dict[str, str]]:
+# 单个设备检测命令的超时时间（秒）
+DEVICE_DETECT_TIMEOUT = 10
+
+# get_connected_ios_devices 的检测结果（None表示尚未检测到设备）
+_ios_devices_cache: Optional[List[Dict[str, str]]] = None
+
+# 关注列表cell（主定位找不到时使用）：页面快照中用xpath，设备上用class chain（由XCTest原生执行，比xpath快得多）
+FOLLOW_CELL_XPATH = "//XCUIElementTypeTable//XCUIElementTypeCell"
+FOLLOW_CELL_LOCATOR = {"type": "ios_class_chain", "value": "**/XCUIElementTypeTable/**/XCUIElementTypeCell"}
+
+# 关注列表本身（用于 mobile: scroll 原生滚动）
+FOLLOW_TABLE_LOCATOR = {"type": "ios_class_chain", "value": "**/XCUIElementTypeTable"}
+
+# cell内的头像和文本元素（相对于cell）：页面快照中用xpath，设备上用class chain
+CELL_IMAGE_XPATH = ".//XCUIElementTypeImage"
+CELL_TEXT_XPATH = ".//XCUIElementTypeStaticText"
+CELL_IMAGE_CHAIN = "**/XCUIElementTypeImage"
+CELL_TEXT_CHAIN = "**/XCUIElementTypeStaticText"
+
+# 作品列表中的视频项（备用定位）
+VIDEO_ITEM_CHAIN_LOCATOR = {"type": "ios_class_chain", "value": "**/XCUIElementTypeOther[`name CONTAINS '作品点赞数'`]"}
+
+# 页面快照中的视频项（用visible属性判断哪个视频可见）
+VIDEO_ITEM_XPATH = "//*[contains(@name,'作品点赞数')]"
+
+# 页面特征：关注列表的标题（如"我的关注（3人）"）、首页/'我的'页面的底部标签栏
+FOLLOW_LIST_MARKER_XPATH = "//*[starts-with(@name,'我的关注') or starts-with(@label,'我的关注')]"
+TAB_BAR_XPATH = "//XCUIElementTypeTabBar"
+
+# 各步骤在配置的定位器之后依次尝试的备用定位器（不随调用变化，只创建一次）
+ME_LOCATORS = (
+    {"type": "accessibility_id", "value": "我的"},
+    {"type": "ios_class_chain", "value": "**/XCUIElementTypeButton[`name == '我'`]"},
+    {"type": "ios_predicate", "value": "label == '我' OR label == '我的'"},
+)
+FOLLOW_LOCATORS = (
+    {"type": "accessibility_id", "value": "关注"},
+    {"type": "ios_class_chain", "value": "**/XCUIElementTypeStaticText[`name CONTAINS '关注'`]"},
+    {"type": "ios_predicate", "value": "label CONTAINS '关注'"},
+)
+WORKS_LOCATORS = (
+    {"type": "ios_predicate", "value": "name BEGINSWITH '作品'"},
+    {"type": "ios_predicate", "value": "label BEGINSWITH '作品'"},
+    {"type": "ios_class_chain", "value": "**/XCUIElementTypeButton[`name CONTAINS '作品'`]"},
+)
+VIDEO_LOCATORS = (
+    {"type": "ios_predicate", "value": "name CONTAINS '作品点赞数'"},
+    VIDEO_ITEM_CHAIN_LOCATOR,
+)
+BACK_LOCATORS = (
+    {"type": "accessibility_id", "value": "返回"},
+    {"type": "ios_predicate", "value": "label == '返回'"},
+    {"type": "ios_predicate", "value": "name == '返回'"},
+    {"type": "ios_class_chain", "value": "**/XCUIElementTypeButton[`name == '返回'`]"},
+    {"type": "ios_class_chain", "value": "**/XCUIElementTypeNavigationBar/**/XCUIElementTypeButton[1]"},
+    {"type": "ios_class_chain", "value": "**/XCUIElementTypeButton[`name CONTAINS '返回' OR label CONTAINS '返回'`]"},
+    # 尝试点击导航栏最左边的按钮
+    {"type": "ios_class_chain", "value": "**/XCUIElementTypeNavigationBar/XCUIElementTypeButton[1]"},
+)
+
+# 返回关注列表时最多逐级返回的次数（视频详情 -> 用户主页 -> 关注列表）
+MAX_BACK_STEPS = 3
+
+# 关注列表每次滚动的幅度（swipe_up的ratio）
+FOLLOW_SCROLL_RATIO = 0.6
+
+# 已处理用户记录文件（位于DATA_DIR）
+PROCESSED_USERS_FILE = "processed_users.csv"
+
+# 各步骤上次成功的定位器记录文件（位于DATA_DIR，同一APP版本下定位器不变，下次运行直接先试）
+LOCATOR_WINNERS_FILE = "ios_locator_winners.json"
+
+# 用户名的最大长度，超过的文本不是用户名
+MAX_USER_NAME_LENGTH = 40
+
+# 用户名中出现即视为无效的关键词（筛选按钮、UI元素、功能按钮、状态文字等）
+INVALID_NAME_KEYWORDS = (
+    "我的关注",
+    "关注",
+    "取消关注",
+    "快手平台",
+    "快手官方",
+    "看作品",
+    "查看更多",
+    "全部",
+    "人）",  # "我的关注（3人）"
+    "综合排序",
+    "有更新",
+    "有看过",
+    "最新",
+    "最热",
+    "你可能感兴趣的人",
+    "你可能错过的更新",
+    "发私信",
+    "进店铺",
+    "已关注",
+    "设置备注",
+    "升级为快手号",
+    "加载中",
+    "批量管理",
+    "好评率",
+    "直播中",
+    "直播",
+    "看过",
+    "%",
+)
+
+# 所有排除关键词合成一个正则，一次扫描完成匹配
+_INVALID_NAME_PATTERN = re.compile("|".join(map(re.escape, INVALID_NAME_KEYWORDS)))
+
+
+def get_connected_ios_devices(refresh: bool = False) -> List[Dict[str, str]]:
     """
-    获取已连接的iOS设备列表
+    获取已连接的iOS设备列表（结果在进程内缓存，多次创建KuaishouiOS时不再重复调用xctrace）
+    
+    Args:
+        refresh: 是否忽略缓存重新检测（插拔设备后使用）
     
     Returns:
         设备列表 [{"udid": "xxx", "name": "xxx"}, ...]
     """
+    global _ios_devices_cache
+    if _ios_devices_cache is not None and not refresh:
+        return [dict(device) for device in _ios_devices_cache]
+    
+    # 两种检测方式互不依赖，同时执行，取先返回的非空结果（耗时为两者较长者而不是两者之和）
     devices = []
+    pool = ThreadPoolExecutor(max_workers=2)
+    futures = [pool.submit(_list_devices_xctrace), pool.submit(_list_devices_idevice_id)]
+    try:
+        for future in as_completed(futures, timeout=DEVICE_DETECT_TIMEOUT + 1):
+            devices = future.result()
+            if devices:
+                break
+    except FuturesTimeoutError as e:
+        logger.debug(f"iOS设备检测超时: {e}")
+    finally:
+        # 不等待较慢的一个（子进程会在自身超时后结束）
+        pool.shutdown(wait=False)
     
-    # 方法1: 使用 xcrun xctrace
+    # 没检测到设备时不缓存，下次创建实例时重新检测
+    if devices:
+        _ios_devices_cache = devices
+    return [dict(device) for device in devices]
+
+
+def _list_devices_xctrace() -> List[Dict[str, str]]:
+    """使用 xcrun xctrace 检测真机（按字节解析输出，不依赖系统区域设置的解码）"""
+    devices = []
     try:
         result = subprocess.run(
             ["xcrun", "xctrace", "list", "devices"],
-            capture_output=True, text=True, timeout=10
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=DEVICE_DETECT_TIMEOUT
         )
         if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            for line in lines:
+            for line in result.stdout.splitlines():
                 # 跳过模拟器和标题行
-                if 'Simulator' in line or '==' in line or not line.strip():
+                if b'Simulator' in line or b'==' in line or not line.strip():
                     continue
                 # 解析真机信息，格式: "iPhone Name (iOS Version) (UDID)"
-                if '(' in line and ')' in line:
-                    parts = line.rsplit('(', 1)
+                if b'(' in line and b')' in line:
+                    parts = line.rsplit(b'(', 1)
                     if len(parts) == 2:
-                        udid = parts[1].rstrip(')')
+                        udid = parts[1].strip().rstrip(b')')
                         # 验证是否为有效UDID（40字符或更长）
-                        if len(udid) >= 20 and '-' not in udid[:10]:
+                        if len(udid) >= 20 and b'-' not in udid[:10]:
                             name = parts[0].strip()
                             # 提取设备名（去掉iOS版本）
-                            if '(' in name:
-                                name = name.rsplit('(', 1)[0].strip()
-                            devices.append({"udid": udid, "name": name})
-    except Exception as e:
+                            if b'(' in name:
+                                name = name.rsplit(b'(', 1)[0].strip()
+                            devices.append({
+                                "udid": udid.decode("ascii", "replace"),
+                                "name": name.decode("utf-8", "replace"),
+                            })
+    except (OSError, subprocess.SubprocessError) as e:
         logger.debug(f"xcrun xctrace 检测失败: {e}")
-    
-    # 方法2: 使用 idevice_id (libimobiledevice)
-    if not devices:
-        try:
-            result = subprocess.run(
-                ["idevice_id", "-l"],
-                capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
-                udids = result.stdout.strip().split('\n')
-                for udid in udids:
-                    if udid.strip():
-                        devices.append({"udid": udid.strip(), "name": "iPhone"})
-        except Exception as e:
-            logger.debug(f"idevice_id 检测失败: {e}")
-    
+    return devices
+
+
+def _list_devices_idevice_id() -> List[Dict[str, str]]:
+    """使用 idevice_id (libimobiledevice) 检测真机"""
+    devices = []
+    try:
+        result = subprocess.run(
+            ["idevice_id", "-l"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=DEVICE_DETECT_TIMEOUT
+        )
+        if result.returncode == 0:
+            for udid in result.stdout.split():
+                devices.append({"udid": udid.decode("ascii", "replace"), "name": "iPhone"})
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"idevice_id 检测失败: {e}")
     return devices
 
 
@@ -86,10 +239,7 @@ class KuaishouiOS(BaseAutomation):
             custom_capabilities: 自定义设备能力配置
         """
         config = APPIUM_CONFIG["ios"]
-        capabilities = config["capabilities"].copy()
-        
-        if custom_capabilities:
-            capabilities.update(custom_capabilities)
+        capabilities = {**_BASE_CAPS, **(custom_capabilities or {})}
         
         # 自动检测设备UDID
         if capabilities.get("udid") == "auto" or not capabilities.get("udid"):
@@ -114,10 +264,24 @@ class KuaishouiOS(BaseAutomation):
             capabilities=capabilities
         )
         
-        self.elements = KUAISHOU_ELEMENTS["ios"]
-        self.processed_users = set()
+        self.elements = validate_locators(KUAISHOU_ELEMENTS["ios"])
+        self.processed_users = self._load_processed_users()  # 已处理的用户（启动时从CSV加载一次）
+        self._locator_winner.update(self._load_locator_winners())
+        self._follow_page = 0  # 关注列表当前滚动了几屏（相对于get_follow_list开始时的位置）
         self.processed_videos = set()
         
+    @classmethod
+    def from_udid(cls, udid: str, device_name: str = "iPhone", **custom_capabilities) -> "KuaishouiOS":
+        """
+        按已知的设备UDID创建实例，跳过设备自动检测（多设备编排时由调用方统一检测后分配）
+        
+        Args:
+            udid: 设备UDID
+            device_name: 设备名
+            **custom_capabilities: 其他自定义设备能力（如每台设备不同的webDriverAgentUrl/wdaLocalPort）
+        """
+        return cls({**custom_capabilities, "udid": udid, "deviceName": device_name})
+    
     def open_app(self) -> bool:
         """打开快手APP"""
         if not self.driver:
@@ -128,13 +292,15 @@ class KuaishouiOS(BaseAutomation):
         
         try:
             bundle_id = self.capabilities.get("bundleId", "com.kuaishou.nebula")
+            self.invalidate_ui_cache()
             self.driver.activate_app(bundle_id)
-            time.sleep(3)
+            # 等到首页底部的'我'标签出现（最多等原来固定等待的时间）
+            self.wait_for_element(self.elements["tab_me"], timeout=3)
             
             logger.success("快手APP启动成功")
             return True
             
-        except Exception as e:
+        except WebDriverException as e:
             logger.error(f"打开快手APP失败: {e}")
             return False
     
@@ -142,18 +308,12 @@ class KuaishouiOS(BaseAutomation):
         """导航到'我的'页面"""
         logger.info("正在导航到'我的'页面...")
         
-        me_locators = [
-            self.elements["tab_me"],
-            {"type": "accessibility_id", "value": "我的"},
-            {"type": "xpath", "value": "//XCUIElementTypeButton[@name='我']"},
-            {"type": "ios_predicate", "value": "label == '我' OR label == '我的'"},
-        ]
+        me_locators = (self.elements["tab_me"], *ME_LOCATORS)
         
-        for locator in me_locators:
-            if self.click_element(locator, timeout=5):
-                time.sleep(2)
-                logger.success("成功导航到'我的'页面")
-                return True
+        # 等到'我的'页面上的关注按钮出现
+        if self._click_first("navigate_to_me", me_locators, timeout=5, expect=self.elements["follow_button"]):
+            logger.success("成功导航到'我的'页面")
+            return True
         
         logger.error("无法找到'我的'标签")
         return False
@@ -162,18 +322,12 @@ class KuaishouiOS(BaseAutomation):
         """点击关注按钮进入关注列表"""
         logger.info("正在点击关注按钮...")
         
-        follow_locators = [
-            self.elements["follow_button"],
-            {"type": "accessibility_id", "value": "关注"},
-            {"type": "xpath", "value": "//XCUIElementTypeStaticText[contains(@name,'关注')]"},
-            {"type": "ios_predicate", "value": "label CONTAINS '关注'"},
-        ]
+        follow_locators = (self.elements["follow_button"], *FOLLOW_LOCATORS)
         
-        for locator in follow_locators:
-            if self.click_element(locator, timeout=5):
-                time.sleep(2)
-                logger.success("成功进入关注列表")
-                return True
+        # 等到关注列表的cell出现
+        if self._click_first("click_follow", follow_locators, timeout=5, expect=self.elements["follow_list_item"]):
+            logger.success("成功进入关注列表")
+            return True
         
         logger.error("无法找到关注按钮")
         return False
@@ -185,109 +339,106 @@ class KuaishouiOS(BaseAutomation):
         
         name = name.strip()
         
-        # 排除的关键词列表（筛选按钮、UI元素、功能按钮、状态文字等）
-        invalid_keywords = [
-            "我的关注",
-            "关注",
-            "取消关注",
-            "快手平台",
-            "快手官方",
-            "看作品",
-            "查看更多",
-            "全部",
-            "人）",  # "我的关注（3人）"
-            "综合排序",
-            "有更新",
-            "有看过",
-            "最新",
-            "最热",
-            "你可能感兴趣的人",
-            "你可能错过的更新",
-            "发私信",
-            "进店铺",
-            "已关注",
-            "设置备注",
-            "升级为快手号",
-            "加载中",
-            "批量管理",
-            "好评率",
-            "直播中",
-            "直播",
-            "看过",
-            "%",
-        ]
+        # 先按长度判断：空白用户名有效，过长的文本（简介、提示语等）无效，都不必再扫描关键词
+        if not name:
+            return True
+        if len(name) > MAX_USER_NAME_LENGTH:
+            logger.debug(f"过滤无效用户名(过长): {name}")
+            return False
         
-        for keyword in invalid_keywords:
-            if keyword in name:
-                logger.debug(f"过滤无效用户名(包含关键词): {name}")
-                return False
+        # 一次正则匹配检查所有排除关键词（包含百分号的，如"97% 好评率"）
+        if _INVALID_NAME_PATTERN.search(name):
+            logger.debug(f"过滤无效用户名(包含关键词): {name}")
+            return False
         
         # 排除纯数字
         if name.isdigit():
             logger.debug(f"过滤无效用户名(纯数字): {name}")
             return False
         
-        # 排除包含百分号的（如"97% 好评率"）
-        if "%" in name:
-            logger.debug(f"过滤无效用户名(包含百分号): {name}")
-            return False
-        
         # 允许空白用户名（有些用户就是没有名称）
         # 只要不是明显的UI元素关键词，就认为是有效用户
         
         return True
     
-    def _is_follow_user_cell(self, cell) -> bool:
-        """检查cell是否是真正的关注用户cell"""
-        try:
-            # 检查cell是否可点击（真正的用户cell应该是可点击的）
-            if not cell.is_displayed():
-                return False
-            
-            # 检查是否有头像元素（真正的用户cell通常有头像）
-            has_image = len(cell.find_elements("xpath", ".//XCUIElementTypeImage")) > 0
-            
-            # 获取cell中的所有文本元素
-            text_elements = cell.find_elements("xpath", ".//XCUIElementTypeStaticText")
-            if len(text_elements) < 1:
-                return False
-            
-            # 收集所有文本，找到最可能的用户名
-            all_texts = []
-            for elem in text_elements:
-                text = elem.text
-                if text and text.strip():
-                    all_texts.append(text.strip())
-            
-            # 如果没有文本，不是用户cell
-            if not all_texts:
-                return False
-            
-            # 找到最长的有效用户名（排除状态文字、按钮文字等）
-            valid_user_name = None
-            max_length = 0
-            
-            for text in all_texts:
-                if self._is_valid_user_name(text):
-                    # 排除状态文字（通常很短，如"直播中"、"有看过"）
-                    if len(text) <= 4 and any(keyword in text for keyword in ["中", "直播", "在线", "看过", "更新"]):
-                        continue
-                    # 选择最长的有效用户名
-                    if len(text) > max_length:
-                        valid_user_name = text
-                        max_length = len(text)
+    def _extract_follow_user_name(self, has_image: bool, texts: List[str]) -> Optional[str]:
+        """
+        从cell中取出关注用户的用户名（只根据已取出的cell信息判断，不访问设备）
+        判断是否为用户cell和挑选用户名共用同一次遍历
+        
+        Args:
+            has_image: cell中是否有头像元素
+            texts: cell中所有非空文本（已去除首尾空白）
             
-            # 真正的用户cell应该：有头像 或者 有足够长的有效用户名（至少3个字符）
-            if has_image:
-                # 有头像，认为是用户cell
-                return True
-            elif valid_user_name and len(valid_user_name) >= 3:
-                # 没有头像但用户名足够长，也可能是用户cell
-                return True
+        Returns:
+            用户名，不是真正的关注用户cell时返回None
+        """
+        # 找到最长的有效用户名（通常是真正的用户名）
+        user_name = None
+        for text in texts:
+            if not self._is_valid_user_name(text):
+                continue
+            # 排除状态文字（通常很短）
+            if len(text) <= 3 and any(keyword in text for keyword in ["中", "直播", "在线"]):
+                continue
+            if user_name is None or len(text) > len(user_name):
+                user_name = text
+        
+        # 有头像，认为是用户cell（真正的用户cell通常有头像）
+        if user_name is None or has_image:
+            return user_name
+        
+        # 没有头像时用户名要足够长（至少3个字符），且不能是状态文字（如"直播中"、"有看过"）
+        if len(user_name) < 3:
+            return None
+        if len(user_name) <= 4 and any(keyword in user_name for keyword in ["中", "直播", "在线", "看过", "更新"]):
+            return None
+        return user_name
+    
+    def _snapshot_follow_cells(self) -> List[Tuple[bool, List[str], Any]]:
+        """
+        取出当前画面关注列表中每个cell的 (是否有头像, 文本列表, 元素)
+        优先从一次页面快照中在本地解析（不再对每个cell发两次WDA查询），此时元素为None，点击时按用户名重新定位；
+        快照不可用时回退到逐个查询cell的子元素
+        """
+        tree = self.snapshot_tree()
+        if tree is not None:
+            for locator in (self.elements["follow_list_item"], {"type": "xpath", "value": FOLLOW_CELL_XPATH}):
+                if locator["type"] != "xpath":
+                    continue
+                nodes = [node for node in tree.xpath(locator["value"]) if node.get("visible") != "false"]
+                if nodes:
+                    return [(bool(node.xpath(CELL_IMAGE_XPATH)), self._node_texts(node), None) for node in nodes]
+        
+        # 整批读取只包一层try：读取途中列表刷新导致元素失效时，整批重新查询一次
+        for _ in range(2):
+            items = self.find_elements(self.elements["follow_list_item"], timeout=5)
+            if not items:
+                items = self.find_elements(FOLLOW_CELL_LOCATOR, timeout=5)
             
-            return False
-        except:
-            return False
+            try:
+                cells = []
+                for item in items:
+                    has_image = len(item.find_elements(AppiumBy.IOS_CLASS_CHAIN, CELL_IMAGE_CHAIN)) > 0
+                    texts = [elem.text.strip() for elem in item.find_elements(AppiumBy.IOS_CLASS_CHAIN, CELL_TEXT_CHAIN)
+                             if elem.text and elem.text.strip()]
+                    cells.append((has_image, texts, item))
+                return cells
+            except StaleElementReferenceException:
+                logger.debug("列表项已失效，重新查询")
+            except WebDriverException as e:
+                logger.debug(f"读取列表项失败: {e}")
+                break
+        return []
+    
+    def _node_texts(self, node) -> List[str]:
+        """取出页面快照节点下所有文本元素的非空文本（value优先，其次label，与元素的text一致）"""
+        texts = []
+        for child in node.xpath(CELL_TEXT_XPATH):
+            text = (child.get("value") or child.get("label") or "").strip()
+            if text:
+                texts.append(text)
+        return texts
     
     def get_follow_list(self) -> List[Dict[str, Any]]:
         """获取关注列表 - 只获取真正的关注用户cell"""
@@ -296,69 +447,108 @@ class KuaishouiOS(BaseAutomation):
         scroll_count = 0
         max_scrolls = 10
         seen_names = set()  # 用于去重
+        seen_cells = set()  # 已检查过的cell内容，滚动后仍在画面中的cell不再重复解析
         
         while len(follow_users) < LIMITS["max_follow_users"] and scroll_count < max_scrolls:
-            items = self.find_elements(self.elements["follow_list_item"], timeout=5)
+            # 每次滚动只取一次页面快照，在本地解析出所有cell的头像和文本
+            cells = self._snapshot_follow_cells()
             
-            if not items:
-                items = self.find_elements({
-                    "type": "xpath",
-                    "value": "//XCUIElementTypeTable//XCUIElementTypeCell"
-                }, timeout=5)
-            
-            for item_idx, item in enumerate(items):
-                try:
-                    # 先检查是否是真正的关注用户cell
-                    if not self._is_follow_user_cell(item):
-                        continue
-                    
-                    # 获取cell中的所有文本元素
-                    user_name_elements = item.find_elements(
-                        "xpath",
-                        ".//XCUIElementTypeStaticText"
-                    )
-                    
-                    # 找到最长的有效用户名（通常是真正的用户名）
-                    user_name = ""
-                    max_length = 0
-                    for elem in user_name_elements:
-                        text = elem.text
-                        if text and self._is_valid_user_name(text):
-                            text = text.strip()
-                            # 排除状态文字（通常很短）
-                            if len(text) <= 3 and any(keyword in text for keyword in ["中", "直播", "在线"]):
-                                continue
-                            # 选择最长的有效用户名
-                            if len(text) > max_length:
-                                user_name = text
-                                max_length = len(user_name)
-                    
-                    if user_name and user_name not in seen_names:
-                        user_info = {
-                            "name": user_name,
-                            "element": item,
-                            "index": len(follow_users),  # 在最终列表中的索引
-                            "list_index": item_idx,  # 在当前屏幕列表中的索引
-                        }
-                        follow_users.append(user_info)
-                        seen_names.add(user_name)
-                        logger.info(f"✅ 发现有效用户: {user_name} (索引: {len(follow_users)-1})")
-                        
-                except Exception as e:
-                    logger.debug(f"处理列表项时出错: {e}")
+            for item_idx, (has_image, texts, item) in enumerate(cells):
+                cell_key = (has_image, tuple(texts))
+                if cell_key in seen_cells:
                     continue
+                seen_cells.add(cell_key)
+                
+                # 检查是否是真正的关注用户cell，同时取出用户名（cell内容已全部读出，这里只有本地计算，不需要try）
+                user_name = self._extract_follow_user_name(has_image, texts)
+                if user_name and user_name not in seen_names:
+                    user_info = {
+                        "name": user_name,
+                        "index": len(follow_users),  # 在最终列表中的索引
+                        "list_index": item_idx,  # 在当前屏幕列表中的索引
+                        "page": scroll_count,  # 发现该用户时列表滚动了几屏，用于之后重新定位
+                    }
+                    if item is not None:
+                        user_info["element"] = item
+                    follow_users.append(user_info)
+                    seen_names.add(user_name)
+                    logger.info(f"✅ 发现有效用户: {user_name} (索引: {len(follow_users)-1})")
             
             prev_count = len(follow_users)
-            self.swipe_up(ratio=0.6)
+            self.swipe_up(ratio=FOLLOW_SCROLL_RATIO)
             scroll_count += 1
             
             if len(follow_users) == prev_count:
                 logger.info("已到达关注列表末尾")
                 break
         
+        self._follow_page = scroll_count
         logger.info(f"共获取 {len(follow_users)} 个有效关注用户")
         return follow_users
     
+    def _scroll_follow_list(self, forward: bool = True):
+        """关注列表滚动一屏（forward=False时按相同幅度反向滚回）"""
+        if forward:
+            self.swipe_up(ratio=FOLLOW_SCROLL_RATIO)
+            self._follow_page += 1
+            return
+        
+        self._follow_page -= 1
+        if not self.driver:
+            return
+        size = self.driver.get_window_size()
+        x = size['width'] // 2
+        # 与swipe_up的起止点相反
+        top = int(size['height'] * (0.8 - FOLLOW_SCROLL_RATIO * 0.6))
+        bottom = int(size['height'] * 0.8)
+        self.swipe(x, top, x, bottom)
+    
+    def _scroll_follow_list_to_top(self):
+        """关注列表滚动到顶部（mobile: scroll 由XCTest原生执行，每次请求滚动一整屏且滚动结束才返回，不需要额外等待）"""
+        scrolled = False
+        table = self.find_element(FOLLOW_TABLE_LOCATOR, timeout=2)
+        if table:
+            try:
+                # 一整屏比 swipe_up 一次滚动的距离长，按记录的滚动屏数执行足够回到顶部
+                for _ in range(max(self._follow_page, 1)):
+                    self.driver.execute_script("mobile: scroll", {"elementId": table.id, "direction": "up"})
+                scrolled = True
+            except WebDriverException as e:
+                logger.debug(f"原生滚动失败，改用滑动: {e}")
+        
+        if not scrolled:
+            for _ in range(3):
+                self.swipe_down(ratio=0.3)  # 向下滑动（向上浏览）
+                time.sleep(0.5)
+        self._follow_page = 0
+        self.invalidate_ui_cache()
+    
+    def relocate_follow_user(self, user_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        在关注列表中重新定位用户（回到列表后列表保持离开时的滚动位置，不必回到顶部重新抓取整个列表）
+        先在当前画面的页面快照中查找，找不到再按记录的滚动位置逐屏翻过去
+        
+        Args:
+            user_info: get_follow_list 返回的用户信息
+            
+        Returns:
+            重新定位后的用户信息（快照中找到时不含元素，点击时按用户名查找），找不到时返回None
+        """
+        user_name = user_info.get("name")
+        target_page = user_info.get("page", 0)
+        
+        while True:
+            for _, texts, item in self._snapshot_follow_cells():
+                if user_name in texts:
+                    located = {k: v for k, v in user_info.items() if k != "element"}
+                    if item is not None:
+                        located["element"] = item
+                    return located
+            
+            if self._follow_page == target_page:
+                return None
+            self._scroll_follow_list(forward=self._follow_page < target_page)
+    
     def enter_user_profile(self, user_info: Dict[str, Any]) -> bool:
         """进入用户主页"""
         user_name = user_info.get("name", "未知用户")
@@ -370,28 +560,30 @@ class KuaishouiOS(BaseAutomation):
             try:
                 # 检查元素是否仍然有效
                 if element.is_displayed():
+                    self.invalidate_ui_cache()
                     element.click()
-                    time.sleep(2)
+                    self.wait_for_element(self.elements["works_tab"], timeout=2)
                     logger.success(f"成功进入用户 [{user_name}] 的主页")
                     return True
-            except Exception as e:
+            except WebDriverException as e:
                 logger.debug(f"使用保存的元素失败，将重新定位: {e}")
         
         # 如果元素不可用，重新定位用户
         user_locators = [
             {"type": "ios_predicate", "value": f"label == '{user_name}'"},
             {"type": "ios_predicate", "value": f"label CONTAINS '{user_name}'"},
-            {"type": "xpath", "value": f"//XCUIElementTypeStaticText[@name='{user_name}']"},
-            {"type": "xpath", "value": f"//XCUIElementTypeCell[.//XCUIElementTypeStaticText[@name='{user_name}']]"},
+            {"type": "ios_class_chain", "value": f"**/XCUIElementTypeStaticText[`name == '{user_name}'`]"},
+            {"type": "ios_class_chain", "value": f"**/XCUIElementTypeCell[$name == '{user_name}'$]"},
         ]
         
         for locator in user_locators:
             element = self.find_element(locator, timeout=3)
             if element:
                 try:
+                    self.invalidate_ui_cache()
                     # 如果找到的是文本元素，尝试找到其父容器（Cell）
                     if element.tag_name == "StaticText":
-                        # 尝试点击父容器
+                        # 尝试点击父容器（class chain无法定位父节点，这里保留xpath）
                         parent = element.find_element("xpath", "..")
                         if parent:
                             parent.click()
@@ -399,10 +591,11 @@ class KuaishouiOS(BaseAutomation):
                             element.click()
                     else:
                         element.click()
-                    time.sleep(2)
+                    # 等到用户主页的'作品'标签出现
+                    self.wait_for_element(self.elements["works_tab"], timeout=2)
                     logger.success(f"成功进入用户 [{user_name}] 的主页")
                     return True
-                except Exception as e:
+                except WebDriverException as e:
                     logger.debug(f"点击元素失败: {e}")
                     continue
         
@@ -411,39 +604,44 @@ class KuaishouiOS(BaseAutomation):
     
     def click_works_tab(self) -> bool:
         """点击作品标签"""
-        works_locators = [
-            self.elements["works_tab"],
-            {"type": "ios_predicate", "value": "name BEGINSWITH '作品'"},
-            {"type": "ios_predicate", "value": "label BEGINSWITH '作品'"},
-            {"type": "xpath", "value": "//XCUIElementTypeButton[contains(@name, '作品')]"},
-        ]
+        works_locators = (self.elements["works_tab"], *WORKS_LOCATORS)
         
-        for locator in works_locators:
-            if self.click_element(locator, timeout=3):
-                time.sleep(1)
-                return True
-        return False
+        # 等到作品列表中的视频出现
+        return self._click_first("click_works_tab", works_locators, timeout=3, expect=self.elements["video_item"])
     
     def find_first_video(self):
         """找到当前屏幕上第一个可见的视频"""
-        video_locators = [
-            self.elements["video_item"],
-            {"type": "ios_predicate", "value": "name CONTAINS '作品点赞数'"},
-            {"type": "xpath", "value": "//XCUIElementTypeOther[contains(@name, '作品点赞数')]"},
-        ]
+        video_locators = (self.elements["video_item"], *VIDEO_LOCATORS)
+        
+        # 上次找到视频的定位器排在最前面
+        winner = self._locator_winner.get("find_first_video")
+        if winner is not None:
+            video_locators = (winner, *(locator for locator in video_locators if locator != winner))
         
         for locator in video_locators:
             items = self.find_elements(locator, timeout=3)
             if items:
-                # 找到visible=true的元素
-                for item in items:
-                    try:
-                        if item.is_displayed():
-                            return item
-                    except:
-                        continue
+                self._locator_winner["find_first_video"] = locator
+                # 从页面快照的visible属性找到第一个可见的视频（不再逐个调用is_displayed）
+                index = self._first_visible_index(VIDEO_ITEM_XPATH, len(items))
                 # 如果没有visible的，返回第一个
-                return items[0]
+                return items[index or 0]
+        return None
+    
+    def _first_visible_index(self, xpath: str, expected_count: int) -> Optional[int]:
+        """
+        在页面快照中按文档顺序查找节点，返回第一个visible为true的序号
+        节点数与元素查询结果数不一致时无法对应，返回None
+        """
+        tree = self.snapshot_tree()
+        if tree is None:
+            return None
+        nodes = tree.xpath(xpath)
+        if len(nodes) != expected_count:
+            return None
+        for index, node in enumerate(nodes):
+            if node.get("visible") == "true":
+                return index
         return None
     
     def get_user_videos(self) -> List[Dict[str, Any]]:
@@ -457,118 +655,77 @@ class KuaishouiOS(BaseAutomation):
         return True
     
     def _is_in_follow_list(self) -> bool:
-        """检查是否在关注列表页面 - 通过实际获取列表来验证"""
-        try:
-            # 快速获取列表（不滚动）
-            items = self.find_elements(self.elements["follow_list_item"], timeout=2)
-            if not items or len(items) < 3:
-                logger.debug(f"   列表项数量不足: {len(items) if items else 0}")
-                return False
-            
-            # 检查获取到的用户是否包含有效的用户名（排除筛选按钮等）
-            valid_users = []
-            for item in items[:10]:  # 检查前10个
-                try:
-                    user_name_elements = item.find_elements("xpath", ".//XCUIElementTypeStaticText")
-                    for elem in user_name_elements:
-                        text = elem.text
-                        if text and self._is_valid_user_name(text):
-                            valid_users.append(text)
-                            break
-                except:
-                    continue
-            
-            # 如果至少有3个有效用户，说明在关注列表
-            if len(valid_users) >= 3:
-                logger.debug(f"   检测到 {len(valid_users)} 个有效用户，在关注列表")
-                return True
-            else:
-                logger.debug(f"   有效用户数量不足: {len(valid_users)}")
-        except Exception as e:
-            logger.debug(f"   检测失败: {e}")
+        """检查是否在关注列表页面 - 页面快照中前10个cell里至少有3个有效用户"""
+        cells = self._snapshot_follow_cells()
+        if len(cells) < 3:
+            logger.debug(f"   列表项数量不足: {len(cells)}")
+            return False
+        
+        # 检查cell中是否包含有效的用户名（排除筛选按钮等）
+        valid_count = sum(
+            1 for _, texts, _ in cells[:10]
+            if any(self._is_valid_user_name(text) for text in texts)
+        )
         
+        # 如果至少有3个有效用户，说明在关注列表
+        if valid_count >= 3:
+            logger.debug(f"   检测到 {valid_count} 个有效用户，在关注列表")
+            return True
+        logger.debug(f"   有效用户数量不足: {valid_count}")
         return False
     
+    def _detect_page(self) -> str:
+        """
+        用一次页面快照判断当前所在页面
+        
+        Returns:
+            "follow_list"：关注列表；"tab_page"：带底部标签栏的首页/'我的'页面；
+            "other"：用户主页、视频详情等需要返回上一级的页面
+        """
+        tree = self.snapshot_tree()
+        if tree is None:
+            return "other"
+        if tree.xpath(FOLLOW_LIST_MARKER_XPATH):
+            return "follow_list"
+        if tree.xpath(TAB_BAR_XPATH):
+            return "tab_page"
+        if self._is_in_follow_list():
+            return "follow_list"
+        return "other"
+    
     def click_back_button(self) -> bool:
         """点击左上角的返回按钮"""
-        back_locators = [
-            {"type": "accessibility_id", "value": "返回"},
-            {"type": "ios_predicate", "value": "label == '返回'"},
-            {"type": "ios_predicate", "value": "name == '返回'"},
-            {"type": "xpath", "value": "//XCUIElementTypeButton[@name='返回']"},
-            {"type": "xpath", "value": "//XCUIElementTypeNavigationBar//XCUIElementTypeButton[1]"},
-            {"type": "xpath", "value": "//XCUIElementTypeButton[contains(@name,'返回') or contains(@label,'返回')]"},
-            # 尝试点击导航栏最左边的按钮
-            {"type": "xpath", "value": "//XCUIElementTypeNavigationBar/XCUIElementTypeButton[1]"},
-        ]
-        
-        for locator in back_locators:
-            try:
-                element = self.find_element(locator, timeout=1)
-                if element:
-                    element.click()
-                    time.sleep(1)
-                    logger.debug(f"   成功点击返回按钮: {locator.get('type')}")
-                    return True
-            except:
-                continue
+        # 返回后按钮所在页面被移除，等待按钮失效
+        if self._click_first("click_back_button", BACK_LOCATORS, timeout=1, stale=True):
+            logger.debug(f"   成功点击返回按钮: {self._locator_winner['click_back_button'].get('type')}")
+            return True
         
         logger.debug("   未找到返回按钮，使用系统返回")
         return False
     
     def ensure_back_to_follow_list(self) -> bool:
-        """确保返回到关注列表"""
+        """确保返回到关注列表（每一步先判断当前页面，只做需要的那一个动作）"""
         logger.info("正在返回到关注列表...")
         
-        # 尝试点击返回按钮（通常1次就能返回）
-        if self.click_back_button():
-            time.sleep(2)  # 等待页面加载
-            logger.success("✅ 已点击返回按钮，返回到关注列表")
-            return True
-        else:
-            # 如果找不到返回按钮，使用系统返回
-            self.go_back()
-            time.sleep(2)
-            logger.success("✅ 已使用系统返回，返回到关注列表")
-            return True
-        
-        # 如果多次返回后仍不在关注列表，尝试重新进入
-        logger.warning("多次返回后可能不在关注列表，尝试重新进入...")
-        
-        # 如果多次返回后仍不在关注列表，尝试重新进入
-        logger.warning("多次返回后仍不在关注列表，尝试重新进入...")
-        
-        # 先尝试返回到"我的"页面（使用返回按钮）
-        for back_attempt in range(5):
-            if self.click_back_button():
-                time.sleep(1.5)
-            else:
-                self.go_back()
-                time.sleep(1.5)
-            
-            # 检查是否在"我的"页面（通过检查是否有"关注"按钮）
-            if self.is_element_present(self.elements["follow_button"], timeout=2):
-                logger.info(f"   已返回到'我的'页面（尝试 {back_attempt + 1} 次），重新进入关注列表...")
-                if self.click_follow():
-                    time.sleep(2)
-                    if self._is_in_follow_list():
-                        logger.success("✅ 已重新进入关注列表")
-                        return True
+        for _ in range(MAX_BACK_STEPS):
+            page = self._detect_page()
+            if page == "follow_list":
+                logger.success("✅ 已返回到关注列表")
+                return True
+            if page == "tab_page":
                 break
+            
+            # 用户主页、视频详情等：返回一级后重新判断
+            if not self.click_back_button():
+                self.go_back()
         
-        # 最后尝试：完全重新导航
-        logger.warning("尝试完全重新导航到关注列表...")
-        if self.navigate_to_me():
-            time.sleep(1)
-            if self.click_follow():
-                time.sleep(3)
-                # 滚动到顶部
-                for _ in range(3):
-                    self.swipe_down(ratio=0.3)
-                    time.sleep(0.5)
-                if self._is_in_follow_list():
-                    logger.success("✅ 已重新进入关注列表")
-                    return True
+        # 已退回到首页/'我的'页面，或多次返回后仍不在关注列表：重新导航
+        logger.warning("不在关注列表，重新导航到关注列表...")
+        if self.navigate_to_me() and self.click_follow():
+            self._scroll_follow_list_to_top()
+            if self._is_in_follow_list():
+                logger.success("✅ 已重新进入关注列表")
+                return True
         
         logger.error("❌ 无法返回到关注列表")
         return False
@@ -584,6 +741,7 @@ class KuaishouiOS(BaseAutomation):
         """
         from PIL import Image
         import io
+        import numpy as np
         
         screenshots = []
         processed_count = 0
@@ -596,27 +754,25 @@ class KuaishouiOS(BaseAutomation):
         # 先点击作品标签
         logger.info("正在点击作品标签...")
         self.click_works_tab()
-        time.sleep(2)
         
-        # 点击第一个视频进入详情页
+        # 点击第一个视频进入详情页（查找时会等待视频出现）
         logger.info("正在点击第一个视频...")
         first_video = self.find_first_video()
         if not first_video:
             logger.warning("没有找到视频，尝试备用定位...")
-            first_video = self.find_element({
-                "type": "xpath",
-                "value": "//XCUIElementTypeOther[contains(@name, '作品点赞数')]"
-            }, timeout=5)
+            first_video = self.find_element(VIDEO_ITEM_CHAIN_LOCATOR, timeout=5)
         
         if not first_video:
             logger.error("无法找到任何视频")
             return screenshots
         
         try:
+            self.invalidate_ui_cache()
             first_video.click()
             logger.success("成功点击视频，进入详情页")
-            time.sleep(2)  # 等待详情页加载
-        except Exception as e:
+            # 详情页是全屏播放，等待主页的'作品'标签消失
+            self.wait_for_element(self.elements["works_tab"], timeout=2, present=False)
+        except WebDriverException as e:
             logger.error(f"点击视频失败: {e}")
             return screenshots
         
@@ -627,15 +783,16 @@ class KuaishouiOS(BaseAutomation):
         logger.info(f"屏幕尺寸: {screen_width}x{screen_height}")
         
         # 在详情页循环处理视频
-        last_description = ""
+        last_hash = None  # 上一张描述区域的哈希
         while processed_count < max_videos:
             try:
                 logger.info(f"正在处理第 {processed_count + 1} 个视频...")
                 
                 # 截取全屏
                 full_screenshot = self.driver.get_screenshot_as_png()
-                full_image = Image.open(io.BytesIO(full_screenshot))
-                img_width, img_height = full_image.size
+                # 只解码一次，之后裁剪都是numpy切片（不复制像素）
+                full_image = np.asarray(Image.open(io.BytesIO(full_screenshot)))
+                img_height, img_width = full_image.shape[:2]
                 logger.debug(f"截图尺寸: {img_width}x{img_height}")
                 
                 # 计算底部文字描述区域（大约在屏幕75%-95%的位置）
@@ -648,14 +805,31 @@ class KuaishouiOS(BaseAutomation):
                 crop_left = int(img_width * 0.02)  # 左边留一点边距
                 crop_right = int(img_width * 0.85)  # 右边不要包含点赞等按钮
                 
-                # 裁剪底部描述区域
-                description_area = full_image.crop((crop_left, crop_top, crop_right, crop_bottom))
+                # 裁剪底部描述区域（去掉alpha通道，保存时少编码四分之一的数据）
+                description_area = full_image[crop_top:crop_bottom, crop_left:crop_right, :3]
+                
+                # 与上一张描述区域比较，画面几乎相同说明上滑后没有切到新视频（已到末尾），不再保存重复截图
+                area_hash = frame_hash(np.ascontiguousarray(description_area[:, :, ::-1]))
+                if last_hash is not None and bin(area_hash ^ last_hash).count("1") < SCREENSHOT_CONFIG["dedup_distance"]:
+                    no_new_content_count += 1
+                    logger.info(f"检测到相同内容 ({no_new_content_count}/{max_no_new_content})")
+                    if no_new_content_count >= max_no_new_content:
+                        logger.info("✅ 连续多次检测到相同内容，已到达视频列表末尾")
+                        break
+                    self.swipe_up(ratio=0.7)
+                    time.sleep(2)  # 等待视频加载
+                    continue
+                no_new_content_count = 0
+                last_hash = area_hash
                 
                 # 保存截图
                 timestamp = int(time.time() * 1000)
                 filename = f"desc_{processed_count}_{timestamp}.png"
                 filepath = SCREENSHOTS_DIR / filename
-                description_area.save(filepath)
+                # 用低压缩级别保存（只编码裁剪后的区域）
+                Image.fromarray(description_area).save(
+                    filepath, optimize=False, compress_level=SCREENSHOT_CONFIG["png_compress_level"]
+                )
                 
                 logger.success(f"✅ 截取视频描述区域: {filename}")
                 screenshots.append(filepath)
@@ -671,31 +845,6 @@ class KuaishouiOS(BaseAutomation):
                 self.swipe_up(ratio=0.7)  # 大幅度上滑切换视频
                 time.sleep(2)  # 等待视频加载
                 
-                # 检查是否还有新视频（通过截图对比或其他方式）
-                # 简单方法：尝试获取当前视频的描述文字
-                try:
-                    desc_element = self.find_element({
-                        "type": "xpath",
-                        "value": "//XCUIElementTypeTextView | //XCUIElementTypeStaticText[string-length(@label) > 20]"
-                    }, timeout=2)
-                    
-                    if desc_element:
-                        current_desc = desc_element.get_attribute("value") or desc_element.get_attribute("label") or ""
-                        if current_desc and current_desc == last_description:
-                            no_new_content_count += 1
-                            logger.info(f"检测到相同内容 ({no_new_content_count}/{max_no_new_content})")
-                        else:
-                            no_new_content_count = 0
-                            last_description = current_desc
-                    else:
-                        no_new_content_count = 0
-                except:
-                    no_new_content_count = 0  # 获取失败就继续
-                
-                if no_new_content_count >= max_no_new_content:
-                    logger.info("✅ 连续多次检测到相同内容，已到达视频列表末尾")
-                    break
-                    
             except Exception as e:
                 logger.error(f"处理视频时出错: {e}")
                 no_new_content_count += 1
@@ -707,20 +856,16 @@ class KuaishouiOS(BaseAutomation):
         
         # 第一次返回：从详情页返回到作品列表
         logger.info("第一次返回：从详情页返回到作品列表...")
-        if self.click_back_button():
-            time.sleep(2)
-        else:
+        if not self.click_back_button():
             self.go_back()
-            time.sleep(2)
+        self.wait_for_element(self.elements["video_item"], timeout=2)
         logger.success("✅ 已返回到作品列表")
         
         # 第二次返回：从作品列表返回到关注列表（直接返回，不经过用户主页）
         logger.info("第二次返回：从作品列表返回到关注列表...")
-        if self.click_back_button():
-            time.sleep(2)
-        else:
+        if not self.click_back_button():
             self.go_back()
-            time.sleep(2)
+        self.wait_for_element(self.elements["follow_list_item"], timeout=2)
         logger.success("✅ 已返回到关注列表")
         
         return screenshots
@@ -735,48 +880,34 @@ class KuaishouiOS(BaseAutomation):
         """从CSV加载已处理的用户列表"""
         processed_users = set()
         try:
-            import pandas as pd
-            from config import DATA_DIR
-            
-            processed_file = DATA_DIR / "processed_users.csv"
+            processed_file = DATA_DIR / PROCESSED_USERS_FILE
             if processed_file.exists():
-                df = pd.read_csv(processed_file)
-                if 'user_name' in df.columns:
-                    processed_users = set(df['user_name'].dropna().astype(str))
-                    logger.info(f"从CSV加载了 {len(processed_users)} 个已处理用户")
-        except Exception as e:
+                # 两列的小文件，用标准库csv逐行读取即可
+                with open(processed_file, newline="", encoding="utf-8-sig") as f:
+                    processed_users = {row["user_name"] for row in csv.DictReader(f) if row.get("user_name")}
+                logger.info(f"从CSV加载了 {len(processed_users)} 个已处理用户")
+        except (OSError, csv.Error, KeyError) as e:
             logger.debug(f"加载已处理用户列表失败: {e}")
         
         return processed_users
     
     def _save_processed_user(self, user_name: str):
-        """保存已处理的用户到CSV"""
+        """保存已处理的用户到CSV（内存中的集合为准，新用户只向文件追加一行）"""
+        if user_name in self.processed_users:
+            return
+        self.processed_users.add(user_name)
+        
         try:
-            import pandas as pd
-            from config import DATA_DIR
-            from datetime import datetime
+            processed_file = DATA_DIR / PROCESSED_USERS_FILE
+            write_header = not processed_file.exists() or processed_file.stat().st_size == 0
             
-            processed_file = DATA_DIR / "processed_users.csv"
-            
-            new_record = {
-                'user_name': user_name,
-                'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            if processed_file.exists():
-                df = pd.read_csv(processed_file)
-                # 检查是否已存在
-                if user_name not in df['user_name'].values:
-                    df = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
-                else:
-                    # 更新处理时间
-                    df.loc[df['user_name'] == user_name, 'processed_at'] = new_record['processed_at']
-            else:
-                df = pd.DataFrame([new_record])
-            
-            df.to_csv(processed_file, index=False, encoding='utf-8-sig')
+            with open(processed_file, "a", newline="", encoding="utf-8-sig") as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(["user_name", "processed_at"])
+                writer.writerow([user_name, datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
             logger.debug(f"已保存用户 {user_name} 到已处理列表")
-        except Exception as e:
+        except OSError as e:
             logger.warning(f"保存已处理用户失败: {e}")
     
     def process_all_follows(self, on_screenshot_callback=None):
@@ -801,14 +932,14 @@ class KuaishouiOS(BaseAutomation):
             logger.warning("关注列表为空")
             return screenshots
         
-        # 加载已处理的用户列表
-        processed_users = self._load_processed_users()
+        # 已处理的用户在初始化时已从CSV加载
+        skipped_count = len(self.processed_users)
         
         # 过滤掉已处理的用户
-        unprocessed_list = [u for u in follow_list if u.get('name') not in processed_users]
+        unprocessed_list = [u for u in follow_list if u.get('name') not in self.processed_users]
         
         if len(unprocessed_list) < len(follow_list):
-            logger.info(f"📋 共找到 {len(follow_list)} 个关注用户，其中 {len(processed_users)} 个已处理，剩余 {len(unprocessed_list)} 个待处理")
+            logger.info(f"📋 共找到 {len(follow_list)} 个关注用户，其中 {skipped_count} 个已处理，剩余 {len(unprocessed_list)} 个待处理")
         else:
             logger.info(f"📋 共找到 {len(follow_list)} 个关注用户，开始递归处理...")
         
@@ -819,56 +950,22 @@ class KuaishouiOS(BaseAutomation):
             logger.info(f"正在处理用户 {user_idx + 1}/{len(follow_list)}: {user_name}")
             logger.info(f"{'='*60}")
             
-            # 如果不是第一个用户，需要先返回到关注列表
-            if user_idx > 0:
-                # process_user_videos 已经返回到关注列表了，只需要滚动到顶部
-                logger.info("滚动到关注列表顶部...")
-                for _ in range(3):
-                    self.swipe_down(ratio=0.3)  # 向下滑动（向上浏览）
-                    time.sleep(0.5)
-                time.sleep(1)
-                
-                # 使用保存的索引位置直接获取用户
-                saved_index = user_info.get("index", user_idx)
-                logger.info(f"使用保存的索引位置 {saved_index} 重新定位用户: {user_name}")
-                
-                # 重新获取关注列表（从顶部开始）
+            # 列表保持着上次离开时的滚动位置，按记录的滚动位置翻到用户所在的那一屏（不再从顶部重新抓取整个列表）
+            located = self.relocate_follow_user(user_info)
+            if located:
+                user_info = located
+            else:
+                # 回退：滚动到顶部重新获取关注列表，按名称查找
+                logger.warning(f"按滚动位置未找到用户: {user_name}，重新获取关注列表...")
+                self._scroll_follow_list_to_top()
                 current_follows = self.get_follow_list()
-                
-                # 优先使用索引位置
-                if saved_index < len(current_follows):
-                    matching_user = current_follows[saved_index]
-                    if matching_user.get("name") == user_name:
-                        user_info = matching_user
-                        logger.success(f"✅ 通过索引位置成功定位用户: {user_name}")
-                    else:
-                        # 索引位置不对，尝试按名称查找
-                        logger.warning(f"索引位置用户不匹配（期望: {user_name}, 实际: {matching_user.get('name')}），尝试按名称查找...")
-                        matching_user = None
-                        for u in current_follows:
-                            if u.get("name") == user_name:
-                                matching_user = u
-                                break
-                        if matching_user:
-                            user_info = matching_user
-                            logger.success(f"✅ 通过名称成功定位用户: {user_name}")
-                        else:
-                            logger.warning(f"❌ 无法重新定位用户: {user_name}，跳过")
-                            continue
-                else:
-                    # 索引超出范围，尝试按名称查找
-                    logger.warning(f"索引超出范围，尝试按名称查找...")
-                    matching_user = None
-                    for u in current_follows:
-                        if u.get("name") == user_name:
-                            matching_user = u
-                            break
-                    if matching_user:
-                        user_info = matching_user
-                        logger.success(f"✅ 通过名称成功定位用户: {user_name}")
-                    else:
-                        logger.warning(f"❌ 无法重新定位用户: {user_name}，跳过")
-                        continue
+                matching_user = next((u for u in current_follows if u.get("name") == user_name), None)
+                located = self.relocate_follow_user(matching_user) if matching_user else None
+                if not located:
+                    logger.warning(f"❌ 无法重新定位用户: {user_name}，跳过")
+                    continue
+                user_info = located
+                logger.success(f"✅ 通过名称成功定位用户: {user_name}")
             
             # 进入用户主页
             if not self.enter_user_profile(user_info):
@@ -884,21 +981,46 @@ class KuaishouiOS(BaseAutomation):
             # 保存已处理的用户
             self._save_processed_user(user_name)
             
-            # process_user_videos 已经返回到了关注列表，不需要再次返回
-            # 只需要等待页面稳定即可
+            # process_user_videos 已经返回到了关注列表并等到列表出现，不需要再次返回
             if user_idx < len(unprocessed_list) - 1:  # 不是最后一个用户
                 logger.info("")
                 logger.info("准备处理下一个用户...")
-                time.sleep(1)  # 等待页面稳定
         
         logger.info("")
         logger.success(f"{'='*60}")
         logger.success(f"🎉 所有用户处理完成！共截取 {len(screenshots)} 张截图")
         logger.success(f"   已处理用户数: {len(unprocessed_list)}")
-        logger.success(f"   已跳过用户数: {len(processed_users)}")
+        logger.success(f"   已跳过用户数: {skipped_count}")
         logger.success(f"{'='*60}")
         return screenshots
     
+    def _load_locator_winners(self) -> Dict[str, Dict[str, str]]:
+        """加载上次运行记录的各步骤成功定位器"""
+        winners_file = DATA_DIR / LOCATOR_WINNERS_FILE
+        if not winners_file.exists():
+            return {}
+        try:
+            data = json.loads(winners_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.debug(f"加载定位器记录失败: {e}")
+            return {}
+        return {
+            step: locator for step, locator in data.items()
+            if isinstance(locator, dict) and isinstance(locator.get("type"), str) and isinstance(locator.get("value"), str)
+        }
+    
+    def _save_locator_winners(self):
+        """保存各步骤成功的定位器，下次运行时优先尝试"""
+        if not self._locator_winner:
+            return
+        try:
+            (DATA_DIR / LOCATOR_WINNERS_FILE).write_text(
+                json.dumps(self._locator_winner, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+        except OSError as e:
+            logger.debug(f"保存定位器记录失败: {e}")
+    
     def close(self):
         """关闭自动化连接"""
+        self._save_locator_winners()
         self.disconnect()
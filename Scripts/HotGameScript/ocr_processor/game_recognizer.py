@@ -4,9 +4,12 @@
 使用OCR和自然语言处理从截图中提取游戏名称
 支持网络搜索验证游戏名称
 """
+import json
+import os
 import re
+import threading
 import time
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 from urllib.parse import quote
 
@@ -46,25 +49,181 @@ except ImportError:
 
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
-from config import OCR_CONFIG, GAME_KEYWORDS, EXCLUDE_KEYWORDS, GAMES_CSV_PATH
+from config import (
+    OCR_CONFIG,
+    GAME_KEYWORDS,
+    EXCLUDE_KEYWORDS,
+    GAMES_CSV_PATH,
+    VERIFY_CACHE_PATH,
+    SEARCH_CACHE_TTL
+)
+
+
+# 网络验证游戏名使用的搜索地址和请求头
+VERIFY_SEARCH_URL = "https://www.baidu.com/s?wd={}"
+VERIFY_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+# 批量网络验证时的最大并发请求数
+VERIFY_CONCURRENCY = 8
+
+# 中文字符、英文字母（统计数量时在C层匹配，不在Python中逐字符比较）
+_CHINESE_CHAR_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+_ENGLISH_CHAR_PATTERN = re.compile(r'[A-Za-z]')
+
+
+def _compile_keywords(keywords) -> "re.Pattern":
+    """把关键词列表编译为一个正则（长的优先），一次扫描判断是否包含任一关键词"""
+    return re.compile("|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)))
+
+
+def _compile_suffixes(suffixes, repeat: bool = False) -> "re.Pattern":
+    """
+    把后缀列表编译为锚定在结尾的正则，search找到的最左匹配即最长的后缀
+    repeat为True时结尾连续的多个后缀一起匹配
+    """
+    return re.compile(f"(?:{_compile_keywords(suffixes).pattern}){'+' if repeat else ''}\\Z")
+
+
+# 标签：#后面跟着的中英文字符
+_HASHTAG_PATTERN = re.compile(r'#([^\s#@，。！？、：；""【】《》\[\]]+)')
+
+# OCR结果中需要过滤掉的教程类文本
+_FILTER_TEXT_PATTERN = _compile_keywords(['教程', '安装教程', '机版安装', '攻略', '礼包码'])
+
+# 从标签中提取游戏名时去掉的后缀（只去掉一个）
+_HASHTAG_SUFFIX_PATTERN = _compile_suffixes([
+    '怎么下载', '安卓下载', '苹果下载', 'ios下载',
+    '手机版下载', '电脑版下载', '最新版下载',
+    '下载安装', '安装教程', '下载教程',
+    '下载', '安装', '攻略', '礼包', '礼包码',
+    '手机版', '电脑版', '安卓版', 'ios版',
+    '官方版', '正版', '破解版', '汉化版',
+    '最新版', '老版本', '新版本',
+])
+
+# 从普通文本中提取游戏名时去掉的后缀和前缀（连续的多个一起去掉）
+_TEXT_SUFFIX_PATTERN = _compile_suffixes([
+    '官方版', '正版', '手游', '手机版', '最新版', '中文版',
+    '汉化版', '安卓版', '下载', '安装包', 'apk', 'APK',
+    '破解版', '无限', '免费', '礼包码', '攻略',
+], repeat=True)
+_TEXT_PREFIX_PATTERN = re.compile(
+    f"\\A(?:{_compile_keywords(['下载', '推荐', '热门', '最新', '免费']).pattern})+"
+)
+
+# 网络验证前去掉的后缀（连续的多个一起去掉），以及清理后仍包含即不是游戏名的关键词
+_VERIFY_SUFFIX_PATTERN = _compile_suffixes(
+    ['老版本', '新版本', '安装教程', '教程', '攻略', '下载', '安装包', '手机版', '电脑版', '安卓版'],
+    repeat=True
+)
+_NOT_GAME_PATTERN = _compile_keywords(['教程', '版本', '安装', '下载', '攻略', '礼包', '加面', '机版'])
+
+# 排除关键词（config.EXCLUDE_KEYWORDS）
+_EXCLUDE_PATTERN = _compile_keywords(EXCLUDE_KEYWORDS)
+
+# CSV固定列（标签列tag_N追加在后面）
+CSV_BASE_COLUMNS = ['screenshot', 'game_name', 'hashtags', 'created_at']
+
+
+def _read_csv_header(csv_path: Path) -> Optional[List[str]]:
+    """读取CSV文件的表头，文件不存在或为空时返回None"""
+    import csv
+    
+    if not csv_path.exists() or csv_path.stat().st_size == 0:
+        return None
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), None)
+
+
+class CSVAppender:
+    """
+    CSV追加写入器
+    沿用已有文件的表头；已有表头中没有的标签列只保留在hashtags列中，
+    最终由save_to_csv整体重写补齐
+    """
+    
+    def __init__(self, csv_path: Path, to_row, saved: Set[str] = None):
+        """
+        Args:
+            csv_path: CSV文件路径
+            to_row: 把识别结果转换为CSV行的函数
+            saved: 已完整写入文件的截图名集合（写入完整的行后加入，save_to_csv据此跳过这些行）
+        """
+        import csv
+        
+        self.csv_path = csv_path
+        self._to_row = to_row
+        self._saved = saved
+        
+        fieldnames = _read_csv_header(csv_path)
+        
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(csv_path, 'a', newline='', encoding='utf-8-sig')
+        self._fieldnames = fieldnames or CSV_BASE_COLUMNS
+        self._writer = csv.DictWriter(
+            self._file,
+            fieldnames=self._fieldnames,
+            extrasaction='ignore'
+        )
+        if not fieldnames:
+            self._writer.writeheader()
+    
+    def write(self, result: Dict[str, Any]):
+        """追加一条识别结果并立即刷新到磁盘"""
+        row = self._to_row(result)
+        self._writer.writerow(row)
+        self._file.flush()
+        
+        # 表头缺少该行的标签列时不算完整写入，留给save_to_csv重写补齐
+        if self._saved is not None and row['screenshot'] and set(row) <= set(self._fieldnames):
+            self._saved.add(row['screenshot'])
+    
+    def close(self):
+        """关闭文件"""
+        if not self._file.closed:
+            self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 class GameRecognizer:
     """游戏名称识别器"""
     
-    def __init__(self, use_paddle: bool = True):
+    # 所有识别器共用的PaddleOCR引擎（按是否快速模式区分），首次识别时才加载模型
+    _engines: Dict[bool, Any] = {}
+    _engine_init_lock = threading.Lock()
+    # PaddleOCR引擎不是线程安全的，引擎共用，推理也在所有识别器之间串行执行
+    _ocr_lock = threading.Lock()
+    
+    def __init__(self, use_paddle: bool = True, fast: Optional[bool] = None):
         """
         初始化游戏名称识别器
         
         Args:
             use_paddle: 是否优先使用PaddleOCR
+            fast: 是否使用快速模式（轻量模型、不做方向分类、限制检测输入尺寸），为None时使用OCR_CONFIG["fast"]
         """
-        self.ocr_engine = None
         self.use_paddle = use_paddle and HAS_PADDLE_OCR
+        self.fast = OCR_CONFIG["fast"] if fast is None else fast
         
         # 已识别的游戏名称缓存
         self.recognized_games: Set[str] = set()
         
+        # 已保存在GAMES_CSV_PATH中的截图名（save_to_csv只追加不在其中的行）
+        self._csv_screenshots: Set[str] = set()
+        
+        # 网络验证结果缓存（键为清理后文本的小写形式，值为 {"time": 写入时间, "result": 验证结果}）
+        self._verify_cache: Dict[str, Dict[str, Any]] = {}
+        self._verify_cache_dirty = False
+        self._load_verify_cache()
+        
         # 初始化OCR引擎
         self._init_ocr()
         
@@ -72,32 +231,133 @@ class GameRecognizer:
         self._load_existing_games()
     
     def _init_ocr(self):
-        """初始化OCR引擎"""
+        """选择OCR引擎（PaddleOCR模型在首次识别时才加载，只做标签提取、网络验证时不加载）"""
         if self.use_paddle:
-            try:
-                # 使用最简参数初始化（兼容所有版本）
-                self.ocr_engine = PaddleOCR(
-                    use_angle_cls=True,
-                    lang="ch",
-                )
-                logger.info("PaddleOCR引擎初始化成功")
-            except Exception as e:
-                logger.error(f"PaddleOCR初始化失败: {e}")
-                self.use_paddle = False
-        
-        if not self.use_paddle and HAS_TESSERACT:
+            logger.debug("使用PaddleOCR作为OCR引擎（首次识别时加载模型）")
+        elif HAS_TESSERACT:
             logger.info("使用Tesseract作为OCR引擎")
-        elif not self.use_paddle and not HAS_TESSERACT:
+        else:
             logger.warning("没有可用的OCR引擎，OCR功能将被禁用")
     
+    @property
+    def ocr_engine(self):
+        """共用的PaddleOCR引擎（首次访问时加载），未使用PaddleOCR或初始化失败时为None"""
+        if not self.use_paddle:
+            return None
+        return self._get_engine(self.fast)
+    
+    @classmethod
+    def _get_engine(cls, fast: bool):
+        """取得共用的PaddleOCR引擎，不存在时创建（初始化失败也记录下来，不再重复尝试）"""
+        with cls._engine_init_lock:
+            if fast not in cls._engines:
+                try:
+                    cls._engines[fast] = PaddleOCR(**cls._paddle_options(fast))
+                    logger.info("PaddleOCR引擎初始化成功")
+                except Exception as e:
+                    logger.error(f"PaddleOCR初始化失败: {e}")
+                    cls._engines[fast] = None
+            return cls._engines[fast]
+    
+    @classmethod
+    def _paddle_options(cls, fast: bool) -> Dict[str, Any]:
+        """
+        PaddleOCR初始化参数
+        3.x（有predict方法）与2.x的参数名不同，3.x不接受未知参数，按版本分别设置
+        
+        Args:
+            fast: 是否快速模式
+        """
+        options = {"lang": OCR_CONFIG["lang"]}
+        use_gpu = OCR_CONFIG["use_gpu"]
+        if hasattr(PaddleOCR, "predict"):
+            if use_gpu:
+                # GPU推理（使用TensorRT子图时按半精度计算）
+                options.update(device="gpu", precision="fp16")
+            else:
+                # CPU上用oneDNN(MKL-DNN)加速的算子
+                options.update(device="cpu", enable_mkldnn=True, cpu_threads=OCR_CONFIG["cpu_threads"])
+            if OCR_CONFIG["enable_hpi"]:
+                # 高性能推理：自动选择OpenVINO/ONNX Runtime/TensorRT后端（需要先安装依赖，见README）
+                options["enable_hpi"] = True
+            options["use_textline_orientation"] = not fast
+            # 识别阶段把检测出的多行文本攒成一批推理（3.x默认逐行推理）
+            options["text_recognition_batch_size"] = OCR_CONFIG["rec_batch_size"]
+            if fast:
+                # 截图标题区域是正向的屏幕文字，不需要文档方向分类和矫正；PP-OCRv4为轻量模型
+                options.update(
+                    ocr_version="PP-OCRv4",
+                    use_doc_orientation_classify=False,
+                    use_doc_unwarping=False,
+                    text_det_limit_side_len=OCR_CONFIG["det_limit_side_len"],
+                    text_det_limit_type="max",
+                )
+        else:
+            options["use_gpu"] = use_gpu
+            if not use_gpu:
+                options.update(enable_mkldnn=True, cpu_threads=OCR_CONFIG["cpu_threads"])
+            options["use_angle_cls"] = not fast
+            options["rec_batch_num"] = OCR_CONFIG["rec_batch_size"]
+            if fast:
+                options.update(
+                    ocr_version="PP-OCRv4",
+                    det_limit_side_len=OCR_CONFIG["det_limit_side_len"],
+                    det_limit_type="max",
+                )
+        return options
+    
+    def _load_verify_cache(self):
+        """从磁盘加载未过期的网络验证结果"""
+        if not VERIFY_CACHE_PATH.exists():
+            return
+        
+        try:
+            with open(VERIFY_CACHE_PATH, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取验证缓存失败: {e}")
+            return
+        
+        now = time.time()
+        self._verify_cache = {
+            cache_key: entry for cache_key, entry in entries.items()
+            if now - entry.get("time", 0) < SEARCH_CACHE_TTL and "result" in entry
+        }
+        if self._verify_cache:
+            logger.info(f"加载了 {len(self._verify_cache)} 条网络验证缓存")
+    
+    def save_verify_cache(self):
+        """把网络验证结果写入磁盘（先写临时文件再替换，中途退出不会损坏原文件）"""
+        if not self._verify_cache_dirty:
+            return
+        
+        try:
+            VERIFY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = VERIFY_CACHE_PATH.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._verify_cache, f, ensure_ascii=False)
+            os.replace(tmp_path, VERIFY_CACHE_PATH)
+            self._verify_cache_dirty = False
+        except Exception as e:
+            logger.warning(f"保存验证缓存失败: {e}")
+    
+    def close(self):
+        """结束识别（保存网络验证缓存）"""
+        self.save_verify_cache()
+    
     def _load_existing_games(self):
         """从CSV文件加载已有的游戏名称"""
         try:
             if GAMES_CSV_PATH.exists():
-                import pandas as pd
-                df = pd.read_csv(GAMES_CSV_PATH)
-                if 'game_name' in df.columns:
-                    self.recognized_games = set(df['game_name'].dropna().tolist())
+                # 只需要game_name和screenshot两列，用标准库csv逐行读取（不导入pandas、不解析标签列）
+                import csv
+                with open(GAMES_CSV_PATH, 'r', newline='', encoding='utf-8-sig') as f:
+                    for row in csv.DictReader(f):
+                        if row.get('game_name'):
+                            self.recognized_games.add(row['game_name'])
+                        if row.get('screenshot'):
+                            self._csv_screenshots.add(row['screenshot'])
+                if self.recognized_games:
                     logger.info(f"从CSV加载了 {len(self.recognized_games)} 个已识别的游戏")
         except Exception as e:
             logger.warning(f"加载已有游戏数据时出错: {e}")
@@ -154,20 +414,23 @@ class GameRecognizer:
         
         return texts
     
-    def ocr_image(self, image_path: Path) -> List[str]:
+    def ocr_image(self, image_path: Path, image=None) -> List[str]:
         """
         对图片进行OCR识别（合并Mac Vision和PaddleOCR的结果）
         
         Args:
             image_path: 图片路径
+            image: 已解码的图片（BGR格式的numpy数组），传入时不再从磁盘读取
             
         Returns:
             识别出的文本列表
         """
-        if not image_path.exists():
+        if image is None and not image_path.exists():
             logger.error(f"图片不存在: {image_path}")
             return []
         
+        source = str(image_path) if image is None else image
+        
         all_texts = []
         
         # 方法1: Mac Vision OCR（对带特效文字效果不好，暂时禁用）
@@ -179,60 +442,19 @@ class GameRecognizer:
         texts = []
         
         # 方法2: PaddleOCR（识别率更高）
-        if self.use_paddle and self.ocr_engine:
+        engine = self.ocr_engine
+        if engine:
             try:
-                result = self.ocr_engine.ocr(str(image_path))
-                if result:
-                    for page in result:
-                        # 新版PaddleOCR返回字典格式
-                        if isinstance(page, dict):
-                            rec_texts = page.get('rec_texts', [])
-                            rec_scores = page.get('rec_scores', [])
-                            for i, text in enumerate(rec_texts):
-                                score = rec_scores[i] if i < len(rec_scores) else 1.0
-                                if score > 0.5 and text.strip():
-                                    texts.append(text.strip())
-                        # 旧版PaddleOCR返回列表格式
-                        elif isinstance(page, list):
-                            for line in page:
-                                try:
-                                    if isinstance(line, list) and len(line) >= 2:
-                                        text_info = line[1]
-                                        if isinstance(text_info, (tuple, list)):
-                                            text = str(text_info[0])
-                                            confidence = float(text_info[1]) if len(text_info) > 1 else 1.0
-                                        else:
-                                            text = str(text_info)
-                                            confidence = 1.0
-                                        if confidence > 0.5 and text.strip():
-                                            texts.append(text.strip())
-                                except Exception:
-                                    continue
-                
-                # 过滤掉无用文本（教程类）
-                filter_keywords = ['教程', '安装教程', '机版安装', '攻略', '礼包码']
-                filtered_texts = []
-                for t in texts:
-                    if not any(kw in t for kw in filter_keywords):
-                        filtered_texts.append(t)
-                    else:
-                        logger.debug(f"  🚫 过滤掉: {t}")
-                texts = filtered_texts
-                
-                # 输出识别结果到日志
-                if texts:
-                    logger.info(f"OCR识别出 {len(texts)} 条有效文本:")
-                    for t in texts:
-                        logger.info(f"  📝 {t}")
-                else:
-                    logger.debug("OCR未识别出有效文本")
-                    
+                with self._ocr_lock:
+                    result = engine.ocr(source)
+                texts = self._filter_ocr_texts(self._parse_paddle_result(result))
             except Exception as e:
                 logger.error(f"PaddleOCR识别失败: {e}")
         
         elif HAS_TESSERACT:
             try:
-                image = Image.open(image_path)
+                if image is None:
+                    image = Image.open(image_path)
                 text = pytesseract.image_to_string(image, lang='chi_sim+eng')
                 texts = [line.strip() for line in text.split('\n') if line.strip()]
                 logger.debug(f"Tesseract识别出 {len(texts)} 条文本")
@@ -247,6 +469,116 @@ class GameRecognizer:
         
         return merged_texts
     
+    def _parse_paddle_result(self, result) -> List[str]:
+        """解析PaddleOCR的返回结果，兼容新旧版本格式"""
+        texts = []
+        if not result:
+            return texts
+        
+        for page in result:
+            # 新版PaddleOCR返回字典格式
+            if isinstance(page, dict):
+                rec_texts = page.get('rec_texts', [])
+                rec_scores = page.get('rec_scores', [])
+                for i, text in enumerate(rec_texts):
+                    score = rec_scores[i] if i < len(rec_scores) else 1.0
+                    if score > 0.5 and text.strip():
+                        texts.append(text.strip())
+            # 旧版PaddleOCR返回列表格式
+            elif isinstance(page, list):
+                for line in page:
+                    try:
+                        if isinstance(line, list) and len(line) >= 2:
+                            text_info = line[1]
+                            if isinstance(text_info, (tuple, list)):
+                                text = str(text_info[0])
+                                confidence = float(text_info[1]) if len(text_info) > 1 else 1.0
+                            else:
+                                text = str(text_info)
+                                confidence = 1.0
+                            if confidence > 0.5 and text.strip():
+                                texts.append(text.strip())
+                    except Exception:
+                        continue
+        
+        return texts
+    
+    def _filter_ocr_texts(self, texts: List[str]) -> List[str]:
+        """过滤掉无用文本（教程类）并输出识别结果到日志"""
+        filtered_texts = []
+        for t in texts:
+            if not _FILTER_TEXT_PATTERN.search(t):
+                filtered_texts.append(t)
+            else:
+                logger.debug(f"  🚫 过滤掉: {t}")
+        
+        if filtered_texts:
+            logger.info(f"OCR识别出 {len(filtered_texts)} 条有效文本:")
+            for t in filtered_texts:
+                logger.info(f"  📝 {t}")
+        else:
+            logger.debug("OCR未识别出有效文本")
+        
+        return filtered_texts
+    
+    def warmup(self):
+        """
+        用一张空白图预热OCR引擎
+        首次推理要加载模型和做算子选择，放在截图开始前完成
+        """
+        engine = self.ocr_engine
+        if not engine:
+            return
+        
+        try:
+            import numpy as np
+            with self._ocr_lock:
+                engine.ocr(np.zeros((64, 64, 3), dtype=np.uint8))
+            logger.debug("OCR引擎预热完成")
+        except Exception as e:
+            logger.debug(f"OCR引擎预热失败: {e}")
+    
+    def ocr_batch(self, image_paths: List[Path], images: List[Any] = None) -> List[List[str]]:
+        """
+        批量OCR识别，一次推理处理多张图片
+        
+        Args:
+            image_paths: 图片路径列表
+            images: 与路径对应的已解码图片列表（元素为None时从磁盘读取）
+            
+        Returns:
+            与输入顺序一致的文本列表
+        """
+        if images is None:
+            images = [None] * len(image_paths)
+        
+        # 新版PaddleOCR的predict支持一次传入多张图片，旧版和Tesseract逐张处理
+        predict = getattr(self.ocr_engine, "predict", None)
+        ready = [
+            i for i, (path, image) in enumerate(zip(image_paths, images))
+            if image is not None or path.exists()
+        ]
+        if predict is None or not ready:
+            return [self.ocr_image(p, img) for p, img in zip(image_paths, images)]
+        
+        texts_by_index = {}
+        try:
+            sources = [str(image_paths[i]) if images[i] is None else images[i] for i in ready]
+            # 3.x的predict返回生成器，推理在遍历时才执行，要在锁内取完
+            with self._ocr_lock:
+                pages = list(predict(sources))
+            for i, page in zip(ready, pages):
+                texts = self._filter_ocr_texts(self._parse_paddle_result([page]))
+                texts_by_index[i] = self._merge_ocr_texts(texts)
+        except Exception as e:
+            logger.error(f"PaddleOCR批量识别失败，改为逐张识别: {e}")
+            return [self.ocr_image(p, img) for p, img in zip(image_paths, images)]
+        
+        return [
+            texts_by_index[i] if i in texts_by_index else self.ocr_image(p, img)
+            for i, (p, img) in enumerate(zip(image_paths, images))
+        ]
+    
     def _merge_ocr_texts(self, texts: List[str]) -> List[str]:
         """
         智能合并OCR结果，处理分散的文字
@@ -259,8 +591,10 @@ class GameRecognizer:
         unique_texts = list(dict.fromkeys(texts))
         
         # 过滤无用文本
-        filter_keywords = ['教程', '安装教程', '机版安装', '攻略', '礼包码']
-        filtered = [t for t in unique_texts if not any(kw in t for kw in filter_keywords)]
+        filtered = [t for t in unique_texts if not _FILTER_TEXT_PATTERN.search(t)]
+        
+        # 每个文本只统计一次是中文为主还是英文为主
+        kinds = [self._text_kind(t) for t in filtered]
         
         # 尝试合并相邻的中英文（如"红楼梦" + "galgame"）
         merged = []
@@ -272,17 +606,9 @@ class GameRecognizer:
             
             # 检查是否可以和下一个文本合并
             if i + 1 < len(filtered):
-                next_text = filtered[i + 1]
-                
-                # 如果当前是中文，下一个是英文，可能需要合并
-                if self._is_chinese(text) and self._is_english(next_text):
-                    merged.append(text + next_text)
-                    skip_next.add(i + 1)
-                    continue
-                
-                # 如果当前是英文，下一个是中文
-                if self._is_english(text) and self._is_chinese(next_text):
-                    merged.append(text + next_text)
+                # 当前是中文、下一个是英文，或当前是英文、下一个是中文
+                if {kinds[i], kinds[i + 1]} == {"chinese", "english"}:
+                    merged.append(text + filtered[i + 1])
                     skip_next.add(i + 1)
                     continue
             
@@ -290,15 +616,26 @@ class GameRecognizer:
         
         return merged
     
+    def _char_counts(self, text: str) -> Tuple[int, int]:
+        """统计文本中的中文字符数和英文字母数"""
+        return len(_CHINESE_CHAR_PATTERN.findall(text)), len(_ENGLISH_CHAR_PATTERN.findall(text))
+    
+    def _text_kind(self, text: str) -> Optional[str]:
+        """文本主要是中文时返回"chinese"，主要是英文时返回"english"，都不是时返回None"""
+        chinese_count, english_count = self._char_counts(text)
+        if chinese_count > len(text) * 0.5:
+            return "chinese"
+        if english_count > len(text) * 0.5:
+            return "english"
+        return None
+    
     def _is_chinese(self, text: str) -> bool:
         """判断文本是否主要是中文"""
-        chinese_count = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
-        return chinese_count > len(text) * 0.5
+        return len(_CHINESE_CHAR_PATTERN.findall(text)) > len(text) * 0.5
     
     def _is_english(self, text: str) -> bool:
         """判断文本是否主要是英文"""
-        english_count = sum(1 for c in text if c.isascii() and c.isalpha())
-        return english_count > len(text) * 0.5
+        return len(_ENGLISH_CHAR_PATTERN.findall(text)) > len(text) * 0.5
     
     def extract_hashtags(self, texts: List[str]) -> List[str]:
         """
@@ -315,8 +652,7 @@ class GameRecognizer:
         
         # 方法1: 正则匹配 #标签
         # 匹配 #后面跟着的中英文字符
-        pattern = r'#([^\s#@，。！？、：；""''【】《》\[\]]+)'
-        matches = re.findall(pattern, full_text)
+        matches = _HASHTAG_PATTERN.findall(full_text)
         
         for tag in matches:
             tag = tag.strip()
@@ -362,27 +698,10 @@ class GameRecognizer:
         if not hashtags:
             return None
         
-        # 后缀清理列表（按长度排序，先匹配长的）
-        suffixes = [
-            '怎么下载', '安卓下载', '苹果下载', 'ios下载',
-            '手机版下载', '电脑版下载', '最新版下载',
-            '下载安装', '安装教程', '下载教程',
-            '下载', '安装', '攻略', '礼包', '礼包码',
-            '手机版', '电脑版', '安卓版', 'ios版',
-            '官方版', '正版', '破解版', '汉化版',
-            '最新版', '老版本', '新版本',
-        ]
-        
-        # 清理每个标签，提取基础名称
+        # 清理每个标签（去掉最长的一个后缀），提取基础名称
         base_names = []
         for tag in hashtags:
-            name = tag
-            for suffix in suffixes:
-                if name.endswith(suffix):
-                    name = name[:-len(suffix)]
-                    break
-            
-            name = name.strip()
+            name = _HASHTAG_SUFFIX_PATTERN.sub('', tag, count=1).strip()
             if name and len(name) >= 2:
                 base_names.append(name)
         
@@ -438,25 +757,9 @@ class GameRecognizer:
     
     def _extract_game_name_from_text(self, text: str) -> Optional[str]:
         """从文本中提取游戏名称"""
-        # 移除常见后缀
-        suffixes_to_remove = [
-            '官方版', '正版', '手游', '手机版', '最新版', '中文版',
-            '汉化版', '安卓版', '下载', '安装包', 'apk', 'APK',
-            '破解版', '无限', '免费', '礼包码', '攻略',
-        ]
-        
-        result = text
-        for suffix in suffixes_to_remove:
-            if result.endswith(suffix):
-                result = result[:-len(suffix)]
-        
-        # 移除常见前缀
-        prefixes_to_remove = ['下载', '推荐', '热门', '最新', '免费']
-        for prefix in prefixes_to_remove:
-            if result.startswith(prefix):
-                result = result[len(prefix):]
-        
-        result = result.strip()
+        # 移除常见后缀和前缀
+        result = _TEXT_SUFFIX_PATTERN.sub('', text, count=1)
+        result = _TEXT_PREFIX_PATTERN.sub('', result, count=1).strip()
         
         # 验证结果
         if len(result) >= 2 and len(result) <= 20:
@@ -491,98 +794,119 @@ class GameRecognizer:
         
         return False
     
-    def verify_game_by_search(self, text: str) -> Dict[str, Any]:
+    def _verify_query(self, text: str) -> Optional[str]:
         """
-        通过网络搜索验证文本是否为游戏名称
+        清理待验证的文本（移除常见后缀），明显不是游戏名时返回None
         
         Args:
             text: 待验证的文本
             
         Returns:
-            验证结果字典，包含 is_game, confidence, game_name 等
+            用于搜索的游戏名，不需要搜索时返回None
         """
-        result = {
+        if not text or len(text) < 2:
+            return None
+        
+        # 先清理文本，移除常见后缀
+        clean_text = _VERIFY_SUFFIX_PATTERN.sub('', text, count=1)
+        
+        # 排除明显不是游戏名的
+        if _NOT_GAME_PATTERN.search(clean_text) or len(clean_text) < 2:
+            return None
+        
+        return clean_text
+    
+    def _score_verify_html(self, result: Dict[str, Any], text: str, html: str):
+        """
+        根据搜索结果页中的游戏相关关键词打分，填入验证结果并写入缓存
+        
+        Args:
+            result: 验证结果字典
+            text: 搜索的游戏名（清理后的文本）
+            html: 搜索结果页（小写）
+        """
+        # 分析搜索结果中的关键词
+        game_indicators = [
+            ('taptap', 3),        # TapTap是专业游戏平台
+            ('4399', 2),          # 4399游戏平台
+            ('九游', 2),           # 九游游戏平台
+            ('好游快爆', 2),        # 游戏资讯平台
+            ('手游', 1),
+            ('手机游戏', 1),
+            ('安卓游戏', 1),
+            ('ios游戏', 1),
+            ('游戏下载', 1),
+            ('apk下载', 1),
+            ('游戏攻略', 1),
+            ('游戏礼包', 1),
+        ]
+        
+        score = 0
+        hints = []
+        
+        for indicator, weight in game_indicators:
+            if indicator in html:
+                score += weight
+                hints.append(indicator)
+        
+        # 检查是否在搜索结果中有明确的游戏相关描述
+        if f'{text.lower()}是一款' in html or f'《{text.lower()}》' in html:
+            score += 2
+            hints.append('游戏介绍')
+        
+        # 计算置信度
+        confidence = min(score / 10.0, 1.0)
+        
+        result["confidence"] = confidence
+        result["search_hints"] = hints
+        
+        # 置信度阈值设为0.5，确保准确性
+        if confidence >= 0.5:
+            result["is_game"] = True
+            result["game_name"] = text
+            logger.info(f"🎮 网络验证: '{result['game_name']}' 确认为游戏 (置信度: {confidence:.2f}, 依据: {hints})")
+        else:
+            logger.debug(f"❓ 网络验证: '{text}' 可能不是游戏 (置信度: {confidence:.2f})")
+        
+        self._verify_cache[text.lower()] = {"time": time.time(), "result": result}
+        self._verify_cache_dirty = True
+    
+    def _new_verify_result(self, text: str) -> Dict[str, Any]:
+        """未验证的结果字典"""
+        return {
             "text": text,
             "is_game": False,
             "confidence": 0.0,
             "game_name": None,
             "search_hints": []
         }
+    
+    def verify_game_by_search(self, text: str) -> Dict[str, Any]:
+        """
+        通过网络搜索验证文本是否为游戏名称
         
-        if not text or len(text) < 2:
-            return result
-        
-        # 先清理文本，移除常见后缀
-        clean_text = text
-        suffixes = ['老版本', '新版本', '安装教程', '教程', '攻略', '下载', '安装包', '手机版', '电脑版', '安卓版']
-        for suffix in suffixes:
-            if clean_text.endswith(suffix):
-                clean_text = clean_text[:-len(suffix)]
-        
-        # 排除明显不是游戏名的
-        not_game_patterns = ['教程', '版本', '安装', '下载', '攻略', '礼包', '加面', '机版']
-        if any(p in clean_text for p in not_game_patterns) or len(clean_text) < 2:
+        Args:
+            text: 待验证的文本
+            
+        Returns:
+            验证结果字典，包含 is_game, confidence, game_name 等
+        """
+        result = self._new_verify_result(text)
+        query = self._verify_query(text)
+        if query is None:
             return result
         
-        # 使用清理后的文本搜索
-        text = clean_text if len(clean_text) >= 2 else text
+        # 同一个游戏会出现在多张截图中，验证过的直接使用缓存结果（也不需要请求间隔）
+        cached = self._verify_cache.get(query.lower())
+        if cached is not None:
+            return {**cached["result"], "text": text}
         
         try:
             # 搜索 "xxx 游戏下载"
-            search_query = f"{text} 游戏下载"
-            url = f"https://www.baidu.com/s?wd={quote(search_query)}"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
+            url = VERIFY_SEARCH_URL.format(quote(f"{query} 游戏下载"))
+            response = requests.get(url, headers=VERIFY_HEADERS, timeout=10)
             response.encoding = 'utf-8'
-            html = response.text.lower()
-            
-            # 分析搜索结果中的关键词
-            game_indicators = [
-                ('taptap', 3),        # TapTap是专业游戏平台
-                ('4399', 2),          # 4399游戏平台
-                ('九游', 2),           # 九游游戏平台
-                ('好游快爆', 2),        # 游戏资讯平台
-                ('手游', 1),
-                ('手机游戏', 1),
-                ('安卓游戏', 1),
-                ('ios游戏', 1),
-                ('游戏下载', 1),
-                ('apk下载', 1),
-                ('游戏攻略', 1),
-                ('游戏礼包', 1),
-            ]
-            
-            score = 0
-            hints = []
-            
-            for indicator, weight in game_indicators:
-                if indicator in html:
-                    score += weight
-                    hints.append(indicator)
-            
-            # 检查是否在搜索结果中有明确的游戏相关描述
-            if f'{text.lower()}是一款' in html or f'《{text.lower()}》' in html:
-                score += 2
-                hints.append('游戏介绍')
-            
-            # 计算置信度
-            confidence = min(score / 10.0, 1.0)
-            
-            result["confidence"] = confidence
-            result["search_hints"] = hints
-            
-            # 置信度阈值设为0.5，确保准确性
-            if confidence >= 0.5:
-                result["is_game"] = True
-                result["game_name"] = clean_text if len(clean_text) >= 2 else text
-                logger.info(f"🎮 网络验证: '{result['game_name']}' 确认为游戏 (置信度: {confidence:.2f}, 依据: {hints})")
-            else:
-                logger.debug(f"❓ 网络验证: '{text}' 可能不是游戏 (置信度: {confidence:.2f})")
+            self._score_verify_html(result, query, response.text.lower())
             
             # 避免请求过快
             time.sleep(0.5)
@@ -592,9 +916,69 @@ class GameRecognizer:
         
         return result
     
+    async def verify_game_by_search_async(self, text: str, session) -> Dict[str, Any]:
+        """
+        使用aiohttp异步验证文本是否为游戏名称（并发数由调用方的信号量限制，不再固定等待）
+        
+        Args:
+            text: 待验证的文本
+            session: aiohttp.ClientSession
+            
+        Returns:
+            验证结果字典，包含 is_game, confidence, game_name 等
+        """
+        result = self._new_verify_result(text)
+        query = self._verify_query(text)
+        if query is None:
+            return result
+        
+        cached = self._verify_cache.get(query.lower())
+        if cached is not None:
+            return {**cached["result"], "text": text}
+        
+        try:
+            url = VERIFY_SEARCH_URL.format(quote(f"{query} 游戏下载"))
+            async with session.get(url) as response:
+                html = await response.text(encoding='utf-8', errors='replace')
+            self._score_verify_html(result, query, html.lower())
+        except Exception as e:
+            logger.warning(f"网络搜索验证失败: {e}")
+        
+        return result
+    
+    async def verify_texts_as_games_async(self, texts: List[str],
+                                          concurrency: int = VERIFY_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        并发验证多个文本（相同文本只请求一次）
+        
+        Args:
+            texts: 待验证的文本列表（已经过本地规则过滤）
+            concurrency: 最大并发请求数（避免被搜索引擎封禁）
+            
+        Returns:
+            与输入顺序一致的验证结果列表
+        """
+        import asyncio
+        import aiohttp
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        unique_texts = list(dict.fromkeys(texts))
+        
+        connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(headers=VERIFY_HEADERS, timeout=timeout, connector=connector) as session:
+            async def verify(text: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self.verify_game_by_search_async(text, session)
+            
+            unique_results = await asyncio.gather(*(verify(text) for text in unique_texts))
+        
+        results_by_text = dict(zip(unique_texts, unique_results))
+        return [results_by_text[text] for text in texts]
+    
     def verify_texts_as_games(self, texts: List[str]) -> List[Dict[str, Any]]:
         """
-        批量验证文本列表中哪些是游戏名称
+        批量验证文本列表中哪些是游戏名称（本地规则过滤后并发请求）
         
         Args:
             texts: 待验证的文本列表
@@ -602,9 +986,9 @@ class GameRecognizer:
         Returns:
             验证结果列表
         """
-        results = []
-        verified_games = []
+        import asyncio
         
+        candidates = []
         for text in texts:
             # 先用本地规则快速过滤
             text = text.strip()
@@ -612,30 +996,31 @@ class GameRecognizer:
                 continue
             
             # 排除明显不是游戏名的
-            if any(kw in text for kw in EXCLUDE_KEYWORDS):
+            if _EXCLUDE_PATTERN.search(text):
                 continue
             
             # 排除纯数字、纯英文等
             if text.isdigit() or (text.isascii() and len(text) < 4):
                 continue
             
-            # 网络搜索验证
-            result = self.verify_game_by_search(text)
-            results.append(result)
-            
-            if result["is_game"]:
-                verified_games.append(result)
+            candidates.append(text)
+        
+        # 网络搜索验证
+        results = asyncio.run(self.verify_texts_as_games_async(candidates)) if candidates else []
+        verified_games = [result for result in results if result["is_game"]]
         
         logger.info(f"🔍 网络验证完成: {len(texts)} 个文本中有 {len(verified_games)} 个确认为游戏")
         return results
     
-    def process_screenshot(self, image_path: Path, use_web_verify: bool = False) -> Dict[str, Any]:
+    def process_screenshot(self, image_path: Path, use_web_verify: bool = False,
+                           texts: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         处理单张截图，从#标签中提取游戏名称
         
         Args:
             image_path: 截图路径
             use_web_verify: 是否使用网络搜索验证游戏名称（默认关闭，因为标签已经很准确）
+            texts: 已识别好的OCR文本（批量识别时传入，为None时对截图做OCR）
             
         Returns:
             包含标签和识别游戏的字典
@@ -650,7 +1035,8 @@ class GameRecognizer:
         }
         
         # OCR识别
-        texts = self.ocr_image(image_path)
+        if texts is None:
+            texts = self.ocr_image(image_path)
         result["ocr_texts"] = texts
         
         if not texts:
@@ -694,23 +1080,40 @@ class GameRecognizer:
             所有截图的处理结果列表
         """
         all_results = []
+        batch_size = OCR_CONFIG["batch_size"]
         
-        for path in image_paths:
-            result = self.process_screenshot(path)
-            all_results.append(result)
+        for i in range(0, len(image_paths), batch_size):
+            all_results.extend(self.process_batch(image_paths[i:i + batch_size]))
         
         return all_results
     
+    def process_batch(self, image_paths: List[Path], images: List[Any] = None) -> List[Dict[str, Any]]:
+        """
+        批量处理截图，OCR一次推理完成
+        
+        Args:
+            image_paths: 截图路径列表
+            images: 与路径对应的已解码图片列表（可选，用于跳过磁盘读取）
+            
+        Returns:
+            与输入顺序一致的处理结果列表
+        """
+        texts_list = self.ocr_batch(image_paths, images)
+        return [
+            self.process_screenshot(path, texts=texts)
+            for path, texts in zip(image_paths, texts_list)
+        ]
+    
     def save_to_csv(self, results: List[Dict[str, Any]] = None):
         """
         保存识别结果到CSV文件
-        只保存截图名、游戏名和标签
+        只保存截图名、游戏名和标签；已保存过的截图跳过，新行追加到文件末尾，
+        只有新行需要表头中没有的标签列时才整体重写文件
         
         Args:
             results: process_screenshot返回的结果列表
         """
-        import pandas as pd
-        from datetime import datetime
+        import csv
         
         if results is None:
             # 兼容旧模式
@@ -721,39 +1124,51 @@ class GameRecognizer:
             return
         
         # 转换为DataFrame格式
-        rows = []
-        max_hashtags = 0
-        
-        for result in results:
-            if isinstance(result, dict):
-                hashtags = result.get('hashtags', [])
-                max_hashtags = max(max_hashtags, len(hashtags))
-                
-                row = {
-                    'screenshot': result.get('screenshot', ''),
-                    'game_name': result.get('game_name', ''),
-                    'hashtags': '|'.join(hashtags) if hashtags else '',
-                    'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                }
-                
-                # 将标签分列存储
-                for i, tag in enumerate(hashtags):
-                    row[f'tag_{i+1}'] = tag
-                
-                rows.append(row)
+        rows = [self._result_to_row(result) for result in results if isinstance(result, dict)]
         
         if not rows:
             logger.warning("没有有效数据可保存")
             return
         
-        df = pd.DataFrame(rows)
+        # 跳过已保存过的截图；同一截图出现多次时保留最新的
+        new_rows = {}
+        for i, row in enumerate(rows):
+            if row['screenshot'] not in self._csv_screenshots:
+                new_rows[row['screenshot'] or i] = row
+        rows = list(new_rows.values())
+        
+        if not rows:
+            logger.info("识别结果均已保存在CSV中")
+            return
+        
+        header = _read_csv_header(GAMES_CSV_PATH)
+        columns = self._csv_columns(rows)
+        if header and not set(columns) <= set(header):
+            # 新行需要表头中没有的标签列，整体重写
+            self._rewrite_csv(rows, columns)
+        else:
+            GAMES_CSV_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(GAMES_CSV_PATH, 'a', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=header or columns, extrasaction='ignore')
+                if not header:
+                    writer.writeheader()
+                writer.writerows(rows)
+            logger.success(f"游戏数据已保存到: {GAMES_CSV_PATH}")
+            logger.info(f"追加 {len(rows)} 条记录")
+        
+        self._csv_screenshots.update(row['screenshot'] for row in rows if row['screenshot'])
+    
+    def _csv_columns(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """CSV行用到的列：固定列在前，标签列按序号排在后面"""
+        present = set().union(*rows)
+        tag_cols = sorted((c for c in present if c.startswith('tag_')), key=lambda x: int(x.split('_')[-1]))
+        return [c for c in CSV_BASE_COLUMNS if c in present] + tag_cols
+    
+    def _rewrite_csv(self, rows: List[Dict[str, Any]], columns: List[str]):
+        """与已有数据合并后整体重写CSV（按screenshot去重，保留最新的）"""
+        import pandas as pd
         
-        # 重新排列列顺序
-        cols = ['screenshot', 'game_name', 'hashtags', 'created_at']
-        tag_cols = [c for c in df.columns if c.startswith('tag_')]
-        tag_cols.sort(key=lambda x: int(x.split('_')[-1]))
-        final_cols = [c for c in cols if c in df.columns] + tag_cols
-        df = df[final_cols]
+        df = pd.DataFrame(rows)[columns]
         
         # 如果文件已存在，合并数据
         if GAMES_CSV_PATH.exists():
@@ -773,6 +1188,38 @@ class GameRecognizer:
         logger.success(f"游戏数据已保存到: {GAMES_CSV_PATH}")
         logger.info(f"共保存 {len(df)} 条记录")
     
+    def _result_to_row(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """把process_screenshot的结果转换为CSV行（标签分列存储）"""
+        from datetime import datetime
+        
+        hashtags = result.get('hashtags', [])
+        row = {
+            'screenshot': result.get('screenshot', ''),
+            'game_name': result.get('game_name', ''),
+            'hashtags': '|'.join(hashtags) if hashtags else '',
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        
+        # 将标签分列存储
+        for i, tag in enumerate(hashtags):
+            row[f'tag_{i+1}'] = tag
+        
+        return row
+    
+    def open_csv_appender(self, csv_path: Path = None) -> "CSVAppender":
+        """
+        打开CSV追加写入器，每条结果只追加一行，不重写整个文件
+        
+        Args:
+            csv_path: CSV文件路径（默认GAMES_CSV_PATH）
+            
+        Returns:
+            CSVAppender（支持with语句）
+        """
+        csv_path = csv_path or GAMES_CSV_PATH
+        saved = self._csv_screenshots if csv_path == GAMES_CSV_PATH else None
+        return CSVAppender(csv_path, self._result_to_row, saved)
+    
     def get_all_games(self) -> List[str]:
         """获取所有已识别的游戏名称"""
         return list(self.recognized_games)
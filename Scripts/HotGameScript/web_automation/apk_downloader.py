@@ -124,6 +124,84 @@ class APKDownloader:
             logger.error(f"直接下载失败: {e}")
             return None
     
+    async def download_one(self, url: str, dest: Path, session) -> Optional[Path]:
+        """
+        异步下载单个APK文件（流式写入）
+        
+        Args:
+            url: APK直链
+            dest: 保存路径
+            session: aiohttp.ClientSession
+            
+        Returns:
+            下载后的文件路径，失败返回None
+        """
+        import aiohttp
+        
+        logger.info(f"正在下载: {dest.name}")
+        try:
+            timeout = aiohttp.ClientTimeout(total=TIMEOUTS["download"])
+            async with session.get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                with open(dest, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(1 << 16):
+                        f.write(chunk)
+            
+            logger.success(f"下载完成: {dest}")
+            return dest
+            
+        except Exception as e:
+            logger.error(f"直接下载失败: {e}")
+            dest.unlink(missing_ok=True)
+            return None
+    
+    def create_async_session(self):
+        """创建异步下载使用的aiohttp.ClientSession（沿用requests会话的请求头）"""
+        import aiohttp
+        
+        return aiohttp.ClientSession(headers=dict(self.session.headers))
+    
+    async def download_game_async(self, game_name: str, url: str, session) -> Dict[str, Any]:
+        """
+        异步下载单个游戏的APK直链并生成关键词副本
+        
+        Args:
+            game_name: 游戏名称
+            url: APK直链
+            session: aiohttp.ClientSession
+            
+        Returns:
+            处理结果
+        """
+        import asyncio
+        
+        dest = DOWNLOADS_DIR / f"{self._sanitize_filename(game_name)}.apk"
+        apk_path = await self.download_one(url, dest, session)
+        # 副本生成是本地文件复制，放到线程中执行，不阻塞事件循环
+        return await asyncio.to_thread(self._finish_download, url, game_name, apk_path)
+    
+    async def download_many(self, tasks: List[tuple], concurrency: int = 4) -> List[Optional[Path]]:
+        """
+        并发下载多个APK直链
+        
+        Args:
+            tasks: (url, safe_name) 列表
+            concurrency: 最大同时下载数
+            
+        Returns:
+            与输入顺序一致的文件路径列表（失败为None）
+        """
+        import asyncio
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with self.create_async_session() as session:
+            async def download(url: str, safe_name: str) -> Optional[Path]:
+                async with semaphore:
+                    return await self.download_one(url, DOWNLOADS_DIR / f"{safe_name}.apk", session)
+            
+            return await asyncio.gather(*(download(url, name) for url, name in tasks))
+    
     def _download_from_page(self, url: str, safe_name: str) -> Optional[Path]:
         """从页面获取并下载APK"""
         if not self.driver:
@@ -294,6 +372,12 @@ class APKDownloader:
         Returns:
             处理结果
         """
+        # 下载APK
+        apk_path = self.download_apk(url, game_name)
+        return self._finish_download(url, game_name, apk_path)
+    
+    def _finish_download(self, url: str, game_name: str, apk_path: Optional[Path]) -> Dict[str, Any]:
+        """下载完成后生成关键词副本并汇总结果"""
         result = {
             "game_name": game_name,
             "url": url,
@@ -303,9 +387,6 @@ class APKDownloader:
             "error": None
         }
         
-        # 下载APK
-        apk_path = self.download_apk(url, game_name)
-        
         if not apk_path:
             result["error"] = "下载失败"
             return result
@@ -319,6 +400,13 @@ class APKDownloader:
         
         return result
     
+    def select_best_url(self, links: List[Dict]) -> Optional[str]:
+        """选择评分最高的下载链接"""
+        if not links:
+            return None
+        best_link = max(links, key=lambda x: x.get("download_score", 0))
+        return best_link.get("url")
+    
     def process_multiple_games(self, download_links: Dict[str, List[Dict]]) -> List[Dict]:
         """
         处理多个游戏的下载
@@ -329,24 +417,41 @@ class APKDownloader:
         Returns:
             处理结果列表
         """
-        results = []
+        direct_games = []  # APK直链，用aiohttp并发下载
+        page_games = []    # 下载页面，需要浏览器逐个处理
         
         for game_name, links in download_links.items():
             if not links:
                 logger.warning(f"游戏 {game_name} 没有可用的下载链接")
                 continue
             
-            # 选择评分最高的链接
-            best_link = max(links, key=lambda x: x.get("download_score", 0))
-            url = best_link.get("url")
+            url = self.select_best_url(links)
             
             if url:
-                logger.info(f"处理游戏: {game_name}")
-                result = self.download_and_generate_copies(url, game_name)
-                results.append(result)
-                
-                # 避免请求过快
-                time.sleep(2)
+                if url.lower().endswith('.apk'):
+                    direct_games.append((game_name, url))
+                else:
+                    page_games.append((game_name, url))
+        
+        results = []
+        
+        if direct_games:
+            import asyncio
+            logger.info(f"并发下载 {len(direct_games)} 个APK直链")
+            tasks = [(url, self._sanitize_filename(name)) for name, url in direct_games]
+            paths = asyncio.run(self.download_many(tasks))
+            
+            # 副本生成是本地文件操作，逐个同步处理
+            for (game_name, url), apk_path in zip(direct_games, paths):
+                results.append(self._finish_download(url, game_name, apk_path))
+        
+        for game_name, url in page_games:
+            logger.info(f"处理游戏: {game_name}")
+            result = self.download_and_generate_copies(url, game_name)
+            results.append(result)
+            
+            # 避免请求过快
+            time.sleep(2)
         
         return results
     
@@ -25,11 +25,19 @@ sys.path.append(str(Path(__file__).parent.parent))
 from config import (
     CHROME_DEBUG_CONFIG,
     SEARCH_ENGINES,
+    SEARCH_CACHE_PATH,
+    SEARCH_CACHE_TTL,
     APK_DOWNLOAD_SITES,
     TIMEOUTS
 )
 
 
+# 异步搜索时使用的请求头（静态页面解析）
+ASYNC_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
 class GameSearcher:
     """游戏搜索器"""
     
@@ -43,7 +51,57 @@ class GameSearcher:
         self.driver: Optional[webdriver.Chrome] = None
         self.use_debug_mode = use_debug_mode
         self.search_results_cache: Dict[str, List[Dict]] = {}
+        self._cache_times: Dict[str, float] = {}  # 缓存写入时间
+        self._cache_dirty = False
+        self._load_search_cache()
+        
+    def _load_search_cache(self):
+        """从磁盘加载未过期的搜索结果缓存"""
+        if not SEARCH_CACHE_PATH.exists():
+            return
         
+        try:
+            import json
+            with open(SEARCH_CACHE_PATH, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取搜索缓存失败: {e}")
+            return
+        
+        now = time.time()
+        for cache_key, entry in entries.items():
+            if now - entry.get("time", 0) < SEARCH_CACHE_TTL:
+                self.search_results_cache[cache_key] = entry.get("results", [])
+                self._cache_times[cache_key] = entry["time"]
+        
+        if self.search_results_cache:
+            logger.info(f"加载了 {len(self.search_results_cache)} 条搜索缓存")
+    
+    def _cache_results(self, cache_key: str, results: List[Dict]):
+        """缓存搜索结果（空结果只缓存在内存中）"""
+        self.search_results_cache[cache_key] = results
+        if results:
+            self._cache_times[cache_key] = time.time()
+            self._cache_dirty = True
+    
+    def save_search_cache(self):
+        """把有结果的搜索缓存写入磁盘"""
+        if not self._cache_dirty:
+            return
+        
+        entries = {
+            cache_key: {"time": cache_time, "results": self.search_results_cache[cache_key]}
+            for cache_key, cache_time in self._cache_times.items()
+        }
+        try:
+            import json
+            SEARCH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(SEARCH_CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            self._cache_dirty = False
+        except Exception as e:
+            logger.warning(f"保存搜索缓存失败: {e}")
+    
     def connect(self, debug_port: int = None) -> bool:
         """
         连接到Chrome浏览器
@@ -85,7 +143,9 @@ class GameSearcher:
             return False
     
     def disconnect(self):
-        """断开Chrome连接"""
+        """断开Chrome连接（同时保存搜索缓存）"""
+        self.save_search_cache()
+        
         if self.driver:
             try:
                 # 如果是调试模式，不关闭浏览器
@@ -145,7 +205,7 @@ class GameSearcher:
             results = self._analyze_download_links(results, game_name)
             
             # 缓存结果
-            self.search_results_cache[cache_key] = results
+            self._cache_results(cache_key, results)
             
             logger.info(f"搜索到 {len(results)} 条结果")
             
@@ -154,6 +214,148 @@ class GameSearcher:
         
         return results
     
+    async def search_async(self, game_name: str, session, search_engine: str = "baidu") -> List[Dict[str, Any]]:
+        """
+        使用aiohttp异步搜索游戏（直接解析静态HTML，不经过浏览器）
+        
+        Args:
+            game_name: 游戏名称
+            session: aiohttp.ClientSession
+            search_engine: 搜索引擎 (baidu, bing)
+            
+        Returns:
+            搜索结果列表，失败时返回空列表
+        """
+        cache_key = f"{game_name}_{search_engine}"
+        if cache_key in self.search_results_cache:
+            logger.info(f"使用缓存的搜索结果: {game_name}")
+            return self.search_results_cache[cache_key]
+        
+        parsers = {
+            "baidu": self._parse_baidu_html,
+            "bing": self._parse_bing_html,
+        }
+        parser = parsers.get(search_engine)
+        if parser is None:
+            return []
+        
+        search_query = f"{game_name} APK下载 安卓"
+        search_url = SEARCH_ENGINES[search_engine].format(quote(search_query))
+        
+        try:
+            async with session.get(search_url) as response:
+                response.raise_for_status()
+                html = await response.text()
+        except Exception as e:
+            logger.debug(f"异步搜索 {game_name} 失败: {e}")
+            return []
+        
+        results = self._analyze_download_links(parser(html), game_name)
+        if results:
+            self._cache_results(cache_key, results)
+        logger.info(f"搜索 {game_name}: {len(results)} 条结果")
+        return results
+    
+    def create_async_session(self):
+        """创建异步搜索使用的aiohttp.ClientSession（需在事件循环中调用）"""
+        import aiohttp
+        
+        timeout = aiohttp.ClientTimeout(total=TIMEOUTS["page_load"])
+        return aiohttp.ClientSession(headers=ASYNC_HEADERS, timeout=timeout)
+    
+    async def get_best_download_links_async(self, game_name: str, session, limit: int = 5) -> List[Dict]:
+        """
+        异步获取最佳下载链接
+        
+        Args:
+            game_name: 游戏名称
+            session: aiohttp.ClientSession
+            limit: 返回数量限制
+            
+        Returns:
+            最佳下载链接列表，搜索失败时返回空列表
+        """
+        results = await self.search_async(game_name, session)
+        return self._select_download_links(results, game_name, limit)
+    
+    async def search_multiple_games_async(self, game_names: List[str], limit: int = 5,
+                                          concurrency: int = 8) -> Dict[str, List[Dict]]:
+        """
+        并发搜索多个游戏，返回每个游戏的最佳下载链接
+        
+        Args:
+            game_names: 游戏名称列表
+            limit: 每个游戏返回的链接数量
+            concurrency: 最大并发请求数（避免被搜索引擎封禁）
+            
+        Returns:
+            游戏名称到最佳下载链接列表的字典（搜索失败的游戏为空列表）
+        """
+        import asyncio
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with self.create_async_session() as session:
+            async def search_one(game_name: str) -> List[Dict]:
+                async with semaphore:
+                    return await self.get_best_download_links_async(game_name, session, limit)
+            
+            all_links = await asyncio.gather(*(search_one(name) for name in game_names))
+        
+        return dict(zip(game_names, all_links))
+    
+    def _parse_baidu_html(self, html: str) -> List[Dict[str, Any]]:
+        """解析百度搜索结果的静态HTML"""
+        results = []
+        soup = BeautifulSoup(html, "lxml")
+        
+        items = soup.select("#content_left .result") or soup.select("#content_left .c-container")
+        for item in items[:20]:  # 只取前20条
+            title_elem = item.select_one("h3 a")
+            if not title_elem:
+                continue
+            title = title_elem.get_text(strip=True)
+            url = title_elem.get("href", "")
+            
+            desc_elem = item.select_one(".c-abstract, .content-right_8Zs40")
+            source_elem = item.select_one(".c-showurl, .source_1Vdff")
+            
+            if title and url:
+                results.append({
+                    "title": title,
+                    "url": url,
+                    "description": desc_elem.get_text(strip=True) if desc_elem else "",
+                    "source": source_elem.get_text(strip=True) if source_elem else urlparse(url).netloc,
+                    "search_engine": "baidu"
+                })
+        
+        return results
+    
+    def _parse_bing_html(self, html: str) -> List[Dict[str, Any]]:
+        """解析Bing搜索结果的静态HTML"""
+        results = []
+        soup = BeautifulSoup(html, "lxml")
+        
+        for item in soup.select("#b_results .b_algo")[:20]:
+            title_elem = item.select_one("h2 a")
+            if not title_elem:
+                continue
+            title = title_elem.get_text(strip=True)
+            url = title_elem.get("href", "")
+            
+            desc_elem = item.select_one(".b_caption p")
+            
+            if title and url:
+                results.append({
+                    "title": title,
+                    "url": url,
+                    "description": desc_elem.get_text(strip=True) if desc_elem else "",
+                    "source": urlparse(url).netloc,
+                    "search_engine": "bing"
+                })
+        
+        return results
+    
     def _parse_baidu_results(self) -> List[Dict[str, Any]]:
         """解析百度搜索结果"""
         results = []
@@ -362,8 +564,10 @@ class GameSearcher:
             最佳下载链接列表
         """
         results = self.search_game(game_name)
-        
-        # 筛选可下载的链接
+        return self._select_download_links(results, game_name, limit)
+    
+    def _select_download_links(self, results: List[Dict], game_name: str, limit: int) -> List[Dict]:
+        """从已评分的搜索结果中筛选可下载的链接"""
         downloadable = [r for r in results if r.get("is_downloadable", False)]
         
         if not downloadable: